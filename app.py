@@ -13,16 +13,23 @@ import time
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 # Importações dos módulos refatorados
-from src.models.formulario import FormularioSeguro
-from src.validators.form_validators import FormValidator
+from src.managers.state_manager import FormularioSnapshot
+from src.validators.form_validators import FormValidator, FileValidator, MapaErros
 from src.components.form_sections import (
     FormSectionRenderer, EquipamentosSection, ApiSearchHandler
 )
-from src.utils.formatters import ValueFormatter, StringUtils, DateUtils
+from src.components.fragmentos import secao
+from src.components.template_renderer import TemplateRenderer
+from src.components.scroll import rolar_para_topo
+from src.components.admin_lote import AdminLotePage
+from src.utils.formatters import ValueFormatter, StringUtils
 from src.services.email_service import EmailService
+from src.services.spool_service import SpoolService
+from src.services.pricing_service import PricingService, TotalGrupo
+from src.services.asset_service import AssetService
 
 # Importações do sistema original
-from config import APP_CONFIG, PLANOS_SEGURO, DATA_FINAL_VIGENCIA
+from config import APP_CONFIG, DATA_FINAL_VIGENCIA, UPLOAD_CONFIG
 from datetime import datetime, timedelta
 
 # Configuração da página
@@ -44,13 +51,35 @@ class FormularioApp:
         self._ocultar_cabecalho()
         
     def _carregar_css(self):
-        """Carrega arquivo CSS personalizado"""
-        try:
-            with open("styles.css", "r", encoding="utf-8") as f:
-                css_content = f.read()
-            st.markdown(f"<style>{css_content}</style>", unsafe_allow_html=True)
-        except FileNotFoundError:
+        """Carrega o CSS personalizado (minificado e lido uma vez por processo)"""
+        url_css = AssetService.publicar().get('css')
+        if url_css:
+            # Servido como arquivo estático: o navegador baixa uma vez (cache pela versão)
+            # e a página só recebe este carregador a cada execução
+            components.html(f"""
+            <script>
+                (function() {{
+                    const doc = parent.document;
+                    const id = 'formulario-css-{url_css.rsplit('=', 1)[-1]}';
+                    if (doc.getElementById(id)) return;
+                    fetch(new URL('{url_css}', doc.baseURI)).then(r => r.text()).then(css => {{
+                        if (doc.getElementById(id)) return;
+                        doc.querySelectorAll('style[id^="formulario-css-"]').forEach(el => el.remove());
+                        const style = doc.createElement('style');
+                        style.id = id;
+                        style.textContent = css;
+                        doc.head.appendChild(style);
+                    }});
+                }})();
+            </script>
+            """, height=0)
+            return
+        
+        css_content = AssetService.css_minificado()
+        if css_content is None:
             st.warning("⚠ Arquivo styles.css não encontrado.")
+            return
+        st.markdown(f"<style>{css_content}</style>", unsafe_allow_html=True)
     
     def _ocultar_cabecalho(self):
         """Oculta elementos do cabeçalho padrão do Streamlit"""
@@ -87,34 +116,38 @@ class FormularioApp:
         <div class="navbar-container">
             <div class="navbar-content">
                 <div class="navbar-logo">
-                    <img src="data:image/png;base64,{}" alt="Logo" class="navbar-logo-img">
+                    {}
                 </div>
             </div>
         </div>
-        """.format(self._get_logo_base64()), unsafe_allow_html=True)
+        """.format(self._get_logo_html()), unsafe_allow_html=True)
         
         # Header estilizado principal
-        st.markdown("""
-        <div class="header-container">
-            <div class="header-content">
-                <div class="header-titles">
-                    <h1 class="header-main-title">Formulário de Adesão</h1>
-                    <h2 class="header-subtitle">Seguro Incêndio Conteúdos - Cessionários</h2>
-                    <p class="header-company"><strong>ORLA RIO</strong></p>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(TemplateRenderer.estatico('sections/header.html'), unsafe_allow_html=True)
     
-    def _get_logo_base64(self):
-        """Converte logo para base64"""
-        import base64
-        try:
-            with open("logo.png", "rb") as f:
-                return base64.b64encode(f.read()).decode()
-        except FileNotFoundError:
-            return ""
+    def _get_logo_html(self):
+        """Logo do cabeçalho: variantes PNG/WebP via srcset, com o arquivo original como alternativa"""
+        assets = AssetService.publicar()
+        variantes = assets.get('logo_variantes')
+        if variantes:
+            fontes = {}
+            for mime, largura, url in variantes:
+                fontes.setdefault(mime, []).append(f"{url} {largura}w")
+            png = ", ".join(fontes.get('image/png', []))
+            sources = "".join(
+                f'<source type="{mime}" srcset="{", ".join(srcset)}" sizes="100px">'
+                for mime, srcset in fontes.items() if mime != 'image/png'
+            )
+            return (f'<picture>{sources}<img src="{variantes[-1][2]}" srcset="{png}" sizes="100px" '
+                    f'alt="Logo" class="navbar-logo-img"></picture>')
+        
+        url_logo = assets.get('logo')
+        if not url_logo:
+            mime, conteudo = AssetService.logo_base64()
+            url_logo = f"data:{mime};base64,{conteudo}"
+        return f'<img src="{url_logo}" alt="Logo" class="navbar-logo-img">'
     
+    @secao('identificacao_quiosque')
     def renderizar_identificacao_quiosque(self):
         """Renderiza seção de identificação do quiosque"""
         FormSectionRenderer.render_section_header(
@@ -135,7 +168,8 @@ class FormularioApp:
             "▪ Razão Social",
             value=st.session_state.get('razao_social_busca', ''),
             help="Preenchido automaticamente quando um CNPJ válido é digitado",
-            key="razao_social"
+            key="razao_social",
+            on_change=FormularioSnapshot.marcar_alterado
         )
         
         # CEP com busca automática silenciosa
@@ -150,35 +184,40 @@ class FormularioApp:
         logradouro = st.text_input(
             "▪ Logradouro *", 
             value=st.session_state.get('logradouro_busca', ''),
-            key="logradouro"
+            key="logradouro",
+            on_change=FormularioSnapshot.marcar_alterado
         )
         
         col1, col2 = st.columns(2)
         with col1:
-            numero = st.text_input("▪ Número *", key="numero")
+            numero = st.text_input("▪ Número *", key="numero", on_change=FormularioSnapshot.marcar_alterado)
         with col2:
-            complemento = st.text_input("▪ Complemento", key="complemento")
+            complemento = st.text_input("▪ Complemento", key="complemento", on_change=FormularioSnapshot.marcar_alterado)
         
         col1, col2 = st.columns(2)
         with col1:
             bairro = st.text_input(
                 "▪ Bairro *", 
                 value=st.session_state.get('bairro_busca', ''),
-                key="bairro"
+                key="bairro",
+                on_change=FormularioSnapshot.marcar_alterado
             )
         with col2:
             cidade = st.text_input(
                 "▪ Cidade *", 
                 value=st.session_state.get('cidade_busca', ''),
-                key="cidade"
+                key="cidade",
+                on_change=FormularioSnapshot.marcar_alterado
             )
         
         estado = st.text_input(
             "▪ Estado *", 
             value=st.session_state.get('estado_busca', ''),
-            key="estado"
+            key="estado",
+            on_change=FormularioSnapshot.marcar_alterado
         )
     
+    @secao('identificacao_responsavel')
     def renderizar_identificacao_responsavel(self):
         """Renderiza seção de identificação do responsável"""
         FormSectionRenderer.render_section_header(
@@ -186,11 +225,12 @@ class FormularioApp:
             "Dados da pessoa responsável pelo seguro."
         )
         
-        cpf = st.text_input("▪ CPF *", placeholder="Digite apenas números (11 dígitos)", key="cpf")
-        nome_completo = st.text_input("▪ Nome Completo *", key="nome_completo")
-        email = st.text_input("▪ E-mail *", key="email")
-        telefone = st.text_input("▪ Telefone *", placeholder="(11) 99999-9999", key="telefone")
+        cpf = st.text_input("▪ CPF *", placeholder="Digite apenas números (11 dígitos)", key="cpf", on_change=FormularioSnapshot.marcar_alterado)
+        nome_completo = st.text_input("▪ Nome Completo *", key="nome_completo", on_change=FormularioSnapshot.marcar_alterado)
+        email = st.text_input("▪ E-mail *", key="email", on_change=FormularioSnapshot.marcar_alterado)
+        telefone = st.text_input("▪ Telefone *", placeholder="(11) 99999-9999", key="telefone", on_change=FormularioSnapshot.marcar_alterado)
     
+    @secao('selecao_plano')
     def renderizar_selecao_plano(self):
         """Renderiza seção de seleção de planos"""
         FormSectionRenderer.render_section_header(
@@ -204,180 +244,77 @@ class FormularioApp:
         st.markdown("---")
         st.markdown("**💰 Escolha seu Plano:**")
         
-        # Criar opções formatadas
-        plano_opcoes = []
-        for plano, preco in PLANOS_SEGURO.items():
-            valor_formatado = ValueFormatter.formatar_valor_real(preco).replace("R$ ", "")
-            plano_opcoes.append(f"{plano} -\n{valor_formatado}/ano")
+        # Opções formatadas (geradas uma vez por processo)
+        plano_opcoes = PricingService.opcoes_planos()
         
         plano_selecionado = st.radio(
             "Plano",
             options=plano_opcoes,
             key="plano_radio",
+            on_change=FormularioSnapshot.marcar_alterado,
             label_visibility="collapsed",
             horizontal=True
         )
         
+        self._renderizar_simulacao_datas()
+        
         return plano_selecionado
     
+    def _renderizar_simulacao_datas(self):
+        """Tabela opcional com o prêmio de cada plano por data de solicitação"""
+        with st.expander("📅 Simular valores por data de solicitação"):
+            hoje = datetime.now().date()
+            col1, col2 = st.columns(2)
+            with col1:
+                inicio = st.date_input("De", value=hoje, format="DD/MM/YYYY", key="simulacao_inicio")
+            with col2:
+                fim = st.date_input("Até", value=hoje + timedelta(days=30), format="DD/MM/YYYY", key="simulacao_fim")
+            
+            grade = PricingService.grade_cotacoes(inicio, fim)
+            st.dataframe(grade.linhas(), hide_index=True, use_container_width=True)
+            st.caption("A inclusão ocorre no próximo dia útil após a solicitação.")
+            st.download_button(
+                "⬇️ Baixar CSV",
+                data=grade.to_csv(),
+                file_name=f"cotacoes_{inicio:%Y%m%d}_{fim:%Y%m%d}.csv",
+                mime="text/csv",
+                key="simulacao_csv"
+            )
+    
     def _renderizar_tabela_coberturas(self):
         """Renderiza tabela compacta de coberturas otimizada para mobile"""
         st.markdown("**📋 Coberturas Incluídas nos Planos:**")
         st.markdown("*Compare as opções e valores de cobertura disponíveis:*")
         
-        # Tabela responsiva com CSS customizado
-        st.markdown("""
-        <style>
-        .coverage-table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 10px 0;
-            font-size: 0.75rem;
-            background: white;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-        .coverage-table th {
-            background: linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 50%, #1a1a1a 100%);
-            color: white;
-            padding: 6px 4px;
-            text-align: center;
-            font-weight: bold;
-            font-size: 0.7rem;
-        }
-        .coverage-table td {
-            padding: 4px 3px;
-            text-align: center;
-            border-bottom: 1px solid #eee;
-            font-size: 0.7rem;
-        }
-        .coverage-table tr:nth-child(even) {
-            background-color: #f8f9fa;
-        }
-        .coverage-table tr:hover {
-            background-color: #e8f4f8;
-        }
-        .coverage-name {
-            text-align: left !important;
-            font-weight: 500;
-            padding-left: 6px !important;
-        }
-        .franchise-col {
-            color: #dc3545;
-            font-weight: 500;
-        }
-        .no-franchise {
-            background-color: #d4edda;
-            color: #155724;
-            font-weight: 500;
-        }
-        @media (max-width: 768px) {
-            .coverage-table {
-                font-size: 0.65rem;
-            }
-            .coverage-table th {
-                font-size: 0.6rem;
-                padding: 4px 2px;
-            }
-            .coverage-table td {
-                padding: 3px 2px;
-                font-size: 0.6rem;
-            }
-        }
-        </style>
-        """, unsafe_allow_html=True)
-        
-        # Tabela HTML compacta
-        st.markdown("""
-        <table class="coverage-table">
-            <thead>
-                <tr>
-                    <th style="width: 35%;">Coberturas</th>
-                    <th style="width: 15%;">Opção 1</th>
-                    <th style="width: 15%;">Opção 2</th>
-                    <th style="width: 15%;">Opção 3</th>
-                    <th style="width: 20%;">Franquia</th>
-                </tr>
-            </thead>
-            <tbody>
-                <tr>
-                    <td class="coverage-name">Incêndio, Raio e Explosão*</td>
-                    <td>250.000</td>
-                    <td>400.000</td>
-                    <td>700.000</td>
-                    <td class="franchise-col">30.000</td>
-                </tr>
-                <tr>
-                    <td class="coverage-name">Alagamento</td>
-                    <td>50.000</td>
-                    <td>100.000</td>
-                    <td>150.000</td>
-                    <td class="franchise-col">15.000</td>
-                </tr>
-                <tr>
-                    <td class="coverage-name">Danos Elétricos</td>
-                    <td>20.000</td>
-                    <td>50.000</td>
-                    <td>100.000</td>
-                    <td class="franchise-col">3.000</td>
-                </tr>
-                <tr>
-                    <td class="coverage-name">Pequenas Obras</td>
-                    <td>50.000</td>
-                    <td>100.000</td>
-                    <td>150.000</td>
-                    <td class="franchise-col">5.000</td>
-                </tr>
-                <tr>
-                    <td class="coverage-name">Perda/Pgto Aluguel (6m)</td>
-                    <td>20.000</td>
-                    <td>30.000</td>
-                    <td>40.000</td>
-                    <td class="no-franchise">Não Há</td>
-                </tr>
-                <tr>
-                    <td class="coverage-name">Vidros</td>
-                    <td>20.000</td>
-                    <td>50.000</td>
-                    <td>100.000</td>
-                    <td class="franchise-col">3.000</td>
-                </tr>
-                <tr>
-                    <td class="coverage-name">Tumultos</td>
-                    <td>100.000</td>
-                    <td>150.000</td>
-                    <td>200.000</td>
-                    <td class="franchise-col">5.000</td>
-                </tr>
-                <tr>
-                    <td class="coverage-name">Vendaval</td>
-                    <td>100.000</td>
-                    <td>150.000</td>
-                    <td>200.000</td>
-                    <td class="franchise-col">10.000</td>
-                </tr>
-            </tbody>
-        </table>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("<p style='font-size: 0.75rem; color: #555; margin-top: 5px;'>*Valor total em risco do conteúdo do quiosque a ser segurado.</p>", unsafe_allow_html=True)
+        # Tabela compacta (HTML renderizado uma vez por processo; o CSS vem do styles publicado)
+        st.markdown(TemplateRenderer.estatico('components/coverage_table.html'), unsafe_allow_html=True)
+    
+    def _renderizar_arquivos_anexados(self):
+        """Lista os arquivos já enviados ao spool com opção de remoção"""
+        arquivos = st.session_state.get('arquivos_upload') or []
+        for i, arquivo in enumerate(arquivos):
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.markdown(f"📎 **{arquivo.name}** ({arquivo.size / 1024 / 1024:.2f} MB)")
+            with col2:
+                if st.button("🗑️", key=f"remover_anexo_{arquivo.sha256[:16]}", help="Remover arquivo"):
+                    SpoolService.descartar([arquivo])
+                    st.session_state.arquivos_upload = arquivos[:i] + arquivos[i + 1:]
+                    st.rerun()
     
+    @secao('calculo_vigencia', depende_de=('plano_radio',))
     def renderizar_calculo_vigencia(self, plano_selecionado: str):
         """Renderiza cálculo de vigência e valores"""
-        if plano_selecionado:
-            plano_nome = plano_selecionado.split('\n')[0].replace(' -', '')
-            preco_anual = PLANOS_SEGURO[plano_nome]
-            
-            # Calcular pro rata usando próximo dia útil (considerando feriados)
-            data_inclusao = DateUtils.obter_proximo_dia_util()
-            dias_restantes = (DATA_FINAL_VIGENCIA - data_inclusao.replace(tzinfo=None)).days + 1
-            premio_pro_rata = round((preco_anual / 365) * dias_restantes, 2)
+        cotacao = PricingService.cotacao(plano_selecionado)
+        if cotacao:
+            # Pro rata usando próximo dia útil (considerando feriados) - tabela calculada uma vez por dia
+            data_inclusao = cotacao.data_inclusao
+            dias_restantes = cotacao.dias_restantes
+            premio_pro_rata = cotacao.premio_float
             
-            # Verificar se a data de inclusão é diferente de amanhã (indicando que pulou feriado/fim de semana)
-            amanha = datetime.now() + timedelta(days=1)
+            # Data de inclusão diferente de amanhã indica que pulou feriado/fim de semana
             observacao = ""
-            if data_inclusao.date() != amanha.date():
+            if cotacao.data_ajustada:
                 observacao = "* Data ajustada para próximo dia útil"
             
             # Quadro resumo da vigência centralizado com responsividade
@@ -476,12 +413,13 @@ class FormularioApp:
         
         if enviar:
             with st.spinner("▪ Processando sua solicitação..."):
-                # Criar modelo do formulário
-                formulario = FormularioSeguro.from_session_state(st.session_state)
-                dados = formulario.to_dict()
+                # Modelo do formulário (reaproveitado se nada mudou desde a última montagem)
+                dados = FormularioSnapshot.dados()
                 
                 # Validar
-                erros = FormValidator.validar_formulario_completo(dados)
+                # Erros por campo guardados na sessão: só o que mudou desde a última tentativa é revalidado
+                mapa_erros = st.session_state.setdefault('_mapa_erros', MapaErros())
+                erros = FormValidator.validar_formulario_completo(dados, mapa_erros)
                 
                 if erros:
                     st.error("**Por favor, corrija os seguintes campos:**")
@@ -497,14 +435,23 @@ class FormularioApp:
                             'id': f"GRUPO_{int(time.time())}",
                             'contador': 1,
                             'responsavel_principal': dados.get('nome_completo', ''),
-                            'email_principal': dados.get('email', '')
+                            'email_principal': dados.get('email', ''),
+                            'totais': TotalGrupo()
                         }
                     elif 'grupo_quiosques' in st.session_state:
                         # Já existe grupo - incrementar contador
                         st.session_state.grupo_quiosques['contador'] += 1
                     
+                    # Acumulado do grupo incluindo este quiosque (só é gravado após o envio)
+                    totais_grupo = None
+                    if 'grupo_quiosques' in st.session_state:
+                        totais_grupo = st.session_state.grupo_quiosques.get('totais', TotalGrupo())
+                        cotacao = PricingService.cotacao(st.session_state.get('plano_radio', ''))
+                        if cotacao:
+                            totais_grupo = totais_grupo.com(cotacao)
+                    
                     # Preparar dados para envio do email
-                    dados_email = self._preparar_dados_email(dados)
+                    dados_email = self._preparar_dados_email(dados, totais_grupo)
                     
                     # Coletar arquivos anexados
                     arquivos = []
@@ -516,9 +463,12 @@ class FormularioApp:
                     # Tentar enviar email
                     try:
                         email_service = EmailService()
-                        sucesso = email_service.enviar_formulario(dados_email, arquivos)
+                        resultado_envio = email_service.enviar_formulario(dados_email, arquivos)
                         
-                        if sucesso:
+                        if resultado_envio:
+                            if totais_grupo is not None:
+                                st.session_state.grupo_quiosques['totais'] = totais_grupo
+                            
                             # Verificar se está em modo de grupo (incluir outro quiosque)
                             if incluir_outro or 'grupo_quiosques' in st.session_state:
                                 # Verificar se é continuação do grupo ou finalização
@@ -570,6 +520,15 @@ class FormularioApp:
                                 
                                 # Rerun para mostrar tela de confirmação
                                 st.rerun()
+                        elif resultado_envio.parcial:
+                            # A solicitação já chegou: reenviar o formulário geraria uma duplicata
+                            enviadas = ", ".join(str(p) for p in resultado_envio.partes_enviadas)
+                            pendentes = ", ".join(str(p) for p in resultado_envio.partes_pendentes)
+                            st.error(f"**■ Solicitação {resultado_envio.id_submissao} enviada parcialmente**")
+                            st.error(f"▪ Emails enviados: {enviadas} de {resultado_envio.total_mensagens}. "
+                                     f"Não enviados (anexos): {pendentes}.")
+                            st.info("▪ Não envie o formulário novamente. Entre em contato conosco informando "
+                                    "o ID da solicitação para enviar os anexos restantes.")
                         else:
                             st.error("**■ Erro ao enviar solicitação**")
                             st.error("▪ Tente novamente ou entre em contato conosco.")
@@ -585,7 +544,7 @@ class FormularioApp:
                         st.error(f"▪ {str(e)}")
                         st.info("▪ Tente novamente ou entre em contato conosco.")
     
-    def _preparar_dados_email(self, dados_formulario: dict) -> dict:
+    def _preparar_dados_email(self, dados_formulario: dict, totais_grupo: TotalGrupo = None) -> dict:
         """Prepara dados formatados para o template de email"""
         # Obter dados da sessão para campos que podem ter sido preenchidos automaticamente
         razao_social = st.session_state.get('razao_social_busca', '') or dados_formulario.get('razao_social', '')
@@ -596,17 +555,11 @@ class FormularioApp:
         premio_formatado = ''
         dias_restantes = ''
         
-        if plano_selecionado:
-            from config import PLANOS_SEGURO, DATA_FINAL_VIGENCIA
-            plano_nome = plano_selecionado.split('\n')[0].replace(' -', '')
-            preco_anual = PLANOS_SEGURO.get(plano_nome, 0)
-            
-            data_inclusao = DateUtils.obter_proximo_dia_util()
-            dias_restantes_calc = (DATA_FINAL_VIGENCIA - data_inclusao.replace(tzinfo=None)).days + 1
-            premio_pro_rata = round((preco_anual / 365) * dias_restantes_calc, 2)
-            
-            premio_formatado = ValueFormatter.formatar_valor_real(premio_pro_rata)
-            dias_restantes = str(dias_restantes_calc)
+        cotacao = PricingService.cotacao(plano_selecionado)
+        if cotacao:
+            plano_nome = cotacao.plano
+            premio_formatado = ValueFormatter.formatar_valor_real(cotacao.premio_float)
+            dias_restantes = str(cotacao.dias_restantes)
         
         # Preparar informações de arquivos
         arquivos_info = []
@@ -623,14 +576,19 @@ class FormularioApp:
         
         # Preparar equipamentos
         equipamentos = []
-        if st.session_state.get('equipamentos'):
-            for eq in st.session_state.equipamentos:
-                if eq.get('tipo', '').strip():  # Só incluir equipamentos preenchidos
-                    equipamentos.append({
-                        'tipo': eq.get('tipo', ''),
-                        'descricao': eq.get('descricao', ''),
-                        'valor': eq.get('valor', '')
-                    })
+        total_equipamentos = 0
+        for eq in dados_formulario.get('equipamentos', []):
+            if eq.get('tipo', '').strip():  # Só incluir equipamentos preenchidos
+                centavos = eq.get('valor_centavos')
+                if centavos is not None:
+                    total_equipamentos += centavos
+                equipamentos.append({
+                    'tipo': eq.get('tipo', ''),
+                    'descricao': eq.get('descricao', ''),
+                    'valor': eq.get('valor', ''),
+                    'valor_centavos': centavos,
+                    'valor_formatado': ValueFormatter.formatar_centavos(centavos) if centavos is not None else ''
+                })
         
         return {
             'nome_completo': dados_formulario.get('nome_completo', ''),
@@ -649,9 +607,10 @@ class FormularioApp:
             'premio_formatado': premio_formatado,
             'dias_restantes': dias_restantes,
             'equipamentos': equipamentos,
+            'equipamentos_total': ValueFormatter.formatar_centavos(total_equipamentos) if total_equipamentos else '',
             'arquivos_info': arquivos_info,
             'incluir_outro_quiosque': st.session_state.get('incluir_outro_quiosque', False),
-            'grupo_info': self._obter_info_grupo()
+            'grupo_info': self._obter_info_grupo(totais_grupo)
         }
     
     def _resetar_formulario(self):
@@ -670,7 +629,7 @@ class FormularioApp:
             'plano_radio',
             
             # Equipamentos
-            'equipamentos', 'num_equipamentos',
+            'equipamentos', 'equipamentos_base', 'equipamentos_colar',
             
             # Arquivos
             'arquivos_upload',
@@ -685,11 +644,17 @@ class FormularioApp:
             'grupo_quiosques'
         ]
         
+        # Remover spool de arquivos da sessão
+        SpoolService.limpar_sessao(st.session_state)
+        
         # Resetar todas as chaves
         for chave in chaves_para_resetar:
             if chave in st.session_state:
                 del st.session_state[chave]
         
+        # Novo editor de equipamentos (descarta as edições pendentes do anterior)
+        EquipamentosSection.limpar()
+        
         # Limpar dados de busca automática
         campos_busca = [
             'razao_social_busca', 'logradouro_busca', 'bairro_busca', 
@@ -716,7 +681,7 @@ class FormularioApp:
             'plano_radio',
             
             # Equipamentos
-            'equipamentos', 'num_equipamentos',
+            'equipamentos', 'equipamentos_base', 'equipamentos_colar',
             
             # Arquivos
             'arquivos_upload',
@@ -728,11 +693,17 @@ class FormularioApp:
             'formulario_enviado', 'show_errors'
         ]
         
+        # Remover arquivos já enviados do spool
+        SpoolService.descartar(st.session_state.get('arquivos_upload'))
+        
         # Resetar todas as chaves
         for chave in chaves_para_resetar:
             if chave in st.session_state:
                 del st.session_state[chave]
         
+        # Novo editor de equipamentos (descarta as edições pendentes do anterior)
+        EquipamentosSection.limpar()
+        
         # Limpar dados de busca automática
         campos_busca = [
             'razao_social_busca', 'logradouro_busca', 'bairro_busca', 
@@ -743,16 +714,18 @@ class FormularioApp:
             if campo in st.session_state:
                 del st.session_state[campo]
     
-    def _obter_info_grupo(self):
+    def _obter_info_grupo(self, totais_grupo: TotalGrupo = None):
         """Obtém informações do grupo de quiosques se existir"""
         if 'grupo_quiosques' in st.session_state:
             grupo = st.session_state.grupo_quiosques
+            totais = totais_grupo or grupo.get('totais')
             return {
                 'pertence_grupo': True,
                 'grupo_id': grupo['id'],
                 'numero_quiosque': grupo['contador'],
                 'responsavel_principal': grupo['responsavel_principal'],
-                'email_principal': grupo['email_principal']
+                'email_principal': grupo['email_principal'],
+                'totais': totais.resumo() if totais else None
             }
         else:
             return {
@@ -760,127 +733,43 @@ class FormularioApp:
                 'grupo_id': None,
                 'numero_quiosque': 1,
                 'responsavel_principal': None,
-                'email_principal': None
+                'email_principal': None,
+                'totais': None
             }
     
-    def executar(self):
-        """Executa a aplicação principal"""
-        self.inicializar()
+    def _renderizar_resumo_grupo(self):
+        """Mostra o acumulado do grupo (quantidade por plano, prêmio total e período)"""
+        grupo = st.session_state.get('grupo_quiosques') or {}
+        totais = grupo.get('totais')
+        if not totais or not totais.quiosques:
+            return
         
-        # Adicionar âncora invisível no topo absoluto
-        st.markdown('<div id="topo-pagina" style="position: absolute; top: 0; left: 0; width: 1px; height: 1px;"></div>', unsafe_allow_html=True)
+        resumo = totais.resumo()
+        planos = " • ".join(f"{p['plano']}: {p['quantidade']}" for p in resumo['planos'])
+        periodo = resumo['data_inicial']
+        if resumo['data_final'] != resumo['data_inicial']:
+            periodo = f"{resumo['data_inicial']} a {resumo['data_final']}"
         
-        # Verificar se deve fazer scroll ao topo (via localStorage ou session_state)
-        st.markdown("""
-        <script>
-            // Verificar se deve fazer scroll baseado no localStorage
-            if (localStorage.getItem('scroll_to_top_on_load') === 'true') {
-                // Limpar flag
-                localStorage.removeItem('scroll_to_top_on_load');
-                
-                // Função para forçar scroll ao topo de forma agressiva
-                function forcarScrollTopoReload() {
-                    // Método 1: Window scroll
-                    window.scrollTo({top: 0, left: 0, behavior: 'instant'});
-                    
-                    // Método 2: Document scroll
-                    document.documentElement.scrollTop = 0;
-                    document.body.scrollTop = 0;
-                    
-                    // Método 3: Scroll para elemento âncora
-                    const topoElement = document.getElementById('topo-pagina');
-                    if (topoElement) {
-                        topoElement.scrollIntoView({behavior: 'instant', block: 'start'});
-                    }
-                    
-                    // Método 4: Hash navigation
-                    window.location.hash = '#topo-pagina';
-                    setTimeout(() => {
-                        window.location.hash = '';
-                        window.scrollTo(0, 0);
-                    }, 50);
-                    
-                    // Método 5: Scroll manual de todos elementos scrolláveis
-                    const scrollableElements = document.querySelectorAll('*');
-                    scrollableElements.forEach(el => {
-                        if (el.scrollTop > 0) {
-                            el.scrollTop = 0;
-                        }
-                    });
-                }
-                
-                // Executar imediatamente
-                forcarScrollTopoReload();
-                
-                // Executar após DOM pronto
-                document.addEventListener('DOMContentLoaded', forcarScrollTopoReload);
-                
-                // Múltiplas tentativas agressivas
-                setTimeout(forcarScrollTopoReload, 10);
-                setTimeout(forcarScrollTopoReload, 50);
-                setTimeout(forcarScrollTopoReload, 100);
-                setTimeout(forcarScrollTopoReload, 200);
-                setTimeout(forcarScrollTopoReload, 300);
-                setTimeout(forcarScrollTopoReload, 500);
-                setTimeout(forcarScrollTopoReload, 800);
-                setTimeout(forcarScrollTopoReload, 1000);
-                setTimeout(forcarScrollTopoReload, 1500);
-                
-                // Observer para garantir scroll quando elementos mudarem
-                const observer = new MutationObserver(function() {
-                    setTimeout(forcarScrollTopoReload, 10);
-                });
-                observer.observe(document.body, {childList: true, subtree: true});
-                
-                // Desativar observer após 3 segundos
-                setTimeout(() => observer.disconnect(), 3000);
-            }
-        </script>
+        st.markdown(f"""
+        <div style="background: #f8f9fa; border: 2px solid #28a745; border-radius: 10px;
+                    padding: 1rem 1.5rem; margin: 10px 0; text-align: center;">
+            <h3 style="margin: 0 0 0.5rem 0; color: #1a1a1a;">▪ Resumo do Grupo</h3>
+            <p style="margin: 0; color: #333; line-height: 1.6;">
+                <strong>{resumo['quiosques']} quiosque(s)</strong> | {planos}<br>
+                Prêmio total pró-rata: <strong>{resumo['premio_total_formatado']}</strong><br>
+                Inclusão: {periodo}
+            </p>
+        </div>
         """, unsafe_allow_html=True)
+    
+    def executar(self):
+        """Executa a aplicação principal"""
+        self.inicializar()
         
-        # Verificar se deve fazer scroll ao topo (session_state - fallback)
+        # Rolagem ao topo: componente enviado apenas quando solicitado
         if st.session_state.get('scroll_to_top', False):
-            # Limpar flag
             st.session_state.scroll_to_top = False
-            
-            # Componente HTML para scroll via session_state
-            components.html("""
-            <script>
-                function scrollTopoParent() {
-                    // Scroll na janela pai
-                    parent.window.scrollTo({top: 0, left: 0, behavior: 'instant'});
-                    parent.document.documentElement.scrollTop = 0;
-                    parent.document.body.scrollTop = 0;
-                    
-                    // Tentar scroll no elemento âncora
-                    const topoEl = parent.document.getElementById('topo-pagina');
-                    if (topoEl) {
-                        topoEl.scrollIntoView({behavior: 'instant', block: 'start'});
-                    }
-                    
-                    // Scroll em todos elementos scrolláveis do pai
-                    const allElements = parent.document.querySelectorAll('*');
-                    allElements.forEach(el => {
-                        if (el.scrollTop > 0) {
-                            el.scrollTop = 0;
-                        }
-                    });
-                }
-                
-                // Executar imediatamente
-                scrollTopoParent();
-                
-                // Múltiplas tentativas
-                setTimeout(scrollTopoParent, 10);
-                setTimeout(scrollTopoParent, 50);
-                setTimeout(scrollTopoParent, 100);
-                setTimeout(scrollTopoParent, 200);
-                setTimeout(scrollTopoParent, 300);
-                setTimeout(scrollTopoParent, 500);
-                setTimeout(scrollTopoParent, 800);
-                setTimeout(scrollTopoParent, 1000);
-            </script>
-            """, height=0)
+            rolar_para_topo(preservar=('formulario_enviado_normal', 'grupo_finalizado', 'quiosque_enviado_grupo'))
         
         # Verificar se acabou de enviar um formulário normal (tela de confirmação)
         if st.session_state.get('formulario_enviado_normal', False):
@@ -891,19 +780,11 @@ class FormularioApp:
             primeiro_nome = st.session_state.get('primeiro_nome_normal', '')
             
             # Tela de confirmação estilizada para formulário normal
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
-                        color: white; padding: 2rem; border-radius: 15px; 
-                        margin: 20px 0; text-align: center; 
-                        box-shadow: 0 10px 30px rgba(40, 167, 69, 0.3);">
-                <h1 style="margin: 0 0 1rem 0; font-size: 2rem;">✅ Formulário Encaminhado com Sucesso!</h1>
-                <h2 style="margin: 0 0 1.5rem 0; font-size: 1.3rem;">Obrigado, {primeiro_nome}!</h2>
-                <p style="margin: 0 0 1.5rem 0; font-size: 1.1rem; line-height: 1.6;">
-                    Sua solicitação foi enviada e processada com sucesso.<br>
-                    <strong>▪ Nossa equipe analisará sua solicitação e entrará em contato em breve.</strong>
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(TemplateRenderer.renderizar(
+                'components/confirmation_screen.html',
+                tipo='normal',
+                primeiro_nome=primeiro_nome
+            ), unsafe_allow_html=True)
             
             # Botão para preencher outro formulário
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -946,20 +827,14 @@ class FormularioApp:
             total_quiosques = st.session_state.get('total_quiosques_grupo', 1)
             
             # Tela de confirmação estilizada para finalização do grupo
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
-                        color: white; padding: 2rem; border-radius: 15px; 
-                        margin: 20px 0; text-align: center; 
-                        box-shadow: 0 10px 30px rgba(40, 167, 69, 0.3);">
-                <h1 style="margin: 0 0 1rem 0; font-size: 2rem;">🎉 Todos os Quiosques Cadastrados!</h1>
-                <h2 style="margin: 0 0 1.5rem 0; font-size: 1.3rem;">Parabéns, {primeiro_nome}!</h2>
-                <p style="margin: 0 0 1.5rem 0; font-size: 1.1rem; line-height: 1.6;">
-                    <strong>✓ Total de {total_quiosques} quiosques enviados com sucesso!</strong><br>
-                    Todas as suas solicitações foram processadas e enviadas.<br>
-                    <strong>▪ Nossa equipe analisará suas solicitações e entrará em contato em breve.</strong>
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(TemplateRenderer.renderizar(
+                'components/confirmation_screen.html',
+                tipo='grupo_finalizado',
+                primeiro_nome=primeiro_nome,
+                total_quiosques=total_quiosques
+            ), unsafe_allow_html=True)
+            
+            self._renderizar_resumo_grupo()
             
             # Parar execução aqui para manter o pop-up visível
             return
@@ -975,19 +850,15 @@ class FormularioApp:
             primeiro_nome = st.session_state.get('primeiro_nome_enviado', '')
             
             # Tela de confirmação estilizada
-            st.markdown(f"""
-            <div style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); 
-                        color: white; padding: 2rem; border-radius: 15px; 
-                        margin: 20px 0; text-align: center; 
-                        box-shadow: 0 10px 30px rgba(40, 167, 69, 0.3);">
-                <h1 style="margin: 0 0 1rem 0; font-size: 2rem;">✅ Quiosque {contador} Enviado!</h1>
-                <h2 style="margin: 0 0 1.5rem 0; font-size: 1.3rem;">Parabéns, {primeiro_nome}!</h2>
-                <p style="margin: 0 0 1.5rem 0; font-size: 1.1rem; line-height: 1.6;">
-                    Os dados do quiosque {contador} foram enviados e processados com sucesso.<br>
-                    <strong>Próximo passo:</strong> Preencher os dados do Quiosque {proximo_numero} do mesmo grupo.
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(TemplateRenderer.renderizar(
+                'components/confirmation_screen.html',
+                tipo='quiosque_grupo',
+                primeiro_nome=primeiro_nome,
+                contador=contador,
+                proximo_numero=proximo_numero
+            ), unsafe_allow_html=True)
+            
+            self._renderizar_resumo_grupo()
             
             # Botão nativo do Streamlit (muito mais confiável)
             col1, col2, col3 = st.columns([1, 2, 1])
@@ -1039,9 +910,6 @@ class FormularioApp:
         # Seleção de plano primeiro
         plano_selecionado = self.renderizar_selecao_plano()
         
-        # Nota: CSS responsivo de equipamentos movido para src/components/form_sections.py
-        # para melhor organização e layout intercalado em mobile
-        
         # Agora renderizar equipamentos após seleção do plano
         equipamentos = EquipamentosSection.render()
         
@@ -1107,19 +975,35 @@ class FormularioApp:
         """, unsafe_allow_html=True)
         
         # Upload de arquivos apenas com drag & drop
+        # A chave do widget muda após cada envio ao spool para que o Streamlit
+        # descarte sua cópia em memória - a sessão guarda apenas as referências
+        versao_upload = st.session_state.get('upload_widget_versao', 0)
         arquivos_upload = st.file_uploader(
             "Área de upload",
-            type=['jpg', 'jpeg', 'png', 'pdf', 'xlsx'],
+            type=UPLOAD_CONFIG["extensoes_permitidas"],
             accept_multiple_files=True,
-            key="arquivos_upload",
+            key=f"arquivos_upload_widget_{versao_upload}",
             help="Tipos aceitos: JPG, JPEG, PNG, PDF, XLSX • Máximo: 10MB por arquivo",
             label_visibility="collapsed"
         )
         
-        # Usar apenas arquivos de upload
-        arquivos = []
         if arquivos_upload:
-            arquivos.extend(arquivos_upload)
+            # Tipo real verificado pelos primeiros bytes antes de copiar o arquivo inteiro
+            tamanho_atual = sum(a.size for a in st.session_state.get('arquivos_upload') or [])
+            aceitos, tipos, erros_upload = FileValidator.filtrar_uploads(arquivos_upload, tamanho_atual)
+            for arquivo in arquivos_upload:
+                if arquivo not in aceitos:
+                    SpoolService.liberar_upload_streamlit(arquivo)
+            
+            SpoolService.adicionar_arquivos(st.session_state, aceitos, tipos=tipos)
+            st.session_state.upload_erros = erros_upload
+            st.session_state.upload_widget_versao = versao_upload + 1
+            st.rerun()
+        
+        for erro in st.session_state.pop('upload_erros', []):
+            st.error(f"✗ {erro}")
+        
+        self._renderizar_arquivos_anexados()
         
         # Cálculo do valor por último
         premio_calculado = self.renderizar_calculo_vigencia(plano_selecionado)
@@ -1130,6 +1014,10 @@ class FormularioApp:
 def main():
     """Função principal"""
     app = FormularioApp()
+    if st.query_params.get('pagina') == 'admin':
+        app.inicializar()
+        AdminLotePage.render()
+        return
     app.executar()
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 """
 Configurações do Sistema de Adesão de Seguro
 """
+import os
+import tempfile
 from datetime import datetime
 
 # ==================== CONFIGURAÇÕES DOS PLANOS ====================
@@ -14,6 +16,21 @@ PLANOS_SEGURO = {
 # Data final de vigência fixa
 DATA_FINAL_VIGENCIA = datetime(2025, 12, 8)
 
+# ==================== CALENDÁRIO DE DIAS ÚTEIS ====================
+
+CALENDARIO_CONFIG = {
+    # Intervalo de anos pré-calculado (relativo ao ano corrente)
+    "anos_anteriores": 1,
+    "anos_seguintes": 5,
+    # Artefato gerado por `python -m src.utils.calendario` (evita importar holidays na partida)
+    "arquivo_feriados": os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "feriados_rj.json"),
+    # Feriados municipais do Rio de Janeiro não incluídos na biblioteca holidays
+    "feriados_municipais": {
+        (1, 20): 'São Sebastião',
+        (3, 1): 'Aniversário da Cidade do Rio de Janeiro'
+    }
+}
+
 # ==================== CONFIGURAÇÕES DE API ====================
 
 API_URLS = {
@@ -26,14 +43,89 @@ TIMEOUT_CONFIG = {
     "max_retries": 2
 }
 
+# ==================== CONFIGURAÇÕES DE UPLOAD ====================
+
+UPLOAD_CONFIG = {
+    # Diretório raiz do spool (uma subpasta por sessão)
+    "spool_dir": os.getenv("FORMULARIO_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "formulario_spool"),
+    "spool_ttl_segundos": 6 * 60 * 60,
+    "intervalo_limpeza_segundos": 10 * 60,
+    "chunk_size": 1024 * 1024,
+    # Extensões aceitas pelo uploader (mesma lista validada pelo FileValidator)
+    "extensoes_permitidas": ['jpg', 'jpeg', 'png', 'pdf', 'xlsx'],
+    # Quantidade de bytes lida do início do arquivo para detectar o tipo real
+    "bytes_sniff": 8192
+}
+
+# ==================== IMPORTAÇÃO DE EQUIPAMENTOS ====================
+
+IMPORTACAO_CONFIG = {
+    # Planilhas aceitas na importação em lote (XLSX depende do openpyxl)
+    "extensoes": ['xlsx', 'csv'],
+    # Itens aceitos por importação; o restante da planilha nem é lido
+    "max_linhas": 5000,
+    # Quantos motivos de rejeição são exibidos (a contagem é sempre completa)
+    "max_motivos": 10
+}
+
+NFE_CONFIG = {
+    # Tamanho máximo de cada XML de NF-e
+    "max_tamanho": 5 * 1024 * 1024,
+    # Notas já lidas mantidas em memória (pelo hash do conteúdo, só os itens extraídos)
+    "max_cache": 256,
+    # Total de itens guardados no cache, somando todas as notas (compartilhado entre sessões)
+    "max_cache_itens": 20000
+}
+
+# ==================== VALIDAÇÃO EM LOTE ====================
+
+LOTE_CONFIG = {
+    # Linhas lidas e validadas de uma vez (memória constante em arquivos grandes)
+    "tamanho_bloco": 5000,
+    # Página administrativa (?pagina=admin): desabilitada sem senha definida
+    "admin_senha": os.getenv("FORMULARIO_ADMIN_SENHA", ""),
+    # Linhas com erro exibidas na página (o relatório para download é completo)
+    "max_linhas_exibidas": 200
+}
+
+# ==================== OTIMIZAÇÃO DE ANEXOS ====================
+
+IMAGE_CONFIG = {
+    "otimizar_imagens": os.getenv("FORMULARIO_OTIMIZAR_IMAGENS", "1") != "0",
+    # Maior lado (em pixels) mantido após o redimensionamento
+    "max_dimensao": 1920,
+    "qualidade_jpeg": 82,
+    # Imagens menores que isso são anexadas como estão
+    "tamanho_minimo": 300 * 1024
+}
+
+# ==================== CONFIGURAÇÕES DE EMAIL ====================
+
+EMAIL_CONFIG = {
+    # Tamanho máximo de cada mensagem (HTML + anexos já codificados em base64)
+    "limite_mensagem_bytes": 20 * 1024 * 1024,
+    # Reserva para o HTML das mensagens de continuação
+    "margem_continuacao_bytes": 16 * 1024,
+    # Cabeçalhos e metadados de cada anexo
+    "overhead_anexo_bytes": 1024
+}
+
+# ==================== PROCESSAMENTO EM SEGUNDO PLANO ====================
+
+WORKER_CONFIG = {
+    # Codificação base64, otimização de imagens e template rodam fora da thread do script
+    "usar_processos": os.getenv("FORMULARIO_USAR_PROCESSOS", "1") != "0",
+    "max_workers": 2
+}
+
 # ==================== REGEX PATTERNS ====================
 
 REGEX_PATTERNS = {
     "email": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-    "cnpj": r'^\d{14}$',
-    "cep": r'^\d{8}$',
-    "cpf": r'^\d{11}$',
-    "telefone": r'^\d{10,11}$'
+    "cnpj": r'^[0-9]{14}$',
+    "cep": r'^[0-9]{8}$',
+    "cpf": r'^[0-9]{11}$',
+    "telefone": r'^[0-9]{10,11}$'
 }
 
 # ==================== CONFIGURAÇÕES DA APLICAÇÃO ====================
@@ -42,14 +134,26 @@ APP_CONFIG = {
     "page_title": "Adesão do Seguro Incêndio Orla Rio",
     "page_icon": "🛡️",
     "layout": "centered",
-    "logo_path": "logo.png"
+    "logo_path": "logo.png",
+    # Larguras (px) das variantes do logo no cabeçalho: 1x, 2x e 3x da largura exibida
+    "logo_larguras": [100, 200, 300],
+    "css_path": "styles.css",
+    # CSS constante dos componentes, publicado junto com o styles.css
+    "css_componentes": ["templates/styles/coverage_table.css"],
+    "templates_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"),
+    # Pasta servida pelo Streamlit em app/static (ver .streamlit/config.toml)
+    "static_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), "static"),
+    # Cada seção do formulário roda como st.fragment (reexecução isolada por interação)
+    "usar_fragmentos": os.getenv("FORMULARIO_USAR_FRAGMENTOS", "1") != "0",
+    # Depuração: o navegador devolve o tempo da rolagem ao topo (custa uma reexecução extra do script)
+    "medir_rolagem": os.getenv("FORMULARIO_MEDIR_ROLAGEM", "0") == "1"
 }
 
 # ==================== MENSAGENS ====================
 
 MENSAGENS = {
     "logo_nao_encontrado": "⚠️ Logo não encontrado.",
-    "cnpj_invalido": "❌ CNPJ deve conter apenas 14 números",
+    "cnpj_invalido": "❌ CNPJ inválido: confira os 14 números digitados",
     "cpf_invalido": "❌ CPF deve conter apenas 11 números",
     "cep_invalido": "❌ CEP deve conter apenas 8 números",
     "timeout_cnpj": "⏱️ Timeout na consulta do CNPJ. Tente novamente.",
@@ -59,17 +163,31 @@ MENSAGENS = {
 
 # ==================== VALIDAÇÕES ====================
 
-CAMPOS_OBRIGATORIOS = {
-    'nome_completo': 'Nome completo',
-    'cpf': 'CPF',
-    'email': 'E-mail',
-    'telefone': 'Telefone',
-    'cnpj': 'CNPJ',
-    'cep': 'CEP',
-    'logradouro': 'Logradouro',
-    'numero': 'Número',
-    'bairro': 'Bairro',
-    'cidade': 'Cidade',
-    'estado': 'Estado',
-    'plano_selecionado': 'Plano de seguro'
-} 
\ No newline at end of file
+# Esquema declarativo dos campos, compilado uma vez em um validador de passagem única
+# (EsquemaCompilado em src/validators/form_validators.py). A ordem é a ordem dos erros exibidos.
+#   normalizar: 'texto' (sem espaços nas pontas) ou 'digitos' (só os números)
+#   padrao: nome em REGEX_PATTERNS; min_palavras: quantidade mínima de palavras
+#   digito_verificador: 'cpf' ou 'cnpj' (conferido depois do padrão, com mensagem_digito)
+ESQUEMA_CAMPOS = {
+    'nome_completo': {'rotulo': 'Nome completo', 'obrigatorio': True, 'min_palavras': 2,
+                      'mensagem': "Nome completo deve ter pelo menos nome e sobrenome"},
+    'cpf': {'rotulo': 'CPF', 'obrigatorio': True, 'normalizar': 'digitos', 'padrao': 'cpf',
+            'mensagem': "CPF deve conter exatamente 11 números",
+            'digito_verificador': 'cpf', 'mensagem_digito': "CPF inválido: confira os números digitados"},
+    'email': {'rotulo': 'E-mail', 'obrigatorio': True, 'padrao': 'email', 'mensagem': "E-mail inválido"},
+    'telefone': {'rotulo': 'Telefone', 'obrigatorio': True, 'normalizar': 'digitos', 'padrao': 'telefone',
+                 'mensagem': "Telefone deve ter 10 ou 11 dígitos"},
+    'cnpj': {'rotulo': 'CNPJ', 'obrigatorio': True, 'normalizar': 'digitos', 'padrao': 'cnpj',
+             'mensagem': "CNPJ deve conter exatamente 14 números",
+             'digito_verificador': 'cnpj', 'mensagem_digito': "CNPJ inválido: confira os números digitados"},
+    'cep': {'rotulo': 'CEP', 'obrigatorio': True, 'normalizar': 'digitos', 'padrao': 'cep',
+            'mensagem': "CEP deve conter exatamente 8 números"},
+    'logradouro': {'rotulo': 'Logradouro', 'obrigatorio': True},
+    'numero': {'rotulo': 'Número', 'obrigatorio': True},
+    'bairro': {'rotulo': 'Bairro', 'obrigatorio': True},
+    'cidade': {'rotulo': 'Cidade', 'obrigatorio': True},
+    'estado': {'rotulo': 'Estado', 'obrigatorio': True},
+    'plano_selecionado': {'rotulo': 'Plano de seguro', 'obrigatorio': True}
+}
+
+CAMPOS_OBRIGATORIOS = {campo: regra['rotulo'] for campo, regra in ESQUEMA_CAMPOS.items() if regra.get('obrigatorio')}
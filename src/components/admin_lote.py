@@ -0,0 +1,105 @@
+import io
+import hmac
+from typing import Iterator, List
+import pandas as pd
+import streamlit as st
+from src.validators.lote_validator import ErroLinha, ValidadorLote
+from config import CAMPOS_OBRIGATORIOS, LOTE_CONFIG
+
+class AdminLotePage:
+    """Página administrativa (?pagina=admin): validação em lote de listas de cadastros"""
+
+    AUTENTICADO_KEY = 'admin_autenticado'
+    RESULTADO_KEY = 'admin_lote_resultado'
+
+    @staticmethod
+    def habilitada() -> bool:
+        return bool(LOTE_CONFIG["admin_senha"])
+
+    @staticmethod
+    def _autenticar():
+        """Callback: confere a senha digitada"""
+        senha = st.session_state.get('admin_senha', '')
+        st.session_state[AdminLotePage.AUTENTICADO_KEY] = hmac.compare_digest(
+            senha.encode(), LOTE_CONFIG["admin_senha"].encode())
+        st.session_state.admin_senha = ''
+
+    @staticmethod
+    def _validar():
+        """Callback: valida o arquivo enviado e guarda o resumo, as primeiras linhas com erro e o relatório"""
+        arquivo = st.session_state.get('admin_lote_arquivo')
+        if arquivo is None:
+            st.session_state[AdminLotePage.RESULTADO_KEY] = {'erro': "Selecione um arquivo para validar"}
+            return
+
+        validador = ValidadorLote()
+        exibidas: List[ErroLinha] = []
+
+        def coletar(erros: Iterator[ErroLinha]) -> Iterator[ErroLinha]:
+            for erro_linha in erros:
+                if len(exibidas) < LOTE_CONFIG["max_linhas_exibidas"]:
+                    exibidas.append(erro_linha)
+                yield erro_linha
+
+        relatorio = io.StringIO()
+        try:
+            validador.escrever_relatorio(coletar(validador.validar_arquivo(arquivo)), relatorio)
+        except Exception as e:
+            st.session_state[AdminLotePage.RESULTADO_KEY] = {'erro': f"Não foi possível ler '{arquivo.name}': {e}"}
+            return
+        st.session_state[AdminLotePage.RESULTADO_KEY] = {
+            'nome': arquivo.name,
+            'resumo': validador.resumo,
+            'exibidas': exibidas,
+            'relatorio': relatorio.getvalue().encode('utf-8-sig')
+        }
+
+    @staticmethod
+    def _mostrar_resultado():
+        resultado = st.session_state.get(AdminLotePage.RESULTADO_KEY)
+        if not resultado:
+            return
+        if 'erro' in resultado:
+            st.error(resultado['erro'])
+            return
+
+        resumo = resultado['resumo']
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Linhas", resumo.linhas)
+        col2.metric("Válidas", resumo.linhas_validas)
+        col3.metric("Com erro", resumo.linhas_com_erro)
+        if resumo.colunas_ausentes:
+            st.warning("Colunas não encontradas no cabeçalho: " +
+                       ", ".join(CAMPOS_OBRIGATORIOS[c] for c in resumo.colunas_ausentes))
+        if not resumo.linhas_com_erro:
+            st.success("✅ Nenhum erro encontrado")
+            return
+
+        st.dataframe(pd.DataFrame(
+            [{'Linha': e.linha, 'Campo': CAMPOS_OBRIGATORIOS.get(campo, campo), 'Erro': mensagem}
+             for e in resultado['exibidas'] for campo, mensagem in e.erros]
+        ), hide_index=True, use_container_width=True)
+        if resumo.linhas_com_erro > len(resultado['exibidas']):
+            st.caption(f"Exibindo as primeiras {len(resultado['exibidas'])} linhas com erro. "
+                       "O relatório completo está disponível para download.")
+        st.download_button("⬇️ Baixar relatório de erros (CSV)", data=resultado['relatorio'],
+                           file_name=f"erros_{resultado['nome'].rsplit('.', 1)[0]}.csv", mime="text/csv")
+
+    @staticmethod
+    def render():
+        """Renderiza a página administrativa"""
+        st.title("Validação de cadastros em lote")
+        if not AdminLotePage.habilitada():
+            st.error("Página administrativa desabilitada (defina FORMULARIO_ADMIN_SENHA)")
+            return
+        if not st.session_state.get(AdminLotePage.AUTENTICADO_KEY):
+            st.text_input("Senha", type="password", key="admin_senha", on_change=AdminLotePage._autenticar)
+            if AdminLotePage.AUTENTICADO_KEY in st.session_state:
+                st.error("Senha incorreta")
+            return
+
+        st.caption("Planilha XLSX ou CSV com um cadastro por linha e os nomes dos campos no cabeçalho "
+                   "(" + ", ".join(CAMPOS_OBRIGATORIOS.values()) + ").")
+        st.file_uploader("Arquivo de cadastros", type=['xlsx', 'csv'], key='admin_lote_arquivo')
+        st.button("Validar arquivo", type="primary", on_click=AdminLotePage._validar)
+        AdminLotePage._mostrar_resultado()
@@ -2,9 +2,9 @@ import streamlit as st
 from typing import Tuple, List, Dict, Any
 from src.controllers.form_controller import FormularioController, EquipamentosController, PlanoController
 from src.managers.state_manager import FormularioStateManager
+from src.services.pricing_service import PricingService
 from src.utils.formatters import ValueFormatter
 from config import DATA_FINAL_VIGENCIA
-from datetime import datetime, timedelta
 
 class EnhancedFormRenderer:
     """Renderizador aprimorado de formulários com separação de responsabilidades"""
@@ -285,8 +285,10 @@ class ValueDisplaySection:
         if not plano_selecionado:
             return 0.0
         
-        plano_nome = controller.obter_plano_formatado(plano_selecionado)
-        dias_restantes, premio_pro_rata = controller.calcular_premio_pro_rata(plano_nome)
+        cotacao = PricingService.cotacao(plano_selecionado)
+        if not cotacao:
+            return 0.0
+        dias_restantes, premio_pro_rata = cotacao.dias_restantes, cotacao.premio_float
         
         # Seção de vigência
         st.markdown("""
@@ -296,7 +298,7 @@ class ValueDisplaySection:
         """, unsafe_allow_html=True)
         
         st.markdown("**📅 Período de Vigência:**")
-        data_inclusao = datetime.now() + timedelta(days=1)
+        data_inclusao = cotacao.data_inclusao
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -1,8 +1,16 @@
+import pandas as pd
 import streamlit as st
 from typing import Tuple, List, Dict, Any
-from src.models.formulario import Equipamento
+from src.models.formulario import Equipamento, TabelaEquipamentos
+from src.managers.state_manager import FormularioSnapshot
 from src.services.api_service import ApiService
 from src.validators.form_validators import FormValidator
+from src.components.fragmentos import secao
+from src.components.template_renderer import TemplateRenderer
+from src.utils.formatters import ValueFormatter
+from src.services.importacao_service import ImportacaoEquipamentosService, ResultadoImportacao
+from src.services.nfe_service import NfeService
+from config import IMPORTACAO_CONFIG
 
 class FormSectionRenderer:
     """Classe para renderização de seções do formulário"""
@@ -32,7 +40,8 @@ class FormSectionRenderer:
             value=st.session_state.get(field_name, ''),
             help=help_text,
             placeholder=placeholder,
-            key=field_name
+            key=field_name,
+            on_change=FormularioSnapshot.marcar_alterado
         )
         
         # Verificar se o valor mudou e fazer busca automática
@@ -42,6 +51,8 @@ class FormSectionRenderer:
         # Se o valor mudou desde a última verificação
         if value != st.session_state.get(last_value_key, ''):
             st.session_state[last_value_key] = value
+            # Dados de busca serão limpos/refeitos: os campos preenchidos por eles mudam
+            FormularioSnapshot.marcar_alterado()
             
             # Limpar indicador de busca anterior quando o valor muda
             if field_name == 'cnpj':
@@ -83,19 +94,22 @@ class FormSectionRenderer:
     @staticmethod
     def render_section_header(title: str, description: str):
         """Renderiza cabeçalho de seção"""
-        st.markdown(f"""
-        <div class="form-section">
-            <div class="section-title">{title}</div>
-            <p style="color: var(--text-secondary); margin-bottom: 1.5rem; font-size: 0.95rem;">
-                {description}
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(TemplateRenderer.renderizar(
+            'sections/form_section.html',
+            section_title=title,
+            section_description=description
+        ), unsafe_allow_html=True)
 
 class EquipamentosSection:
     """Componente especializado para seção de equipamentos"""
     
+    BASE_KEY = 'equipamentos_base'
+    VERSAO_KEY = 'equipamentos_editor_versao'
+    COLAR_KEY = 'equipamentos_colar'
+    IMPORTACAO_KEY = 'equipamentos_importacao'
+    
     @staticmethod
+    @secao('equipamentos')
     def render() -> List[Equipamento]:
         """Renderiza seção completa de equipamentos"""
         st.markdown("")
@@ -104,227 +118,173 @@ class EquipamentosSection:
             "Adicione bens e equipamentos sem nota fiscal, caso existam."
         )
         
-        # Inicializar lista de equipamentos
-        if 'equipamentos' not in st.session_state:
-            st.session_state.equipamentos = [{"tipo": "", "descricao": "", "valor": ""}]
+        tabela = EquipamentosSection.obter_tabela()
+        versao = st.session_state.get(EquipamentosSection.VERSAO_KEY, 0)
+        chave_editor = f"equipamentos_editor_{versao}"
         
-        # CSS para layout intercalado único
-        st.markdown("""
-        <style>
-        /* Layout intercalado para todas as telas */
-        .equipamento-mobile-item {
-            border: 1px solid #e0e0e0 !important;
-            border-radius: 8px !important;
-            padding: 0 12px 12px 12px !important;
-            margin-bottom: 10px !important;
-            background: #fafafa !important;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1) !important;
-        }
+        # O editor recebe sempre a mesma base; as edições chegam como diff e são aplicadas no callback
+        if EquipamentosSection.BASE_KEY not in st.session_state:
+            st.session_state[EquipamentosSection.BASE_KEY] = tabela.copia()
+        base = st.session_state[EquipamentosSection.BASE_KEY]
         
-        /* Remover espaçamento acima do cabeçalho do equipamento */
-        .equipamento-mobile-item .stMarkdown:first-child {
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-        }
-        
-        .equipamento-mobile-item .stMarkdown:first-child p {
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-        }
-        
-        .equipamento-mobile-item > div:first-child {
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-        }
-        
-        .equipamento-mobile-item > * {
-            margin-top: 0 !important;
-        }
-        
-        .equipamento-mobile-item > *:first-child {
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-        }
-        
-        /* CSS específico para remover espaçamento do Streamlit */
-        .equipamento-mobile-item [data-testid="stMarkdown"] {
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-        }
-        
-        .equipamento-mobile-item [data-testid="stMarkdown"]:first-child {
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-        }
-        
-        .equipamento-mobile-item [data-testid="stMarkdown"] p {
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-        }
-        
-        .mobile-field-group {
-            margin-bottom: 4px !important;
-        }
-        
-        .mobile-field-label {
-            font-weight: bold !important;
-            font-size: 0.85rem !important;
-            color: #333 !important;
-            margin-bottom: 1px !important;
-            display: block !important;
-            background: transparent !important;
-            padding: 0 !important;
-            border-radius: 0 !important;
-        }
-        
-        .mobile-remove-button {
-            text-align: center !important;
-            margin-top: 10px !important;
-            padding-top: 8px !important;
-            border-top: 1px solid #e0e0e0 !important;
-        }
-        
-        /* Diminuir espaçamento dos inputs */
-        .mobile-field-group .stTextInput > div {
-            margin-bottom: 0 !important;
-            margin-top: 0 !important;
-        }
-        
-        .mobile-field-group .stTextInput input {
-            margin-bottom: 0 !important;
-            margin-top: 0 !important;
-            padding: 0.4rem !important;
-        }
-        
-        /* Remover espaçamento extra entre elementos */
-        .mobile-field-group .stTextInput {
-            margin-bottom: 0 !important;
-            margin-top: 0 !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        st.data_editor(
+            # Colunas de texto explícitas: com a tabela vazia o pandas inferiria float
+            pd.DataFrame(base.colunas(), columns=list(TabelaEquipamentos.COLUNAS), dtype=str),
+            key=chave_editor,
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "tipo": st.column_config.TextColumn("Tipo", help="Ex: Geladeira, Microondas, etc."),
+                "descricao": st.column_config.TextColumn("Descrição", help="Marca/Modelo"),
+                "valor": st.column_config.TextColumn("Valor (R$)", help="Ex: 1.000,00")
+            },
+            on_change=EquipamentosSection._aplicar_edicoes,
+            args=(chave_editor,)
+        )
+        st.caption("Use + para adicionar linhas. Também é possível colar várias células copiadas de uma planilha.")
         
-        # Renderizar equipamentos - Layout intercalado único
-        for i, equipamento in enumerate(st.session_state.equipamentos):
-            st.markdown(f'<div class="equipamento-mobile-item">', unsafe_allow_html=True)
-            
-            # Cabeçalho do item
-            st.markdown(f'<div style="margin:0; padding:12px 0 8px 0; font-weight:bold;">Equipamento {i+1}</div>', unsafe_allow_html=True)
-            
-            # Campo Tipo
-            st.markdown('<div class="mobile-field-group">', unsafe_allow_html=True)
-            st.markdown('<div class="mobile-field-label">Tipo</div>', unsafe_allow_html=True)
-            tipo = st.text_input(
-                f"Tipo {i+1}",
-                value=equipamento.get("tipo", ""),
-                placeholder="Ex: Geladeira, Microondas, etc.",
-                key=f"tipo_equip_{i}",
-                label_visibility="collapsed"
+        # Total e linhas inválidas vêm prontos da tabela (mantidos a cada edição)
+        if tabela.total_centavos:
+            st.markdown(f"**▪ Valor total declarado:** {ValueFormatter.formatar_centavos(tabela.total_centavos)}")
+        linhas_invalidas = tabela.linhas_invalidas()
+        if linhas_invalidas:
+            st.warning(
+                "⚠ Valor não reconhecido na(s) linha(s) "
+                + ", ".join(str(i + 1) for i in linhas_invalidas)
+                + ". Use o formato 1.234,56"
             )
-            st.session_state.equipamentos[i]["tipo"] = tipo
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            # Campo Descrição
-            st.markdown('<div class="mobile-field-group">', unsafe_allow_html=True)
-            st.markdown('<div class="mobile-field-label">Descrição</div>', unsafe_allow_html=True)
-            descricao = st.text_input(
-                f"Descrição {i+1}",
-                value=equipamento.get("descricao", ""),
-                placeholder="Marca/Modelo",
-                key=f"desc_equip_{i}",
-                label_visibility="collapsed"
-            )
-            st.session_state.equipamentos[i]["descricao"] = descricao
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            # Campo Valor
-            st.markdown('<div class="mobile-field-group">', unsafe_allow_html=True)
-            st.markdown('<div class="mobile-field-label">Valor (R$)</div>', unsafe_allow_html=True)
-            valor = st.text_input(
-                f"Valor {i+1}",
-                value=equipamento.get("valor", ""),
-                placeholder="R$ 1.000,00",
-                key=f"valor_equip_{i}",
-                label_visibility="collapsed"
-            )
-            st.session_state.equipamentos[i]["valor"] = valor
-            st.markdown('</div>', unsafe_allow_html=True)
-            
-            # Botão remover
-            if len(st.session_state.equipamentos) > 1:
-                st.markdown('<div class="mobile-remove-button">', unsafe_allow_html=True)
-                if st.button(f"🗑️ Remover Equipamento {i+1}", key=f"remove_equip_{i}", 
-                           help=f"Remover item {i+1}", use_container_width=True):
-                    EquipamentosSection._remover_equipamento(i)
-                    st.rerun()
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
         
-        # Botões de controle
-        st.markdown("---")
-        col1, col2, col3 = st.columns([1, 1, 1])
+        with st.expander("📋 Colar vários itens de uma vez"):
+            st.text_area(
+                "Uma linha por item: Tipo, Descrição e Valor separados por TAB ou ponto e vírgula",
+                key=EquipamentosSection.COLAR_KEY,
+                placeholder="Geladeira;Brastemp 300L;2.500,00\nMicroondas;Electrolux;600,00"
+            )
+            st.button("Adicionar itens colados", key="colar_equipamentos",
+                      on_click=EquipamentosSection._adicionar_colados)
         
-        with col2:
-            st.markdown("""
-            <style>
-            div[data-testid="stButton"] > button {
-                white-space: nowrap !important;
-                width: 100% !important;
-                min-width: 220px !important;
-                padding: 0.5rem 0.8rem !important;
-                font-size: 0.9rem !important;
-                overflow: hidden !important;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-            if st.button("Adicionar Outro Equipamento", key="add_equipamento", use_container_width=True):
-                EquipamentosSection._adicionar_equipamento()
-                st.rerun()
+        with st.expander("📥 Importar planilha (XLSX ou CSV)"):
+            st.caption("Colunas Tipo, Descrição e Valor (com cabeçalho ou nessa ordem). Os itens são acrescentados à tabela.")
+            chave_planilha = f"equipamentos_planilha_{versao}"
+            st.file_uploader("Planilha de equipamentos", type=IMPORTACAO_CONFIG["extensoes"],
+                             key=chave_planilha, label_visibility="collapsed")
+            st.button("Importar itens da planilha", key="importar_equipamentos",
+                      on_click=EquipamentosSection._importar_planilha, args=(chave_planilha,))
+        with st.expander("🧾 Importar notas fiscais eletrônicas (NF-e XML)"):
+            st.caption("Os produtos das notas entram na tabela com a descrição e o valor informados na NF-e.")
+            chave_nfe = f"equipamentos_nfe_{versao}"
+            st.file_uploader("Arquivos XML da NF-e", type=['xml'], accept_multiple_files=True,
+                             key=chave_nfe, label_visibility="collapsed")
+            st.button("Importar itens das notas", key="importar_nfe",
+                      on_click=EquipamentosSection._importar_nfe, args=(chave_nfe,))
+        EquipamentosSection._mostrar_importacao()
         
-        with col3:
-            if len(st.session_state.equipamentos) > 1:
-                if st.button("🧹 Limpar Todos", key="clear_equipamentos", 
-                           use_container_width=True, type="secondary"):
-                    st.session_state.equipamentos = [{"tipo": "", "descricao": "", "valor": ""}]
-                    st.rerun()
+        if len(tabela) > 0:
+            st.button("🧹 Limpar Todos", key="clear_equipamentos", type="secondary",
+                      on_click=EquipamentosSection.limpar)
         
         # Converter para objetos Equipamento
         return [
-            Equipamento(
-                tipo=eq.get('tipo', ''),
-                descricao=eq.get('descricao', ''),
-                valor=eq.get('valor', '')
-            ) for eq in st.session_state.equipamentos
+            Equipamento(tipo=eq['tipo'], descricao=eq['descricao'], valor=eq['valor'],
+                        valor_centavos=eq['valor_centavos'])
+            for eq in EquipamentosSection.obter_tabela()
         ]
     
     @staticmethod
-    def _adicionar_equipamento():
-        """Adiciona novo equipamento vazio"""
-        st.session_state.equipamentos.append({"tipo": "", "descricao": "", "valor": ""})
+    def obter_tabela() -> TabelaEquipamentos:
+        """Tabela de equipamentos da sessão (convertendo a antiga lista de dicionários, se houver)"""
+        tabela = st.session_state.get('equipamentos')
+        if not isinstance(tabela, TabelaEquipamentos):
+            tabela = TabelaEquipamentos.from_linhas(
+                eq for eq in (tabela or []) if any(str(v).strip() for v in eq.values())
+            )
+            st.session_state.equipamentos = tabela
+        return tabela
+    
+    @staticmethod
+    def _aplicar_edicoes(chave_editor: str):
+        """Callback do editor: aplica o diff acumulado sobre a base"""
+        edicoes = st.session_state.get(chave_editor) or {}
+        base = st.session_state.get(EquipamentosSection.BASE_KEY) or TabelaEquipamentos()
+        st.session_state.equipamentos = base.com_edicoes(edicoes)
+        FormularioSnapshot.marcar_alterado()
     
     @staticmethod
-    def _remover_equipamento(index: int):
-        """Remove equipamento por índice"""
-        if len(st.session_state.equipamentos) > 1:
-            st.session_state.equipamentos.pop(index)
+    def _rebasear(tabela: TabelaEquipamentos):
+        """Troca a base do editor (novo widget) após mudanças feitas fora dele"""
+        st.session_state.equipamentos = tabela
+        st.session_state[EquipamentosSection.BASE_KEY] = tabela.copia()
+        st.session_state[EquipamentosSection.VERSAO_KEY] = st.session_state.get(EquipamentosSection.VERSAO_KEY, 0) + 1
+        FormularioSnapshot.marcar_alterado()
     
     @staticmethod
-    def _mostrar_resumo():
-        """Mostra resumo dos equipamentos preenchidos"""
-        equipamentos_preenchidos = [
-            eq for eq in st.session_state.equipamentos 
-            if eq.get('tipo', '').strip()
-        ]
-        
-        if equipamentos_preenchidos:
-            st.markdown("**▪ Resumo dos Itens Cadastrados:**")
-            for i, eq in enumerate(equipamentos_preenchidos, 1):
-                tipo = eq.get('tipo', 'N/A')
-                descricao = eq.get('descricao', 'N/A')
-                valor = eq.get('valor', 'N/A')
-                valor_formatado = f"R$ {valor}" if valor and valor != 'N/A' else 'N/A'
-                st.markdown(f"**{i}.** {tipo} - {descricao} - {valor_formatado}")
+    def _adicionar_colados():
+        """Callback: acrescenta as linhas coladas na área de texto"""
+        colados = TabelaEquipamentos.de_texto(st.session_state.get(EquipamentosSection.COLAR_KEY, ''))
+        if len(colados):
+            tabela = EquipamentosSection.obter_tabela().copia()
+            tabela.estender(colados)
+            EquipamentosSection._rebasear(tabela)
+        st.session_state[EquipamentosSection.COLAR_KEY] = ''
+    
+    @staticmethod
+    def _importar_planilha(chave_planilha: str):
+        """Callback: importa as linhas da planilha enviada e acrescenta à tabela"""
+        arquivo = st.session_state.get(chave_planilha)
+        if arquivo is None:
+            st.session_state[EquipamentosSection.IMPORTACAO_KEY] = {'erro': "Selecione uma planilha para importar"}
+            return
+        try:
+            resultado = ImportacaoEquipamentosService.importar(arquivo)
+        except Exception as e:
+            st.session_state[EquipamentosSection.IMPORTACAO_KEY] = {'erro': f"Não foi possível ler '{arquivo.name}': {e}"}
+            return
+        EquipamentosSection._aplicar_importacao(resultado)
+    
+    @staticmethod
+    def _importar_nfe(chave_nfe: str):
+        """Callback: importa os produtos dos XMLs de NF-e enviados"""
+        arquivos = st.session_state.get(chave_nfe) or []
+        if not arquivos:
+            st.session_state[EquipamentosSection.IMPORTACAO_KEY] = {'erro': "Selecione ao menos um XML de NF-e"}
+            return
+        EquipamentosSection._aplicar_importacao(NfeService.importar(arquivos))
+    
+    @staticmethod
+    def _aplicar_importacao(resultado: ResultadoImportacao):
+        """Acrescenta as linhas importadas à tabela e guarda o resumo para exibição"""
+        if resultado.importadas:
+            tabela = EquipamentosSection.obter_tabela().copia()
+            tabela.estender(resultado.tabela)
+            EquipamentosSection._rebasear(tabela)
+        st.session_state[EquipamentosSection.IMPORTACAO_KEY] = {
+            'importadas': resultado.importadas,
+            'rejeitadas': resultado.rejeitadas,
+            'motivos': resultado.motivos,
+            'truncado': resultado.truncado
+        }
+    
+    @staticmethod
+    def _mostrar_importacao():
+        """Exibe (uma vez) o resultado da última importação"""
+        resultado = st.session_state.pop(EquipamentosSection.IMPORTACAO_KEY, None)
+        if not resultado:
+            return
+        if 'erro' in resultado:
+            st.error(f"✗ {resultado['erro']}")
+            return
+        st.success(f"✓ {resultado['importadas']} item(ns) importado(s)")
+        if resultado['rejeitadas']:
+            st.warning(f"⚠ {resultado['rejeitadas']} registro(s) rejeitado(s)"
+                       + (" - limite de itens atingido" if resultado['truncado'] else ""))
+            for motivo in resultado['motivos']:
+                st.markdown(f"• {motivo}")
+    
+    @staticmethod
+    def limpar():
+        """Remove todos os equipamentos (também usado ao resetar o formulário)"""
+        EquipamentosSection._rebasear(TabelaEquipamentos())
 
 class ApiSearchHandler:
     """Handler para buscas automáticas via API"""
@@ -339,12 +299,13 @@ class ApiSearchHandler:
                     if razao_social:
                         # Usar uma chave diferente para evitar conflito
                         st.session_state['razao_social_busca'] = razao_social
+                        FormularioSnapshot.marcar_alterado()
                         st.success(f"✓ CNPJ encontrado: {razao_social}")
                         st.rerun()
                     else:
                         st.warning("⚠ CNPJ não encontrado na base de dados")
             else:
-                st.error("✗ CNPJ deve estar no formato 00.000.000/0000-00")
+                st.error("✗ CNPJ inválido: confira o formato 00.000.000/0000-00 e os dígitos verificadores")
     
     @staticmethod
     def handle_cep_search(cep: str, button_pressed: bool):
@@ -358,6 +319,7 @@ class ApiSearchHandler:
                         # Armazenar dados do endereço com chaves específicas
                         for campo, valor in endereco.items():
                             st.session_state[f'{campo}_busca'] = valor
+                        FormularioSnapshot.marcar_alterado()
                         
                         st.success("✓ Endereço encontrado e preenchido automaticamente")
                         st.rerun()
@@ -379,6 +341,7 @@ class ApiSearchHandler:
             razao_social = ApiService.buscar_cnpj(cnpj)
             if razao_social:
                 st.session_state['razao_social_busca'] = razao_social
+                FormularioSnapshot.marcar_alterado()
                 st.session_state[search_key] = True
             else:
                 st.session_state[search_key] = True
@@ -407,6 +370,7 @@ class ApiSearchHandler:
                 # Armazenar dados do endereço com chaves específicas
                 for campo, valor in endereco.items():
                     st.session_state[f'{campo}_busca'] = valor
+                FormularioSnapshot.marcar_alterado()
                 
                 st.session_state[search_key] = True
             else:
@@ -0,0 +1,55 @@
+import functools
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from typing import Callable, Dict, Tuple
+from config import APP_CONFIG
+
+# Dependências declaradas: seção -> chaves do session_state que ela lê de outras seções
+DEPENDENCIAS_SECOES: Dict[str, Tuple[str, ...]] = {}
+
+ASSINATURA_KEY = '_secoes_assinatura'
+
+def _chaves_observadas() -> Tuple[str, ...]:
+    return tuple(sorted({chave for chaves in DEPENDENCIAS_SECOES.values() for chave in chaves}))
+
+def _assinatura() -> Tuple[str, ...]:
+    """Estado atual das chaves das quais alguma seção depende"""
+    return tuple(repr(st.session_state.get(chave)) for chave in _chaves_observadas())
+
+def _execucao_parcial() -> bool:
+    """Indica se a execução atual é apenas de fragmentos (e não do app inteiro)"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return bool(ctx is not None and getattr(ctx, 'fragment_ids_this_run', None))
+
+def fragmentos_habilitados() -> bool:
+    return APP_CONFIG["usar_fragmentos"]
+
+def secao(nome: str, depende_de: Tuple[str, ...] = ()) -> Callable:
+    """
+    Transforma a função de renderização de uma seção em um st.fragment:
+    interagir com um widget da seção reexecuta só ela.
+
+    depende_de lista as chaves do session_state, escritas por outras seções, que a seção lê.
+    Se uma execução parcial alterar alguma dessas chaves, o app inteiro é reexecutado
+    para que as seções dependentes sejam atualizadas.
+    """
+    DEPENDENCIAS_SECOES[nome] = tuple(depende_de)
+
+    def decorador(funcao: Callable) -> Callable:
+        if not fragmentos_habilitados():
+            return funcao
+
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            resultado = funcao(*args, **kwargs)
+
+            assinatura = _assinatura()
+            anterior = st.session_state.get(ASSINATURA_KEY)
+            st.session_state[ASSINATURA_KEY] = assinatura
+            if _execucao_parcial() and anterior is not None and anterior != assinatura:
+                st.rerun()
+            return resultado
+
+        return st.fragment(executar)
+
+    return decorador
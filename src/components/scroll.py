@@ -0,0 +1,47 @@
+import os
+import logging
+import functools
+from typing import Any, Dict, Tuple
+import streamlit as st
+import streamlit.components.v1 as components
+from config import APP_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_componente_scroll = components.declare_component(
+    "scroll_topo",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "scroll_topo")
+)
+
+SEQUENCIA_KEY = 'scroll_topo_seq'
+METRICAS_KEY = 'scroll_topo_metricas'
+
+def _registrar_tempo(chave: str, preservado: Dict[str, Any]):
+    """Recebe o tempo medido no navegador (chega em uma nova execução, logo após a rolagem)"""
+    # Telas exibidas uma única vez (ex.: confirmação) continuam visíveis nesta execução
+    for nome, valor in preservado.items():
+        st.session_state[nome] = valor
+
+    metricas = st.session_state.get(chave)
+    if not metricas:
+        return
+    st.session_state[METRICAS_KEY] = metricas
+    logger.info(
+        "Scroll ao topo: %.1f ms (%.1f ms desde a montagem), alvo=%s, deslocamento=%s px",
+        metricas.get('ms_rolagem', 0), metricas.get('ms_desde_montagem', 0),
+        metricas.get('alvo'), metricas.get('deslocamento')
+    )
+
+def rolar_para_topo(preservar: Tuple[str, ...] = ()):
+    """Rola a página ao topo uma única vez. Só deve ser chamado quando scroll_to_top estiver marcado.
+    O tempo medido no navegador só volta ao Python com APP_CONFIG["medir_rolagem"] (reexecução extra);
+    nesse caso as chaves em preservar são restauradas na execução que traz a medição"""
+    sequencia = st.session_state.get(SEQUENCIA_KEY, 0) + 1
+    st.session_state[SEQUENCIA_KEY] = sequencia
+    chave = f"scroll_topo_{sequencia}"
+    if not APP_CONFIG["medir_rolagem"]:
+        _componente_scroll(key=chave, default=None, medir=False)
+        return
+    preservado = {nome: st.session_state[nome] for nome in preservar if nome in st.session_state}
+    _componente_scroll(key=chave, default=None, medir=True,
+                       on_change=functools.partial(_registrar_tempo, chave, preservado))
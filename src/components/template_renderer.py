@@ -0,0 +1,36 @@
+import json
+from functools import lru_cache
+from typing import Any
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from config import APP_CONFIG
+
+class TemplateRenderer:
+    """Renderiza os trechos HTML de templates/ compilando cada template uma única vez
+    e memoizando o resultado pelo conteúdo dos dados"""
+
+    _ambiente = Environment(
+        loader=FileSystemLoader(APP_CONFIG["templates_dir"]),
+        autoescape=select_autoescape(['html']),
+        # Sem linhas em branco no lugar das tags - o markdown do Streamlit encerraria o bloco HTML
+        trim_blocks=True,
+        lstrip_blocks=True,
+        auto_reload=False
+    )
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def estatico(cls, nome: str) -> str:
+        """Template sem variáveis: renderizado uma vez por processo"""
+        return cls._ambiente.get_template(nome).render()
+
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _renderizar_serializado(cls, nome: str, dados_json: str) -> str:
+        return cls._ambiente.get_template(nome).render(**json.loads(dados_json))
+
+    @classmethod
+    def renderizar(cls, nome: str, **dados: Any) -> str:
+        """Renderiza o template com os dados. Chamadas com os mesmos dados reaproveitam o HTML"""
+        if not dados:
+            return cls.estatico(nome)
+        return cls._renderizar_serializado(nome, json.dumps(dados, sort_keys=True, default=str))
@@ -1,11 +1,12 @@
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
 from src.models.formulario import FormularioSeguro
 from src.validators.form_validators import FormValidator, FileValidator
 from src.managers.state_manager import FormularioStateManager, ErrorStateManager
 from src.services.api_service import ApiService
-from src.utils.formatters import ValueFormatter, StringUtils
-from config import PLANOS_SEGURO, DATA_FINAL_VIGENCIA
+from src.services.pricing_service import PricingService
+from src.utils.formatters import StringUtils
+from config import PLANOS_SEGURO
 
 class FormularioController:
     """Controlador principal do formulário - gerencia toda a lógica de negócio"""
@@ -26,7 +27,7 @@ class FormularioController:
             return False, "CNPJ não informado"
         
         if not FormValidator.validar_cnpj(cnpj):
-            return False, "CNPJ deve estar no formato 00.000.000/0000-00"
+            return False, "CNPJ inválido: confira o formato 00.000.000/0000-00 e os dígitos verificadores"
         
         razao_social = ApiService.buscar_cnpj(cnpj)
         if razao_social:
@@ -54,22 +55,16 @@ class FormularioController:
         return False, None, "CEP não encontrado"
     
     def calcular_premio_pro_rata(self, plano_nome: str) -> Tuple[int, float]:
-        """Calcula prêmio pro rata para o plano selecionado"""
-        if plano_nome not in PLANOS_SEGURO:
+        """Calcula prêmio pro rata para o plano selecionado (inclusão no próximo dia útil)"""
+        cotacao = PricingService.cotacao(plano_nome)
+        if not cotacao:
             return 0, 0.0
         
-        preco_anual = PLANOS_SEGURO[plano_nome]
-        data_inclusao = datetime.now() + timedelta(days=1)
-        dias_restantes = (DATA_FINAL_VIGENCIA - data_inclusao.replace(tzinfo=None)).days + 1
-        premio_pro_rata = round((preco_anual / 365) * dias_restantes, 2)
-        
-        return dias_restantes, premio_pro_rata
+        return cotacao.dias_restantes, cotacao.premio_float
     
     def obter_plano_formatado(self, plano_selecionado: str) -> str:
         """Extrai nome do plano da string formatada"""
-        if not plano_selecionado:
-            return ""
-        return plano_selecionado.split('\n')[0].replace(' -', '')
+        return PricingService.extrair_plano(plano_selecionado)
     
     def validar_e_processar_formulario(self, arquivos_uploaded=None) -> Tuple[bool, List[str], Optional[FormularioSeguro]]:
         """Valida formulário completo e retorna resultado"""
@@ -93,15 +88,13 @@ class FormularioController:
             return False, erros, None
         
         # Sucesso - adicionar dados calculados
-        plano_nome = self.obter_plano_formatado(dados.get('plano_selecionado', ''))
-        if plano_nome:
-            dias_restantes, premio_pro_rata = self.calcular_premio_pro_rata(plano_nome)
-            
+        cotacao = PricingService.cotacao(dados.get('plano_selecionado', ''))
+        if cotacao:
             # Atualizar dados do formulário
-            formulario.dias_restantes = dias_restantes
-            formulario.premio_pro_rata = premio_pro_rata
+            formulario.dias_restantes = cotacao.dias_restantes
+            formulario.premio_pro_rata = cotacao.premio_float
             formulario.timestamp_utc = datetime.now().isoformat()
-            formulario.data_inclusao = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+            formulario.data_inclusao = cotacao.data_inclusao.strftime('%Y-%m-%d')
         
         return True, [], formulario
     
@@ -183,17 +176,12 @@ class PlanoController:
     @staticmethod
     def obter_opcoes_formatadas() -> List[str]:
         """Retorna opções de planos formatadas para seleção"""
-        opcoes = []
-        for plano, preco in PLANOS_SEGURO.items():
-            opcoes.append(f"{plano} -\n{ValueFormatter.formatar_valor_real(preco)}/ano")
-        return opcoes
+        return PricingService.opcoes_planos()
     
     @staticmethod
     def extrair_nome_plano(plano_selecionado: str) -> str:
         """Extrai nome limpo do plano da opção selecionada"""
-        if not plano_selecionado:
-            return ""
-        return plano_selecionado.split('\n')[0].replace(' -', '')
+        return PricingService.extrair_plano(plano_selecionado)
     
     @staticmethod
     def obter_preco_plano(plano_nome: str) -> float:
@@ -3,6 +3,33 @@ from typing import Dict, Any, Optional, List
 from src.models.formulario import FormularioSeguro, Equipamento
 from dataclasses import asdict
 
+class FormularioSnapshot:
+    """Modelo do formulário montado no máximo uma vez por versão do estado da sessão.
+    A versão é um contador incrementado pelos on_change dos campos e por quem grava no estado"""
+    
+    VERSAO_KEY = '_formulario_versao'
+    CACHE_KEY = '_formulario_snapshot'
+    
+    @staticmethod
+    def marcar_alterado():
+        """Invalida o snapshot (usado como on_change dos campos do formulário)"""
+        st.session_state[FormularioSnapshot.VERSAO_KEY] = st.session_state.get(FormularioSnapshot.VERSAO_KEY, 0) + 1
+    
+    @staticmethod
+    def obter() -> FormularioSeguro:
+        """Formulário da versão atual, reconstruído só se algo mudou desde a última montagem"""
+        versao = st.session_state.get(FormularioSnapshot.VERSAO_KEY, 0)
+        cache = st.session_state.get(FormularioSnapshot.CACHE_KEY)
+        if cache is None or cache[0] != versao:
+            cache = (versao, FormularioSeguro.from_session_state(st.session_state))
+            st.session_state[FormularioSnapshot.CACHE_KEY] = cache
+        return cache[1]
+    
+    @staticmethod
+    def dados() -> Dict[str, Any]:
+        """Dicionário do formulário atual (compartilhado - não alterar)"""
+        return FormularioSnapshot.obter().to_dict()
+
 class SessionStateManager:
     """Gerenciador centralizado do estado da sessão"""
     
@@ -46,6 +73,7 @@ class SessionStateManager:
         if 'form_data_cache' in st.session_state:
             for key, value in st.session_state.form_data_cache.items():
                 st.session_state[key] = value
+            FormularioSnapshot.marcar_alterado()
     
     @staticmethod
     def limpar_estado_formulario():
@@ -57,6 +85,7 @@ class SessionStateManager:
         # Recriar equipamentos vazios
         st.session_state.equipamentos = [{"tipo": "", "descricao": "", "valor": ""}]
         st.session_state.formulario_enviado = False
+        FormularioSnapshot.marcar_alterado()
         
         # Limpar cache
         if 'form_data_cache' in st.session_state:
@@ -110,8 +139,8 @@ class FormularioStateManager:
         self.session_manager.inicializar_estado()
     
     def criar_formulario_atual(self) -> FormularioSeguro:
-        """Cria instância do formulário com dados atuais"""
-        return FormularioSeguro.from_session_state(st.session_state)
+        """Formulário com dados atuais (montado uma vez por versão do estado)"""
+        return FormularioSnapshot.obter()
     
     def salvar_formulario(self, formulario: FormularioSeguro):
         """Salva dados do formulário no session_state"""
@@ -128,6 +157,7 @@ class FormularioStateManager:
             st.session_state.equipamentos = []
         
         st.session_state.equipamentos.append({"tipo": "", "descricao": "", "valor": ""})
+        FormularioSnapshot.marcar_alterado()
     
     def remover_equipamento(self, index: int) -> bool:
         """Remove equipamento por índice. Retorna True se removido."""
@@ -136,6 +166,7 @@ class FormularioStateManager:
             
         if len(st.session_state.equipamentos) > 1 and 0 <= index < len(st.session_state.equipamentos):
             st.session_state.equipamentos.pop(index)
+            FormularioSnapshot.marcar_alterado()
             return True
         
         return False
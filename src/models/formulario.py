@@ -1,28 +1,234 @@
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from datetime import datetime
+from src.utils.formatters import ValueFormatter
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Equipamento:
-    """Modelo para equipamentos sem nota fiscal"""
+    """Modelo para equipamentos sem nota fiscal (imutável: o dicionário é montado uma única vez)"""
     tipo: str = ""
     descricao: str = ""
     valor: str = ""
+    valor_centavos: Optional[int] = None
+    _dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.valor_centavos is None and self.valor:
+            object.__setattr__(self, 'valor_centavos', ValueFormatter.converter_para_centavos(self.valor))
     
     def is_valid(self) -> bool:
         """Verifica se pelo menos o tipo foi preenchido"""
         return bool(self.tipo.strip())
     
+    def valor_invalido(self) -> bool:
+        """Valor preenchido mas não reconhecido como Real"""
+        return bool(self.valor.strip()) and self.valor_centavos is None
+    
+    def to_dict(self) -> Dict:
+        """Converte para dicionário (mesmo objeto a cada chamada - não alterar)"""
+        if self._dict is None:
+            object.__setattr__(self, '_dict', {
+                'tipo': self.tipo,
+                'descricao': self.descricao,
+                'valor': self.valor,
+                'valor_centavos': self.valor_centavos
+            })
+        return self._dict
+
+class _Versionado:
+    """Base dos modelos mutáveis: cada atribuição incrementa a versão do objeto,
+    que carimba o dicionário guardado por to_dict()"""
+    __slots__ = ()
+    
+    def __setattr__(self, nome: str, valor: Any):
+        object.__setattr__(self, nome, valor)
+        if nome[0] != '_':
+            object.__setattr__(self, '_versao', getattr(self, '_versao', 0) + 1)
+    
+    @property
+    def versao(self) -> Any:
+        return self._versao
+    
+    def _montar_dict(self) -> Dict:
+        raise NotImplementedError
+    
+    def to_dict(self) -> Dict:
+        """Dicionário do modelo, remontado só quando a versão muda (não alterar o retorno)"""
+        versao = self.versao
+        if self._dict is None or self._dict_versao != versao:
+            self._dict = self._montar_dict()
+            self._dict_versao = versao
+        return self._dict
+
+def _campo_interno(padrao: Any = None) -> Any:
+    """Campo de controle fora do __init__, da comparação e do repr"""
+    return field(default=padrao, init=False, repr=False, compare=False)
+
+@dataclass
+class TabelaEquipamentos:
+    """Equipamentos armazenados por coluna (listas paralelas) para o editor em tabela.
+    Iterar devolve as linhas como dicionários, como a antiga lista de equipamentos.
+    O valor é convertido para centavos na entrada; total e contagem de valores inválidos
+    são atualizados a cada alteração, sem percorrer a tabela"""
+    COLUNAS = ('tipo', 'descricao', 'valor')
+
+    tipo: List[str] = field(default_factory=list)
+    descricao: List[str] = field(default_factory=list)
+    valor: List[str] = field(default_factory=list)
+    centavos: List[Optional[int]] = field(default_factory=list)
+    total_centavos: int = 0
+    invalidos: int = 0
+
+    def __post_init__(self):
+        # Construída só com as colunas de texto: converte os valores uma única vez
+        if len(self.centavos) != len(self.valor):
+            valores, self.valor, self.centavos = self.valor, [], []
+            self.total_centavos = self.invalidos = 0
+            for texto in valores:
+                self._acrescentar_valor(texto)
+
+    @classmethod
+    def from_linhas(cls, linhas: Iterable[Dict[str, Any]]) -> 'TabelaEquipamentos':
+        tabela = cls()
+        for linha in linhas:
+            tabela.append(linha)
+        return tabela
+
+    def __len__(self) -> int:
+        return len(self.tipo)
+
+    def __getitem__(self, indice: int) -> Dict[str, Any]:
+        linha = {coluna: getattr(self, coluna)[indice] for coluna in self.COLUNAS}
+        linha['valor_centavos'] = self.centavos[indice]
+        return linha
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @staticmethod
+    def _texto(valor: Any) -> str:
+        # Células vazias do editor chegam como None/NaN
+        if valor is None or valor != valor:
+            return ""
+        return str(valor)
+
+    @staticmethod
+    def _converter(texto: str) -> Optional[int]:
+        return ValueFormatter.converter_para_centavos(texto) if texto.strip() else None
+
+    def _contabilizar(self, texto: str, centavos: Optional[int], sinal: int):
+        """Soma (sinal=1) ou retira (sinal=-1) uma linha do total e da contagem de inválidos"""
+        if centavos is not None:
+            self.total_centavos += sinal * centavos
+        elif texto.strip():
+            self.invalidos += sinal
+
+    def _acrescentar_valor(self, texto: str):
+        centavos = self._converter(texto)
+        self.valor.append(texto)
+        self.centavos.append(centavos)
+        self._contabilizar(texto, centavos, 1)
+
+    def _definir_valor(self, indice: int, texto: str):
+        self._contabilizar(self.valor[indice], self.centavos[indice], -1)
+        centavos = self._converter(texto)
+        self.valor[indice] = texto
+        self.centavos[indice] = centavos
+        self._contabilizar(texto, centavos, 1)
+
+    def append(self, linha: Dict[str, Any]):
+        """Adiciona uma linha ao final"""
+        self.tipo.append(self._texto(linha.get('tipo')))
+        self.descricao.append(self._texto(linha.get('descricao')))
+        self._acrescentar_valor(self._texto(linha.get('valor')))
+
+    def copia(self) -> 'TabelaEquipamentos':
+        return TabelaEquipamentos(list(self.tipo), list(self.descricao), list(self.valor),
+                                  list(self.centavos), self.total_centavos, self.invalidos)
+
+    def colunas(self) -> Dict[str, List[str]]:
+        """Dados no formato aceito pelo st.data_editor"""
+        return {coluna: getattr(self, coluna) for coluna in self.COLUNAS}
+
+    def linhas_invalidas(self) -> List[int]:
+        """Índices das linhas com valor não reconhecido (só percorre se houver algum)"""
+        if not self.invalidos:
+            return []
+        return [i for i, (texto, centavos) in enumerate(zip(self.valor, self.centavos))
+                if centavos is None and texto.strip()]
+
+    def com_edicoes(self, edicoes: Dict[str, Any]) -> 'TabelaEquipamentos':
+        """Aplica o diff do st.data_editor (edited_rows, deleted_rows, added_rows) sobre esta tabela"""
+        resultado = self.copia()
+        for indice, valores in (edicoes.get('edited_rows') or {}).items():
+            indice = int(indice)
+            if 0 <= indice < len(resultado):
+                for coluna, valor in valores.items():
+                    if coluna == 'valor':
+                        resultado._definir_valor(indice, self._texto(valor))
+                    elif coluna in self.COLUNAS:
+                        getattr(resultado, coluna)[indice] = self._texto(valor)
+
+        removidas = {int(i) for i in edicoes.get('deleted_rows') or []}
+        if removidas:
+            for i in removidas:
+                if 0 <= i < len(resultado):
+                    resultado._contabilizar(resultado.valor[i], resultado.centavos[i], -1)
+            for coluna in self.COLUNAS + ('centavos',):
+                valores = getattr(resultado, coluna)
+                setattr(resultado, coluna, [v for i, v in enumerate(valores) if i not in removidas])
+
+        for linha in edicoes.get('added_rows') or []:
+            resultado.append(linha)
+        return resultado
+
+    @classmethod
+    def de_texto(cls, texto: str) -> 'TabelaEquipamentos':
+        """Converte linhas coladas de planilha (separadas por TAB ou ';') em equipamentos"""
+        tabela = cls()
+        for linha in texto.splitlines():
+            if not linha.strip():
+                continue
+            separador = '\t' if '\t' in linha else ';'
+            partes = [parte.strip() for parte in linha.split(separador)]
+            tabela.append(dict(zip(cls.COLUNAS, partes)))
+        return tabela
+
+    def estender(self, outra: 'TabelaEquipamentos'):
+        """Acrescenta as linhas de outra tabela"""
+        for coluna in self.COLUNAS + ('centavos',):
+            getattr(self, coluna).extend(getattr(outra, coluna))
+        self.total_centavos += outra.total_centavos
+        self.invalidos += outra.invalidos
+
+@dataclass
+class ArquivoSpool:
+    """Referência leve a um arquivo enviado e persistido no spool em disco"""
+    name: str
+    size: int
+    type: str
+    sha256: str
+    path: str
+    # Cópias geradas a partir deste arquivo no mesmo spool (ex.: imagem otimizada), removidas junto com ele
+    derivados: List[str] = field(default_factory=list)
+    
+    def read(self) -> bytes:
+        """Lê o conteúdo do arquivo a partir do spool"""
+        with open(self.path, 'rb') as f:
+            return f.read()
+    
     def to_dict(self) -> Dict:
-        """Converte para dicionário"""
         return {
-            'tipo': self.tipo,
-            'descricao': self.descricao,
-            'valor': self.valor
+            'name': self.name,
+            'size': self.size,
+            'type': self.type,
+            'sha256': self.sha256,
+            'path': self.path
         }
 
-@dataclass
-class Endereco:
+@dataclass(slots=True)
+class Endereco(_Versionado):
     """Modelo para endereço"""
     cep: str = ""
     logradouro: str = ""
@@ -32,7 +238,11 @@ class Endereco:
     cidade: str = ""
     estado: str = ""
     
-    def to_dict(self) -> Dict:
+    _versao: int = _campo_interno(0)
+    _dict: Optional[Dict] = _campo_interno()
+    _dict_versao: Any = _campo_interno()
+    
+    def _montar_dict(self) -> Dict:
         return {
             'cep': self.cep,
             'logradouro': self.logradouro,
@@ -43,15 +253,19 @@ class Endereco:
             'estado': self.estado
         }
 
-@dataclass
-class DadosPessoais:
+@dataclass(slots=True)
+class DadosPessoais(_Versionado):
     """Modelo para dados pessoais do responsável"""
     nome_completo: str = ""
     cpf: str = ""
     email: str = ""
     telefone: str = ""
     
-    def to_dict(self) -> Dict:
+    _versao: int = _campo_interno(0)
+    _dict: Optional[Dict] = _campo_interno()
+    _dict_versao: Any = _campo_interno()
+    
+    def _montar_dict(self) -> Dict:
         return {
             'nome_completo': self.nome_completo,
             'cpf': self.cpf,
@@ -59,21 +273,26 @@ class DadosPessoais:
             'telefone': self.telefone
         }
 
-@dataclass
-class DadosEmpresa:
+@dataclass(slots=True)
+class DadosEmpresa(_Versionado):
     """Modelo para dados da empresa"""
     cnpj: str = ""
     razao_social: str = ""
     
-    def to_dict(self) -> Dict:
+    _versao: int = _campo_interno(0)
+    _dict: Optional[Dict] = _campo_interno()
+    _dict_versao: Any = _campo_interno()
+    
+    def _montar_dict(self) -> Dict:
         return {
             'cnpj': self.cnpj,
             'razao_social': self.razao_social
         }
 
-@dataclass
-class FormularioSeguro:
-    """Modelo principal do formulário de seguro"""
+@dataclass(slots=True)
+class FormularioSeguro(_Versionado):
+    """Modelo principal do formulário de seguro.
+    A lista de equipamentos deve ser alterada pelos métodos abaixo ou por atribuição (que atualizam a versão)"""
     dados_pessoais: DadosPessoais = field(default_factory=DadosPessoais)
     dados_empresa: DadosEmpresa = field(default_factory=DadosEmpresa)
     endereco: Endereco = field(default_factory=Endereco)
@@ -84,26 +303,38 @@ class FormularioSeguro:
     dias_restantes: Optional[int] = None
     premio_pro_rata: Optional[float] = None
     
+    _versao: int = _campo_interno(0)
+    _dict: Optional[Dict] = _campo_interno()
+    _dict_versao: Any = _campo_interno()
+    
     def __post_init__(self):
         """Inicializa com pelo menos um equipamento vazio"""
         if not self.equipamentos:
             self.equipamentos = [Equipamento()]
     
+    @property
+    def versao(self) -> tuple:
+        """Versão do formulário e das partes. A do próprio formulário vem primeiro:
+        trocar uma parte inteira a incrementa, então um carimbo nunca se repete"""
+        return (self._versao, self.dados_pessoais.versao, self.dados_empresa.versao, self.endereco.versao)
+    
     def adicionar_equipamento(self):
         """Adiciona novo equipamento vazio"""
         self.equipamentos.append(Equipamento())
+        self._versao += 1
     
     def remover_equipamento(self, index: int):
         """Remove equipamento por índice (mantém pelo menos 1)"""
         if len(self.equipamentos) > 1 and 0 <= index < len(self.equipamentos):
             self.equipamentos.pop(index)
+            self._versao += 1
     
     def get_equipamentos_validos(self) -> List[Equipamento]:
         """Retorna apenas equipamentos com tipo preenchido"""
         return [eq for eq in self.equipamentos if eq.is_valid()]
     
-    def to_dict(self) -> Dict:
-        """Converte formulário completo para dicionário"""
+    def _montar_dict(self) -> Dict:
+        # Partes e equipamentos devolvem os próprios dicionários já montados
         return {
             **self.dados_pessoais.to_dict(),
             **self.dados_empresa.to_dict(),
@@ -147,7 +378,8 @@ class FormularioSeguro:
                 Equipamento(
                     tipo=eq.get('tipo', ''),
                     descricao=eq.get('descricao', ''),
-                    valor=eq.get('valor', '')
+                    valor=eq.get('valor', ''),
+                    valor_centavos=eq.get('valor_centavos')
                 ) for eq in equipamentos_data
             ]
         
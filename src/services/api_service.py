@@ -3,21 +3,25 @@ import re
 from functools import lru_cache
 from typing import Optional, Dict
 from config import API_URLS, TIMEOUT_CONFIG, MENSAGENS
+from src.validators.form_validators import FormValidator
 import streamlit as st
 
 class ApiService:
     """Serviço para integração com APIs externas"""
     
     @staticmethod
-    @lru_cache(maxsize=100)
     def buscar_cnpj(cnpj: str) -> Optional[str]:
-        """Busca razão social por CNPJ na Receita Federal"""
-        cnpj_limpo = re.sub(r'\D', '', cnpj)
-        
-        if len(cnpj_limpo) != 14:
+        """Busca razão social por CNPJ na Receita Federal.
+        CNPJs com dígito verificador errado nem chegam à API (nem ocupam o cache de consultas)"""
+        if not FormValidator.validar_cnpj(cnpj):
             st.error(MENSAGENS["cnpj_invalido"])
             return None
-        
+        return ApiService._consultar_cnpj(re.sub(r'[^0-9]', '', cnpj))
+    
+    @staticmethod
+    @lru_cache(maxsize=100)
+    def _consultar_cnpj(cnpj_limpo: str) -> Optional[str]:
+        """Consulta a ReceitaWS (só para CNPJs válidos)"""
         url = f"{API_URLS['receita_ws']}{cnpj_limpo}"
         
         for tentativa in range(TIMEOUT_CONFIG["max_retries"]):
@@ -48,7 +52,7 @@ class ApiService:
     @lru_cache(maxsize=100)
     def buscar_cep(cep: str) -> Optional[Dict]:
         """Busca endereço por CEP no ViaCEP"""
-        cep_limpo = re.sub(r'\D', '', cep)
+        cep_limpo = re.sub(r'[^0-9]', '', cep)
         
         if len(cep_limpo) != 8:
             st.error(MENSAGENS["cep_invalido"])
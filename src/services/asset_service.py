@@ -0,0 +1,202 @@
+import io
+import os
+import re
+import sys
+import base64
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from config import APP_CONFIG
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow é opcional - sem ele o logo é servido no tamanho original
+    Image = None
+
+# Strings entre aspas são preservadas intactas pela minificação
+_RE_STRINGS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_RE_COMENTARIOS = re.compile(r'/\*.*?\*/', re.S)
+_RE_ESPACOS = re.compile(r'\s+')
+_RE_PONTUACAO = re.compile(r'\s*([{};,>])\s*')
+
+class AssetService:
+    """CSS e logo carregados uma vez por processo e publicados na pasta de arquivos estáticos"""
+
+    URL_ESTATICO = "app/static"
+
+    # (extensão, formato do Pillow, mime) - WebP primeiro, PNG como alternativa
+    FORMATOS_LOGO = (('webp', 'WEBP', 'image/webp'), ('png', 'PNG', 'image/png'))
+
+    @staticmethod
+    def minificar_css(css: str) -> str:
+        """Remove comentários e espaços supérfluos (sem alterar o conteúdo de strings)"""
+        partes = _RE_STRINGS.split(css)
+        for i in range(0, len(partes), 2):
+            trecho = _RE_COMENTARIOS.sub('', partes[i])
+            trecho = _RE_ESPACOS.sub(' ', trecho)
+            trecho = _RE_PONTUACAO.sub(r'\1', trecho)
+            trecho = trecho.replace(': ', ':').replace(';}', '}')
+            partes[i] = trecho
+        return ''.join(partes).strip()
+
+    @staticmethod
+    def _ler(caminho: str) -> Optional[bytes]:
+        try:
+            with open(caminho, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def css_minificado(cls) -> Optional[str]:
+        """styles.css e CSS dos componentes, minificados (None se o styles.css não existir)"""
+        conteudo = cls._ler(APP_CONFIG["css_path"])
+        if conteudo is None:
+            return None
+        partes = [conteudo] + [cls._ler(caminho) or b'' for caminho in APP_CONFIG["css_componentes"]]
+        return cls.minificar_css(b'\n'.join(partes).decode('utf-8'))
+
+    @staticmethod
+    def redimensionar_logo(conteudo: bytes, largura: int, formato: str) -> bytes:
+        """Gera uma variante do logo com a largura informada (mantendo a proporção)"""
+        with Image.open(io.BytesIO(conteudo)) as imagem:
+            altura = max(1, round(imagem.height * largura / imagem.width))
+            reduzida = imagem.resize((largura, altura), Image.LANCZOS)
+            saida = io.BytesIO()
+            if formato == 'WEBP':
+                reduzida.save(saida, 'WEBP', quality=85, method=6)
+            else:
+                reduzida.save(saida, 'PNG', optimize=True)
+        return saida.getvalue()
+
+    @classmethod
+    def _larguras_logo(cls, conteudo: bytes) -> List[int]:
+        """Larguras configuradas, sem ampliar além do original"""
+        with Image.open(io.BytesIO(conteudo)) as imagem:
+            largura_original = imagem.width
+        return [l for l in APP_CONFIG["logo_larguras"] if l < largura_original]
+
+    @classmethod
+    @lru_cache(maxsize=4)
+    def _logo_embutido(cls, caminho: str, mtime: int) -> Tuple[str, str]:
+        """(mime, base64) da menor variante que cobre telas 2x - cache pelo mtime do arquivo"""
+        conteudo = cls._ler(caminho)
+        if not conteudo:
+            return 'image/png', ""
+        if Image is not None:
+            try:
+                larguras = cls._larguras_logo(conteudo)
+                if larguras:
+                    largura = larguras[min(1, len(larguras) - 1)]
+                    conteudo = cls.redimensionar_logo(conteudo, largura, 'PNG')
+            except Exception:
+                pass
+        return 'image/png', base64.b64encode(conteudo).decode()
+
+    @classmethod
+    def logo_base64(cls) -> Tuple[str, str]:
+        """Logo reduzido em base64, para quando o serviço estático está desligado"""
+        caminho = APP_CONFIG["logo_path"]
+        try:
+            mtime = os.stat(caminho).st_mtime_ns
+        except OSError:
+            return 'image/png', ""
+        return cls._logo_embutido(caminho, mtime)
+
+    @classmethod
+    def gerar_variantes_logo(cls) -> List[Tuple[str, int, str]]:
+        """Gera em static/ as variantes PNG/WebP do logo, refazendo só as mais antigas que o original.
+        Retorna (mime, largura, url) de cada variante"""
+        origem = APP_CONFIG["logo_path"]
+        if Image is None:
+            return []
+        try:
+            mtime = os.stat(origem).st_mtime_ns
+        except OSError:
+            return []
+
+        pasta = APP_CONFIG["static_dir"]
+        base = os.path.splitext(os.path.basename(origem))[0]
+        versao = format(mtime, 'x')
+        conteudo = cls._ler(origem)
+
+        variantes = []
+        for extensao, formato, mime in cls.FORMATOS_LOGO:
+            for largura in cls._larguras_logo(conteudo):
+                nome = f"{base}-{largura}w.{extensao}"
+                destino = os.path.join(pasta, nome)
+                try:
+                    atualizado = os.stat(destino).st_mtime_ns >= mtime
+                except OSError:
+                    atualizado = False
+                if not atualizado:
+                    os.makedirs(pasta, exist_ok=True)
+                    temporario = f"{destino}.{os.getpid()}.tmp"
+                    with open(temporario, 'wb') as f:
+                        f.write(cls.redimensionar_logo(conteudo, largura, formato))
+                    os.replace(temporario, destino)
+                variantes.append((mime, largura, f"{cls.URL_ESTATICO}/{nome}?v={versao}"))
+        return variantes
+
+    @staticmethod
+    def _gravar(nome: str, conteudo: bytes) -> str:
+        """Grava o arquivo na pasta estática (se mudou) e devolve a URL com versão pelo hash.
+        O parâmetro v faz o Streamlit responder com cache de longa duração"""
+        pasta = APP_CONFIG["static_dir"]
+        destino = os.path.join(pasta, nome)
+        versao = hashlib.sha256(conteudo).hexdigest()[:12]
+
+        existente = AssetService._ler(destino)
+        if existente is None or hashlib.sha256(existente).hexdigest()[:12] != versao:
+            os.makedirs(pasta, exist_ok=True)
+            temporario = f"{destino}.{os.getpid()}.tmp"
+            with open(temporario, 'wb') as f:
+                f.write(conteudo)
+            os.replace(temporario, destino)
+
+        return f"{AssetService.URL_ESTATICO}/{nome}?v={versao}"
+
+    @staticmethod
+    def servico_estatico_ativo() -> bool:
+        """Indica se o servidor expõe a pasta static/ ([server] enableStaticServing)"""
+        try:
+            import streamlit as st
+            return bool(st.get_option("server.enableStaticServing"))
+        except Exception:
+            return False
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def publicar(cls) -> Dict[str, Any]:
+        """Publica CSS minificado e logo em static/ uma vez por processo.
+        Retorna as URLs versionadas (vazio se não for possível publicar)"""
+        if not cls.servico_estatico_ativo():
+            return {}
+
+        urls = {}
+        try:
+            css = cls.css_minificado()
+            if css is not None:
+                urls['css'] = cls._gravar('styles.min.css', css.encode('utf-8'))
+
+            logo = cls._ler(APP_CONFIG["logo_path"])
+            if logo:
+                urls['logo'] = cls._gravar(os.path.basename(APP_CONFIG["logo_path"]), logo)
+                urls['logo_variantes'] = cls.gerar_variantes_logo()
+        except OSError:
+            # Disco somente leitura ou logo ilegível (erros do Pillow herdam de OSError)
+            return {}
+        return urls
+
+def main():
+    """Pré-gera os arquivos estáticos no build: python -m src.services.asset_service"""
+    css = AssetService.css_minificado()
+    if css is not None:
+        print(f"✓ {AssetService._gravar('styles.min.css', css.encode('utf-8'))}")
+    for mime, largura, url in AssetService.gerar_variantes_logo():
+        print(f"✓ {url} ({mime}, {largura}px)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,49 @@
 import os
+import time
+import uuid
 import base64
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
-from jinja2 import Template
 import streamlit as st
+from src.services.image_service import ImageService
+from src.services.worker_pool import WorkerPool, codificar_arquivo_base64, renderizar_template
+from config import EMAIL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ResultadoEnvio:
+    """Partes (1..N) de uma solicitação aceitas pelo SendGrid. Verdadeiro só se todas foram enviadas"""
+    id_submissao: str = ''
+    total_mensagens: int = 0
+    partes_enviadas: List[int] = field(default_factory=list)
+    
+    @property
+    def completo(self) -> bool:
+        return self.total_mensagens > 0 and len(self.partes_enviadas) == self.total_mensagens
+    
+    @property
+    def parcial(self) -> bool:
+        """A mensagem principal (parte 1) saiu, mas faltam anexos: reenviar o formulário duplicaria a solicitação"""
+        return bool(self.partes_enviadas) and not self.completo
+    
+    @property
+    def partes_pendentes(self) -> List[int]:
+        return [p for p in range(1, self.total_mensagens + 1) if p not in self.partes_enviadas]
+    
+    def __bool__(self) -> bool:
+        return self.completo
 
 class EmailService:
     """Serviço para envio de emails usando SendGrid"""
     
+    TEMPLATE_EMAIL = os.path.abspath("templates/email_template.html")
+    TEMPLATE_CONTINUACAO = os.path.abspath("templates/email_continuacao.html")
+    
     def __init__(self):
         # Configurar SendGrid API Key
         # Pode ser definida como variável de ambiente ou secrets do Streamlit
@@ -60,21 +94,45 @@ class EmailService:
             sendgrid_config.get('from_name', "Grupo CPZ - Formulários")
         )
         self.subject = "Nova Solicitação - Seguro Incêndio Conteúdos"
+        
+        # Bytes economizados pela otimização de imagens no último envio
+        self.bytes_economizados = 0
     
-    def enviar_formulario(self, dados_formulario: Dict[str, Any], arquivos: List[Any] = None) -> bool:
+    def enviar_formulario(self, dados_formulario: Dict[str, Any], arquivos: List[Any] = None) -> ResultadoEnvio:
         """
         Envia formulário por email usando template HTML
         
+        Se o tamanho codificado ultrapassar o limite de uma mensagem, os anexos
+        são distribuídos em emails de continuação numerados, ligados pelo ID da solicitação.
+        
         Args:
             dados_formulario: Dados do formulário
             arquivos: Lista de arquivos anexados (opcional)
             
         Returns:
-            bool: True se enviado com sucesso, False caso contrário
+            ResultadoEnvio: partes enviadas (verdadeiro só se todas foram aceitas)
         """
+        id_submissao = dados_formulario.get('id_submissao') or self._gerar_id_submissao()
+        resultado = ResultadoEnvio(id_submissao=id_submissao)
         try:
-            # Carregar e processar template
+            # Etapa opcional: reduzir imagens grandes antes da codificação base64
+            arquivos = list(arquivos or [])
+            if arquivos:
+                arquivos, self.bytes_economizados = ImageService.otimizar_anexos(arquivos)
+                if self.bytes_economizados:
+                    logger.info("Otimização de imagens economizou %.2f MB",
+                                self.bytes_economizados / 1024 / 1024)
+            
+            # Planejar a divisão dos anexos pelo HTML final da parte 1: o aviso "dividido em N emails"
+            # aumenta o HTML, então o plano é refeito até a quantidade de mensagens se estabilizar
+            total_mensagens = 1
             html_content = self._processar_template(dados_formulario)
+            partes = self.planejar_mensagens(len(html_content.encode('utf-8')), arquivos)
+            while len(partes) > total_mensagens:
+                total_mensagens = len(partes)
+                html_content = self._processar_template(dados_formulario, total_mensagens, id_submissao)
+                partes = self.planejar_mensagens(len(html_content.encode('utf-8')), arquivos)
+            resultado.total_mensagens = total_mensagens
             
             # Determinar assunto do email baseado se é grupo ou não
             grupo_info = dados_formulario.get('grupo_info', {})
@@ -83,6 +141,9 @@ class EmailService:
             else:
                 subject = self.subject
             
+            if total_mensagens > 1:
+                subject = f"{subject} | Parte 1/{total_mensagens} | {id_submissao}"
+            
             # Criar email com múltiplos destinatários
             message = Mail(
                 from_email=(self.from_email, self.from_name),
@@ -92,28 +153,87 @@ class EmailService:
             )
             
             # Adicionar anexos se houver
-            if arquivos:
-                self._adicionar_anexos(message, arquivos)
+            if partes[0]:
+                self._adicionar_anexos(message, partes[0])
             
             # Enviar email
             response = self.client.send(message)
             
             # Verificar sucesso (status 202 = aceito para entrega)
-            return response.status_code == 202
+            if response.status_code != 202:
+                return resultado
+            resultado.partes_enviadas.append(1)
+            
+            # Emails de continuação com os anexos restantes
+            for parte, anexos in enumerate(partes[1:], start=2):
+                continuacao = Mail(
+                    from_email=(self.from_email, self.from_name),
+                    to_emails=self.to_emails,
+                    subject=f"📎 Anexos {parte}/{total_mensagens} | {id_submissao}",
+                    html_content=self._processar_template_continuacao(
+                        dados_formulario, anexos, parte, total_mensagens, id_submissao
+                    )
+                )
+                self._adicionar_anexos(continuacao, anexos)
+                
+                if self.client.send(continuacao).status_code != 202:
+                    logger.error("Solicitação %s: parte %d/%d não enviada", id_submissao, parte, total_mensagens)
+                    return resultado
+                resultado.partes_enviadas.append(parte)
+            
+            return resultado
             
         except Exception as e:
-            st.error(f"Erro ao enviar email: {str(e)}")
-            return False
+            if resultado.partes_enviadas:
+                logger.exception("Solicitação %s: envio interrompido após as partes %s",
+                                 id_submissao, resultado.partes_enviadas)
+            else:
+                st.error(f"Erro ao enviar email: {str(e)}")
+            return resultado
+    
+    @staticmethod
+    def tamanho_codificado(arquivo: Any) -> int:
+        """Tamanho do anexo após codificação base64 (+ cabeçalhos)"""
+        tamanho = getattr(arquivo, 'size', 0) or 0
+        return 4 * ((tamanho + 2) // 3) + EMAIL_CONFIG["overhead_anexo_bytes"]
+    
+    @classmethod
+    def planejar_mensagens(cls, tamanho_html: int, arquivos: List[Any]) -> List[List[Any]]:
+        """
+        Distribui os anexos em mensagens que respeitem o limite de tamanho
+        (first-fit decreasing). A primeira mensagem leva o HTML completo;
+        anexos maiores que qualquer espaço livre ficam sozinhos em uma mensagem.
+        
+        Returns:
+            List[List]: anexos de cada mensagem, na ordem original; sempre ao menos uma
+        """
+        limite = EMAIL_CONFIG["limite_mensagem_bytes"]
+        partes: List[List[int]] = [[]]
+        livres = [limite - tamanho_html]
+        
+        ordem = sorted(range(len(arquivos)), key=lambda i: cls.tamanho_codificado(arquivos[i]), reverse=True)
+        for i in ordem:
+            tamanho = cls.tamanho_codificado(arquivos[i])
+            for parte, livre in enumerate(livres):
+                if tamanho <= livre:
+                    partes[parte].append(i)
+                    livres[parte] -= tamanho
+                    break
+            else:
+                partes.append([i])
+                livres.append(limite - EMAIL_CONFIG["margem_continuacao_bytes"] - tamanho)
+        
+        return [[arquivos[i] for i in sorted(parte)] for parte in partes]
     
-    def _processar_template(self, dados: Dict[str, Any]) -> str:
+    @staticmethod
+    def _gerar_id_submissao() -> str:
+        """Gera identificador único para ligar as mensagens de uma solicitação"""
+        return f"SUB_{int(time.time())}_{uuid.uuid4().hex[:6].upper()}"
+    
+    def _processar_template(self, dados: Dict[str, Any], total_mensagens: int = 1,
+                            id_submissao: Optional[str] = None) -> str:
         """Processa template HTML com os dados do formulário"""
         try:
-            # Carregar template
-            with open("templates/email_template.html", "r", encoding="utf-8") as f:
-                template_content = f.read()
-            
-            template = Template(template_content)
-            
             # Preparar dados para o template
             template_data = {
                 'nome_completo': dados.get('nome_completo', ''),
@@ -133,31 +253,68 @@ class EmailService:
                 'dias_restantes': dados.get('dias_restantes', ''),
                 'equipamentos': dados.get('equipamentos', []),
                 'equipamentos_html': len(dados.get('equipamentos', [])) > 0,
+                'equipamentos_total': dados.get('equipamentos_total', ''),
                 'arquivos': dados.get('arquivos_info', []),
                 'timestamp': self._obter_horario_brasileiro(),
                 'incluir_outro_quiosque': dados.get('incluir_outro_quiosque', False),
-                'grupo_info': dados.get('grupo_info', {})
+                'grupo_info': dados.get('grupo_info', {}),
+                'total_mensagens': total_mensagens,
+                'id_submissao': id_submissao
             }
             
-            return template.render(**template_data)
+            # Renderização no pool de workers (fora da thread do script)
+            futuro = WorkerPool.submeter(renderizar_template, self.TEMPLATE_EMAIL, template_data)
+            return WorkerPool.resultado(futuro, renderizar_template, self.TEMPLATE_EMAIL, template_data)
             
         except Exception as e:
             st.error(f"Erro ao processar template: {str(e)}")
             return "<p>Erro ao gerar conteúdo do email</p>"
     
+    def _processar_template_continuacao(self, dados: Dict[str, Any], anexos: List[Any],
+                                        parte: int, total_mensagens: int, id_submissao: str) -> str:
+        """Processa template das mensagens que levam apenas anexos restantes"""
+        template_data = {
+            'nome_completo': dados.get('nome_completo', ''),
+            'razao_social': dados.get('razao_social', ''),
+            'cnpj_formatado': self._formatar_cnpj(dados.get('cnpj', '')),
+            'grupo_info': dados.get('grupo_info', {}),
+            'arquivos': [
+                {'name': getattr(a, 'name', 'anexo'), 'size_mb': round(getattr(a, 'size', 0) / 1024 / 1024, 2)}
+                for a in anexos
+            ],
+            'parte': parte,
+            'total_mensagens': total_mensagens,
+            'id_submissao': id_submissao,
+            'timestamp': self._obter_horario_brasileiro()
+        }
+        try:
+            futuro = WorkerPool.submeter(renderizar_template, self.TEMPLATE_CONTINUACAO, template_data)
+            return WorkerPool.resultado(futuro, renderizar_template, self.TEMPLATE_CONTINUACAO, template_data)
+        except Exception:
+            return f"<p>Anexos {parte}/{total_mensagens} da solicitação {id_submissao}</p>"
+    
     def _adicionar_anexos(self, message: Mail, arquivos: List[Any]):
         """Adiciona arquivos como anexos ao email"""
-        for arquivo in arquivos:
+        # Codificação base64 dos arquivos do spool é feita em paralelo no pool de workers
+        futuros = [
+            WorkerPool.submeter(codificar_arquivo_base64, arquivo.path) if hasattr(arquivo, 'path') else None
+            for arquivo in arquivos
+        ]
+        
+        for arquivo, futuro in zip(arquivos, futuros):
             try:
-                # Ler conteúdo do arquivo
-                file_content = arquivo.read()
-                
-                # Resetar ponteiro para futuras leituras
-                if hasattr(arquivo, 'seek'):
-                    arquivo.seek(0)
-                
-                # Codificar em base64
-                encoded_content = base64.b64encode(file_content).decode()
+                if futuro is not None:
+                    encoded_content = WorkerPool.resultado(futuro, codificar_arquivo_base64, arquivo.path)
+                else:
+                    # Ler conteúdo do arquivo
+                    file_content = arquivo.read()
+                    
+                    # Resetar ponteiro para futuras leituras
+                    if hasattr(arquivo, 'seek'):
+                        arquivo.seek(0)
+                    
+                    # Codificar em base64
+                    encoded_content = base64.b64encode(file_content).decode()
                 
                 # Determinar tipo do arquivo
                 file_name = getattr(arquivo, 'name', 'anexo')
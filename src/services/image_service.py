@@ -0,0 +1,94 @@
+import io
+import hashlib
+from typing import Any, List, Optional, Tuple
+from src.models.formulario import ArquivoSpool
+from src.services.worker_pool import WorkerPool
+from src.services.spool_service import SpoolService
+from config import IMAGE_CONFIG
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow é opcional - sem ele as imagens seguem como foram enviadas
+    Image = None
+
+class ImageService:
+    """Etapa opcional que reduz e recomprime imagens antes de anexá-las ao email"""
+
+    TIPOS_OTIMIZAVEIS = {'image/jpeg': 'JPEG', 'image/png': 'PNG'}
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        """Indica se a otimização está habilitada e o Pillow instalado"""
+        return Image is not None and IMAGE_CONFIG["otimizar_imagens"]
+
+    @staticmethod
+    def otimizar_imagem(conteudo: bytes, formato: str) -> Optional[bytes]:
+        """Reduz a imagem ao tamanho máximo configurado e recomprime.
+        Retorna None se o resultado não for menor que o original"""
+        with Image.open(io.BytesIO(conteudo)) as imagem:
+            # Fotos de celular guardam a rotação no EXIF
+            imagem = ImageOps.exif_transpose(imagem)
+
+            max_dimensao = IMAGE_CONFIG["max_dimensao"]
+            imagem.thumbnail((max_dimensao, max_dimensao), Image.LANCZOS)
+
+            saida = io.BytesIO()
+            if formato == 'JPEG':
+                if imagem.mode not in ('RGB', 'L'):
+                    imagem = imagem.convert('RGB')
+                imagem.save(saida, 'JPEG', quality=IMAGE_CONFIG["qualidade_jpeg"],
+                            optimize=True, progressive=True)
+            else:
+                imagem.save(saida, 'PNG', optimize=True)
+
+        resultado = saida.getvalue()
+        return resultado if len(resultado) < len(conteudo) else None
+
+    @classmethod
+    def _processar_arquivo(cls, arquivo: ArquivoSpool) -> Optional[ArquivoSpool]:
+        """Otimiza um arquivo do spool, gravando a versão reduzida ao lado do original (executado no worker)"""
+        try:
+            otimizado = cls.otimizar_imagem(arquivo.read(), cls.TIPOS_OTIMIZAVEIS[arquivo.type])
+        except Exception:
+            return None
+        if otimizado is None:
+            return None
+
+        destino = SpoolService.caminho_derivado(arquivo, 'otimizado')
+        with open(destino, 'wb') as f:
+            f.write(otimizado)
+
+        return ArquivoSpool(
+            name=arquivo.name,
+            size=len(otimizado),
+            type=arquivo.type,
+            sha256=hashlib.sha256(otimizado).hexdigest(),
+            path=destino
+        )
+
+    @classmethod
+    def otimizar_anexos(cls, arquivos: List[Any]) -> Tuple[List[Any], int]:
+        """Otimiza as imagens da lista em paralelo no pool de workers. Os originais permanecem no spool,
+        com as versões reduzidas registradas como derivadas (descartadas junto com eles).
+        Retorna (lista de anexos a enviar, bytes economizados)"""
+        if not arquivos or not cls.disponivel():
+            return list(arquivos or []), 0
+
+        futuros = {}
+        for i, arquivo in enumerate(arquivos):
+            if (isinstance(arquivo, ArquivoSpool)
+                    and arquivo.type in cls.TIPOS_OTIMIZAVEIS
+                    and arquivo.size >= IMAGE_CONFIG["tamanho_minimo"]):
+                futuros[i] = WorkerPool.submeter(cls._processar_arquivo, arquivo)
+
+        resultado = list(arquivos)
+        bytes_economizados = 0
+        for i, futuro in futuros.items():
+            otimizado = WorkerPool.resultado(futuro, cls._processar_arquivo, arquivos[i])
+            if otimizado is not None:
+                # O worker recebe uma cópia do handle: o registro é feito aqui, no handle da sessão
+                SpoolService.registrar_derivado(arquivos[i], otimizado)
+                bytes_economizados += arquivos[i].size - otimizado.size
+                resultado[i] = otimizado
+
+        return resultado, bytes_economizados
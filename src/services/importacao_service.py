@@ -0,0 +1,171 @@
+import io
+import csv
+import unicodedata
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from src.models.formulario import TabelaEquipamentos
+from src.utils.formatters import ValueFormatter
+from config import IMPORTACAO_CONFIG
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # openpyxl é opcional - sem ele só a importação de CSV fica disponível
+    load_workbook = None
+
+@dataclass
+class ResultadoImportacao:
+    """Linhas aceitas de uma planilha e contagem das rejeitadas"""
+    tabela: TabelaEquipamentos = field(default_factory=TabelaEquipamentos)
+    rejeitadas: int = 0
+    motivos: List[str] = field(default_factory=list)
+    truncado: bool = False
+
+    @property
+    def importadas(self) -> int:
+        return len(self.tabela)
+
+    def rejeitar(self, referencia: str, motivo: str):
+        """Conta uma rejeição (referencia: "Linha 3", nome do arquivo etc.)"""
+        self.rejeitadas += 1
+        # Só os primeiros motivos são guardados - a contagem continua completa
+        if len(self.motivos) < IMPORTACAO_CONFIG["max_motivos"]:
+            self.motivos.append(f"{referencia}: {motivo}")
+
+class ImportacaoEquipamentosService:
+    """Importa equipamentos de planilhas XLSX/CSV lendo uma linha por vez"""
+
+    # Cabeçalhos reconhecidos (sem acento, minúsculos) para cada coluna do equipamento
+    CABECALHOS = {
+        'tipo': ('tipo', 'equipamento', 'item', 'bem'),
+        'descricao': ('descricao', 'marca', 'modelo', 'marca/modelo', 'marca e modelo'),
+        'valor': ('valor', 'valor (r$)', 'valor r$', 'valor estimado', 'preco')
+    }
+
+    @staticmethod
+    def disponivel_xlsx() -> bool:
+        return load_workbook is not None
+
+    @staticmethod
+    def _normalizar(texto: Any) -> str:
+        texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+        return ' '.join(texto.lower().split())
+
+    @classmethod
+    def _mapear_cabecalho(cls, linha: Sequence[Any]) -> Optional[Dict[str, int]]:
+        """Posição de cada coluna pelo cabeçalho. None se a linha não for um cabeçalho"""
+        normalizados = [cls._normalizar(celula) for celula in linha]
+        mapa = {}
+        for coluna, nomes in cls.CABECALHOS.items():
+            for i, nome in enumerate(normalizados):
+                if nome in nomes and i not in mapa.values():
+                    mapa[coluna] = i
+                    break
+        return mapa if 'tipo' in mapa else None
+
+    @staticmethod
+    def _celula(linha: Sequence[Any], indice: Optional[int]) -> Any:
+        if indice is None or indice >= len(linha):
+            return None
+        return linha[indice]
+
+    @staticmethod
+    def _texto(celula: Any) -> str:
+        return '' if celula is None else str(celula).strip()
+
+    @staticmethod
+    def _valor_texto(valor: Any) -> Optional[str]:
+        """Texto do valor no formato 1.234,56. None se não for reconhecido"""
+        if valor is None or valor == '':
+            return ''
+        if isinstance(valor, (int, float, Decimal)) and not isinstance(valor, bool):
+            # Célula numérica do Excel: converte sem perder centavos pelo float
+            try:
+                centavos = int((Decimal(str(valor)) * 100).quantize(Decimal('1')))
+            except InvalidOperation:
+                return None
+            return ValueFormatter.formatar_centavos(centavos)[3:] if centavos >= 0 else None
+        texto = str(valor).strip()
+        return texto if ValueFormatter.converter_para_centavos(texto) is not None else None
+
+    @staticmethod
+    def linhas_xlsx(arquivo: Any) -> Iterator[Sequence[Any]]:
+        """Linhas da primeira planilha em modo somente leitura (sem carregar o arquivo inteiro)"""
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+        pasta = load_workbook(arquivo, read_only=True, data_only=True)
+        try:
+            yield from pasta.worksheets[0].iter_rows(values_only=True)
+        finally:
+            pasta.close()
+
+    @staticmethod
+    def linhas_csv(arquivo: Any) -> Iterator[Sequence[Any]]:
+        """Linhas de um CSV (separador ';', ',' ou TAB detectado na primeira linha)"""
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+        texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            primeira = texto.readline()
+            separador = max(';,\t', key=primeira.count)
+            yield from csv.reader([primeira], delimiter=separador)
+            yield from csv.reader(texto, delimiter=separador)
+        finally:
+            # Não fechar o arquivo enviado junto com o wrapper
+            texto.detach()
+
+    @classmethod
+    def importar_linhas(cls, linhas: Iterator[Sequence[Any]]) -> ResultadoImportacao:
+        """Converte as linhas em equipamentos. Sem cabeçalho, usa a ordem tipo, descrição, valor"""
+        resultado = ResultadoImportacao()
+        max_linhas = IMPORTACAO_CONFIG["max_linhas"]
+        mapa = None
+
+        for numero, linha in enumerate(linhas, 1):
+            linha = linha or ()
+            if numero == 1:
+                mapa = cls._mapear_cabecalho(linha)
+                if mapa is not None:
+                    continue
+                mapa = {'tipo': 0, 'descricao': 1, 'valor': 2}
+
+            tipo = cls._texto(cls._celula(linha, mapa.get('tipo')))
+            descricao = cls._texto(cls._celula(linha, mapa.get('descricao')))
+            valor_bruto = cls._celula(linha, mapa.get('valor'))
+            if not tipo and not descricao and valor_bruto in (None, ''):
+                continue  # Linha em branco
+
+            if resultado.importadas >= max_linhas:
+                resultado.truncado = True
+                resultado.rejeitar(f"Linha {numero}", f"limite de {max_linhas} itens por importação")
+                break
+            if not tipo:
+                resultado.rejeitar(f"Linha {numero}", "tipo não informado")
+                continue
+            valor = cls._valor_texto(valor_bruto)
+            if valor is None:
+                resultado.rejeitar(f"Linha {numero}", f"valor '{valor_bruto}' não reconhecido")
+                continue
+
+            resultado.tabela.append({'tipo': tipo, 'descricao': descricao, 'valor': valor})
+
+        return resultado
+
+    @classmethod
+    def importar(cls, arquivo: Any) -> ResultadoImportacao:
+        """Importa um arquivo enviado (.xlsx ou .csv). Levanta ValueError se o formato não for suportado"""
+        nome = getattr(arquivo, 'name', '')
+        extensao = nome.lower().rsplit('.', 1)[-1] if '.' in nome else ''
+        if extensao == 'xlsx':
+            if not cls.disponivel_xlsx():
+                raise ValueError("Importação de XLSX indisponível (openpyxl não instalado)")
+            linhas = cls.linhas_xlsx(arquivo)
+        elif extensao == 'csv':
+            linhas = cls.linhas_csv(arquivo)
+        else:
+            raise ValueError(f"Formato não suportado para importação: '{nome}'")
+
+        try:
+            return cls.importar_linhas(linhas)
+        finally:
+            linhas.close()
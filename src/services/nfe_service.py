@@ -0,0 +1,163 @@
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+from xml.etree.ElementTree import iterparse, ParseError
+from src.services.worker_pool import WorkerPool
+from src.services.importacao_service import ResultadoImportacao
+from src.utils.formatters import ValueFormatter
+from config import IMPORTACAO_CONFIG, NFE_CONFIG
+
+# ==================== FUNÇÃO EXECUTADA NOS WORKERS ====================
+
+def _local(tag: str) -> str:
+    """Nome da tag sem o namespace do portal fiscal"""
+    return tag.rsplit('}', 1)[-1]
+
+def extrair_itens_nfe(conteudo: bytes) -> Dict[str, Any]:
+    """Lê uma NF-e (ou nfeProc) de forma incremental, liberando cada item após lido.
+    Retorna {'numero', 'emitente', 'itens': [{'descricao', 'quantidade', 'centavos'}]}"""
+    numero, emitente, itens = '', '', []
+    caminho: List[str] = []
+    pilha: List[Any] = []
+
+    for evento, elemento in iterparse(io.BytesIO(conteudo), events=('start', 'end')):
+        nome = _local(elemento.tag)
+        if evento == 'start':
+            caminho.append(nome)
+            pilha.append(elemento)
+            continue
+        caminho.pop()
+        pilha.pop()
+
+        if nome == 'nNF' and 'ide' in caminho:
+            numero = (elemento.text or '').strip()
+        elif nome == 'xNome' and caminho[-1:] == ['emit']:
+            emitente = (elemento.text or '').strip()
+        elif nome == 'det':
+            campos = {_local(filho.tag): (filho.text or '').strip()
+                      for prod in elemento if _local(prod.tag) == 'prod'
+                      for filho in prod}
+            try:
+                centavos = int((Decimal(campos.get('vProd', '')) * 100).quantize(Decimal('1')))
+            except InvalidOperation:
+                centavos = None
+            itens.append({
+                'descricao': campos.get('xProd', ''),
+                'quantidade': campos.get('qCom', ''),
+                'centavos': centavos
+            })
+
+        # Elementos já lidos são descartados e desligados do pai: memória constante em notas grandes.
+        # Dentro de um det, os filhos ficam até o próprio det terminar
+        if 'det' not in caminho and pilha:
+            elemento.clear()
+            pilha[-1].remove(elemento)
+
+    if not itens:
+        raise ValueError("nenhum item de NF-e encontrado")
+    return {'numero': numero, 'emitente': emitente, 'itens': itens}
+
+# ==================== SERVIÇO ====================
+
+class NfeService:
+    """Importa itens de NF-e (XML) para a tabela de equipamentos, com cache pelo hash do conteúdo.
+    O cache guarda só o hash e os itens já lidos (nunca o XML), limitado pelo total de itens"""
+
+    _cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+    _itens_em_cache = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _do_cache(cls, chave: str) -> Optional[Dict[str, Any]]:
+        with cls._lock:
+            nota = cls._cache.get(chave)
+            if nota is not None:
+                cls._cache.move_to_end(chave)
+            return nota
+
+    @classmethod
+    def _guardar(cls, chave: str, nota: Dict[str, Any]):
+        if len(nota['itens']) > NFE_CONFIG["max_cache_itens"]:
+            return  # Nota maior que o cache inteiro: não vale a pena guardar
+        with cls._lock:
+            anterior = cls._cache.pop(chave, None)
+            if anterior is not None:
+                cls._itens_em_cache -= len(anterior['itens'])
+            cls._cache[chave] = nota
+            cls._itens_em_cache += len(nota['itens'])
+            while (len(cls._cache) > NFE_CONFIG["max_cache"]
+                   or cls._itens_em_cache > NFE_CONFIG["max_cache_itens"]):
+                _, removida = cls._cache.popitem(last=False)
+                cls._itens_em_cache -= len(removida['itens'])
+
+    @staticmethod
+    def _quantidade(texto: str) -> str:
+        """Quantidade da nota sem zeros à direita ("2.0000" -> "2")"""
+        try:
+            return format(Decimal(texto).normalize(), 'f')
+        except InvalidOperation:
+            return texto
+
+    @classmethod
+    def _acrescentar(cls, resultado: ResultadoImportacao, nome: str, nota: Dict[str, Any]) -> bool:
+        """Converte os itens da nota em linhas de equipamento.
+        Retorna False quando o limite de itens por importação foi atingido"""
+        max_linhas = IMPORTACAO_CONFIG["max_linhas"]
+        origem = f"NF-e {nota['numero']}" if nota['numero'] else "NF-e"
+        if nota['emitente']:
+            origem += f" - {nota['emitente']}"
+        for i, item in enumerate(nota['itens'], 1):
+            if resultado.importadas >= max_linhas:
+                resultado.truncado = True
+                resultado.rejeitar(f"{nome}, item {i}", f"limite de {max_linhas} itens por importação")
+                return False
+            if not item['descricao']:
+                resultado.rejeitar(f"{nome}, item {i}", "produto sem descrição")
+                continue
+            if item['centavos'] is None or item['centavos'] < 0:
+                resultado.rejeitar(f"{nome}, item {i}", "valor do produto inválido")
+                continue
+            quantidade = cls._quantidade(item['quantidade'])
+            descricao = origem if quantidade in ('', '1') else f"Qtd {quantidade} • {origem}"
+            resultado.tabela.append({
+                'tipo': item['descricao'],
+                'descricao': descricao,
+                'valor': ValueFormatter.formatar_centavos(item['centavos'])[3:]
+            })
+        return True
+
+    @classmethod
+    def importar(cls, arquivos: List[Any]) -> ResultadoImportacao:
+        """Processa vários XMLs em paralelo no pool de workers.
+        Notas já vistas (mesmo conteúdo) saem do cache sem nova leitura"""
+        resultado = ResultadoImportacao()
+        notas: List[Optional[Dict[str, Any]]] = [None] * len(arquivos)
+        pendentes = {}
+
+        for i, arquivo in enumerate(arquivos):
+            nome = getattr(arquivo, 'name', f'arquivo {i + 1}')
+            if getattr(arquivo, 'size', 0) > NFE_CONFIG["max_tamanho"]:
+                resultado.rejeitar(nome, "arquivo maior que o limite para NF-e")
+                continue
+            conteudo = arquivo.getvalue() if hasattr(arquivo, 'getvalue') else arquivo.read()
+            chave = hashlib.sha256(conteudo).hexdigest()
+            notas[i] = cls._do_cache(chave)
+            if notas[i] is None:
+                pendentes[i] = (chave, conteudo, WorkerPool.submeter(extrair_itens_nfe, conteudo))
+
+        for i, (chave, conteudo, futuro) in pendentes.items():
+            try:
+                notas[i] = WorkerPool.resultado(futuro, extrair_itens_nfe, conteudo)
+            except (ParseError, ValueError) as e:
+                resultado.rejeitar(getattr(arquivos[i], 'name', f'arquivo {i + 1}'), f"XML inválido ({e})")
+                continue
+            cls._guardar(chave, notas[i])
+
+        # Ordem de envio preservada, independente da ordem de conclusão no pool
+        for arquivo, nota in zip(arquivos, notas):
+            if nota is not None and not cls._acrescentar(resultado, getattr(arquivo, 'name', 'NF-e'), nota):
+                break
+        return resultado
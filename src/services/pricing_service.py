@@ -0,0 +1,238 @@
+import io
+import csv
+import sys
+import argparse
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
+import numpy as np
+from src.utils.formatters import ValueFormatter, DateUtils
+from config import PLANOS_SEGURO, DATA_FINAL_VIGENCIA
+
+CENTAVO = Decimal('0.01')
+DIAS_ANO = Decimal(365)
+
+@dataclass(frozen=True)
+class CotacaoProRata:
+    """Prêmio pró-rata de um plano para uma data de inclusão"""
+    plano: str
+    preco_anual: Decimal
+    data_inclusao: date
+    dias_restantes: int
+    premio: Decimal
+    data_ajustada: bool = False  # True quando a inclusão pulou fim de semana/feriado
+
+    @property
+    def premio_float(self) -> float:
+        return float(self.premio)
+
+@dataclass(frozen=True)
+class TotalGrupo:
+    """Acumulado de um grupo de quiosques, atualizado a cada envio bem-sucedido"""
+    quiosques: int = 0
+    quantidade_por_plano: Dict[str, int] = field(default_factory=dict)
+    premio_total: Decimal = Decimal('0.00')
+    data_inicial: Optional[date] = None
+    data_final: Optional[date] = None
+
+    def com(self, cotacao: CotacaoProRata) -> 'TotalGrupo':
+        """Novo acumulado incluindo mais um quiosque (os anteriores não são recalculados)"""
+        quantidades = dict(self.quantidade_por_plano)
+        quantidades[cotacao.plano] = quantidades.get(cotacao.plano, 0) + 1
+        data = cotacao.data_inclusao
+        return replace(
+            self,
+            quiosques=self.quiosques + 1,
+            quantidade_por_plano=quantidades,
+            premio_total=self.premio_total + cotacao.premio,
+            data_inicial=min(self.data_inicial, data) if self.data_inicial else data,
+            data_final=max(self.data_final, data) if self.data_final else data
+        )
+
+    def resumo(self) -> Dict[str, Any]:
+        """Dados formatados para as telas de confirmação e o email"""
+        return {
+            'quiosques': self.quiosques,
+            'premio_total_formatado': ValueFormatter.formatar_valor_real(float(self.premio_total)),
+            'planos': [
+                {'plano': plano, 'quantidade': self.quantidade_por_plano[plano]}
+                for plano in PLANOS_SEGURO if plano in self.quantidade_por_plano
+            ],
+            'data_inicial': self.data_inicial.strftime('%d/%m/%Y') if self.data_inicial else '',
+            'data_final': self.data_final.strftime('%d/%m/%Y') if self.data_final else ''
+        }
+
+@dataclass
+class GradeCotacoes:
+    """Prêmios de todos os planos para cada data de solicitação de um intervalo"""
+    planos: List[str]
+    datas_solicitacao: np.ndarray   # datetime64[D]
+    datas_inclusao: np.ndarray      # datetime64[D] - próximo dia útil após a solicitação
+    dias_restantes: np.ndarray      # int64
+    premios_centavos: np.ndarray    # int64, formato (planos, datas)
+
+    def linhas(self) -> List[Dict[str, str]]:
+        """Linhas formatadas para exibição (uma por data de solicitação)"""
+        resultado = []
+        for j in range(len(self.datas_solicitacao)):
+            linha = {
+                'Solicitação': self.datas_solicitacao[j].astype(date).strftime('%d/%m/%Y'),
+                'Inclusão': self.datas_inclusao[j].astype(date).strftime('%d/%m/%Y'),
+                'Dias': int(self.dias_restantes[j])
+            }
+            for i, plano in enumerate(self.planos):
+                linha[plano] = ValueFormatter.formatar_valor_real(self.premios_centavos[i, j] / 100)
+            resultado.append(linha)
+        return resultado
+
+    def to_csv(self, destino: Optional[Union[str, TextIO]] = None) -> str:
+        """Exporta a grade em CSV (separador ';' e vírgula decimal, padrão do Excel pt-BR)"""
+        saida = io.StringIO()
+        writer = csv.writer(saida, delimiter=';')
+        writer.writerow(['data_solicitacao', 'data_inclusao', 'dias_restantes', *self.planos])
+        for j in range(len(self.datas_solicitacao)):
+            writer.writerow([
+                str(self.datas_solicitacao[j]),
+                str(self.datas_inclusao[j]),
+                int(self.dias_restantes[j]),
+                *(f"{self.premios_centavos[i, j] / 100:.2f}".replace('.', ',') for i in range(len(self.planos)))
+            ])
+
+        conteudo = saida.getvalue()
+        if isinstance(destino, str):
+            with open(destino, 'w', encoding='utf-8', newline='') as f:
+                f.write(conteudo)
+        elif destino is not None:
+            destino.write(conteudo)
+        return conteudo
+
+class PricingService:
+    """Motor único de cálculo pró-rata, memoizado por (plano, data de inclusão)"""
+
+    # Tabela do dia: (data de referência, {plano: cotação})
+    _tabela_dia: Tuple[Optional[date], Dict[str, CotacaoProRata]] = (None, {})
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def rotulos_planos() -> Dict[str, str]:
+        """Rótulos exibidos no seletor de planos -> identificador do plano"""
+        rotulos = {}
+        for plano, preco in PLANOS_SEGURO.items():
+            valor_formatado = ValueFormatter.formatar_valor_real(preco).replace("R$ ", "")
+            rotulos[f"{plano} -\n{valor_formatado}/ano"] = plano
+        return rotulos
+
+    @classmethod
+    def extrair_plano(cls, plano_selecionado: str) -> str:
+        """Obtém o identificador do plano a partir do rótulo (ou do próprio nome)"""
+        if not plano_selecionado:
+            return ""
+        plano = cls.rotulos_planos().get(plano_selecionado)
+        if plano is None:
+            plano = plano_selecionado.split('\n')[0].replace(' -', '').strip()
+        return plano
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def calcular(plano: str, data_inclusao: date, data_ajustada: bool = False) -> Optional[CotacaoProRata]:
+        """Calcula (em Decimal) o prêmio pró-rata do plano para a data de inclusão"""
+        if plano not in PLANOS_SEGURO:
+            return None
+
+        preco_anual = Decimal(str(PLANOS_SEGURO[plano]))
+        dias_restantes = (DATA_FINAL_VIGENCIA.date() - data_inclusao).days + 1
+        premio = (preco_anual * dias_restantes / DIAS_ANO).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+        return CotacaoProRata(
+            plano=plano,
+            preco_anual=preco_anual,
+            data_inclusao=data_inclusao,
+            dias_restantes=dias_restantes,
+            premio=premio,
+            data_ajustada=data_ajustada
+        )
+
+    @classmethod
+    def tabela_do_dia(cls) -> Dict[str, CotacaoProRata]:
+        """Cotações de todos os planos para inclusão no próximo dia útil (recalculada uma vez por dia)"""
+        hoje = datetime.now(timezone(timedelta(hours=-3))).date()
+        referencia, tabela = cls._tabela_dia
+        if referencia == hoje:
+            return tabela
+
+        data_inclusao = DateUtils.obter_proximo_dia_util().date()
+        ajustada = data_inclusao != hoje + timedelta(days=1)
+        tabela = {
+            plano: cls.calcular(plano, data_inclusao, ajustada)
+            for plano in PLANOS_SEGURO
+        }
+        cls._tabela_dia = (hoje, tabela)
+        return tabela
+
+    @classmethod
+    def cotacao(cls, plano_selecionado: str, data_inclusao: Optional[date] = None) -> Optional[CotacaoProRata]:
+        """Cotação do plano (rótulo ou nome). Sem data, usa a inclusão do próximo dia útil"""
+        plano = cls.extrair_plano(plano_selecionado)
+        if data_inclusao is None:
+            return cls.tabela_do_dia().get(plano)
+        return cls.calcular(plano, data_inclusao)
+
+    @classmethod
+    def opcoes_planos(cls) -> List[str]:
+        """Rótulos dos planos na ordem de exibição"""
+        return list(cls.rotulos_planos().keys())
+
+    @staticmethod
+    def grade_cotacoes(inicio: date, fim: date) -> GradeCotacoes:
+        """
+        Calcula, em uma única passada vetorizada, o prêmio de todos os planos
+        para cada data de solicitação em [inicio, fim]. A inclusão segue a regra
+        do formulário: próximo dia útil após a solicitação.
+        Os valores batem com PricingService.calcular (arredondamento half-up ao centavo).
+        """
+        if fim < inicio:
+            inicio, fim = fim, inicio
+
+        calendario = DateUtils._calendario_para(inicio, fim + timedelta(days=60))
+        posicoes = np.arange((inicio - calendario.inicio).days, (fim - calendario.inicio).days + 1)
+        proximo = np.asarray(calendario.proximo)[posicoes + 1]
+
+        base = np.datetime64(calendario.inicio, 'D')
+        datas_solicitacao = base + posicoes
+        datas_inclusao = base + proximo
+        dias_restantes = (np.datetime64(DATA_FINAL_VIGENCIA.date(), 'D') - datas_inclusao).astype(np.int64) + 1
+
+        planos = list(PLANOS_SEGURO.keys())
+        precos_centavos = np.array(
+            [int((Decimal(str(PLANOS_SEGURO[p])) * 100).to_integral_value()) for p in planos], dtype=np.int64
+        )
+
+        # premio = preco * dias / 365, arredondado half-up (afastando do zero) em aritmética inteira
+        numerador = precos_centavos[:, None] * dias_restantes[None, :]
+        premios_centavos = np.sign(numerador) * ((2 * np.abs(numerador) + 365) // 730)
+
+        return GradeCotacoes(
+            planos=planos,
+            datas_solicitacao=datas_solicitacao,
+            datas_inclusao=datas_inclusao,
+            dias_restantes=dias_restantes,
+            premios_centavos=premios_centavos
+        )
+
+def main(argv=None):
+    """Exporta a grade de cotações: python -m src.services.pricing_service --inicio AAAA-MM-DD --fim AAAA-MM-DD"""
+    hoje = date.today()
+    parser = argparse.ArgumentParser(description="Gera a grade de prêmios pró-rata por data de solicitação")
+    parser.add_argument('--inicio', type=date.fromisoformat, default=hoje, help="Primeira data (AAAA-MM-DD)")
+    parser.add_argument('--fim', type=date.fromisoformat, default=hoje + timedelta(days=30), help="Última data (AAAA-MM-DD)")
+    parser.add_argument('--saida', default=None, help="Arquivo CSV (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    grade = PricingService.grade_cotacoes(args.inicio, args.fim)
+    grade.to_csv(args.saida or sys.stdout)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
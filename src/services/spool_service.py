@@ -0,0 +1,178 @@
+import os
+import time
+import uuid
+import shutil
+import hashlib
+import weakref
+import threading
+from typing import Any, List, Optional
+from src.models.formulario import ArquivoSpool
+from config import UPLOAD_CONFIG
+
+class SpoolSessao:
+    """Diretório de spool de uma sessão - removido quando a sessão é descartada"""
+
+    def __init__(self, raiz: str):
+        self.id = uuid.uuid4().hex
+        self.path = os.path.join(raiz, self.id)
+        os.makedirs(self.path, exist_ok=True)
+
+        # Quando o session_state da sessão for coletado, o diretório é apagado
+        self._finalizador = weakref.finalize(self, shutil.rmtree, self.path, True)
+
+    def tocar(self):
+        """Atualiza o mtime do diretório para adiar a expiração por TTL"""
+        try:
+            os.utime(self.path)
+        except OSError:
+            os.makedirs(self.path, exist_ok=True)
+
+    def remover(self):
+        """Remove o diretório imediatamente"""
+        self._finalizador()
+
+class SpoolService:
+    """Serviço que persiste uploads em disco, mantendo apenas referências no session_state"""
+
+    SESSION_KEY = 'spool_sessao'
+
+    _ultima_limpeza = 0.0
+    _lock_limpeza = threading.Lock()
+
+    @classmethod
+    def obter_sessao(cls, session_state) -> SpoolSessao:
+        """Obtém (ou cria) o spool da sessão atual"""
+        cls.limpar_expirados()
+
+        sessao = session_state.get(cls.SESSION_KEY)
+        if sessao is None:
+            sessao = SpoolSessao(UPLOAD_CONFIG["spool_dir"])
+            session_state[cls.SESSION_KEY] = sessao
+        else:
+            sessao.tocar()
+        return sessao
+
+    @classmethod
+    def spool_arquivo(cls, session_state, arquivo: Any, tipo: Optional[str] = None) -> ArquivoSpool:
+        """Copia um arquivo enviado para o spool em blocos, calculando o hash"""
+        sessao = cls.obter_sessao(session_state)
+        nome = getattr(arquivo, 'name', 'anexo')
+        destino = os.path.join(sessao.path, uuid.uuid4().hex)
+
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+
+        sha = hashlib.sha256()
+        tamanho = 0
+        with open(destino, 'wb') as f:
+            while True:
+                bloco = arquivo.read(UPLOAD_CONFIG["chunk_size"])
+                if not bloco:
+                    break
+                sha.update(bloco)
+                f.write(bloco)
+                tamanho += len(bloco)
+
+        cls.liberar_upload_streamlit(arquivo)
+
+        return ArquivoSpool(
+            name=nome,
+            size=tamanho,
+            type=tipo or getattr(arquivo, 'type', '') or '',
+            sha256=sha.hexdigest(),
+            path=destino
+        )
+
+    @classmethod
+    def adicionar_arquivos(cls, session_state, arquivos: List[Any],
+                           chave: str = 'arquivos_upload',
+                           tipos: Optional[List[str]] = None) -> List[ArquivoSpool]:
+        """Envia arquivos ao spool e registra as referências (sem duplicar por hash)"""
+        handles = list(session_state.get(chave) or [])
+        hashes = {h.sha256 for h in handles}
+
+        novos = []
+        for i, arquivo in enumerate(arquivos):
+            handle = cls.spool_arquivo(session_state, arquivo, tipos[i] if tipos else None)
+            if handle.sha256 in hashes:
+                cls.descartar([handle])
+                continue
+            hashes.add(handle.sha256)
+            handles.append(handle)
+            novos.append(handle)
+
+        session_state[chave] = handles
+        return novos
+
+    @staticmethod
+    def caminho_derivado(handle: ArquivoSpool, sufixo: str) -> str:
+        """Caminho de uma cópia derivada do arquivo, ao lado dele no spool da sessão"""
+        return f"{handle.path}.{sufixo}"
+
+    @staticmethod
+    def registrar_derivado(original: ArquivoSpool, derivado: ArquivoSpool):
+        """Associa a cópia ao original: descartar o original remove também a cópia"""
+        if derivado.path not in original.derivados:
+            original.derivados.append(derivado.path)
+
+    @staticmethod
+    def descartar(handles: Optional[List[ArquivoSpool]]):
+        """Remove do disco os arquivos referenciados e as cópias derivadas deles"""
+        for handle in handles or []:
+            derivados = getattr(handle, 'derivados', [])
+            for caminho in (handle.path, *derivados):
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    pass
+            derivados.clear()
+
+    @classmethod
+    def limpar_sessao(cls, session_state):
+        """Remove o spool inteiro da sessão"""
+        sessao = session_state.get(cls.SESSION_KEY)
+        if sessao is not None:
+            sessao.remover()
+            del session_state[cls.SESSION_KEY]
+
+    @classmethod
+    def limpar_expirados(cls, forcar: bool = False):
+        """Remove spools de sessões inativas além do TTL (no máximo uma vez por intervalo)"""
+        agora = time.time()
+        if not forcar and agora - cls._ultima_limpeza < UPLOAD_CONFIG["intervalo_limpeza_segundos"]:
+            return
+        if not cls._lock_limpeza.acquire(blocking=False):
+            return
+
+        try:
+            cls._ultima_limpeza = agora
+            raiz = UPLOAD_CONFIG["spool_dir"]
+            if not os.path.isdir(raiz):
+                return
+
+            limite = agora - UPLOAD_CONFIG["spool_ttl_segundos"]
+            for entrada in os.scandir(raiz):
+                try:
+                    if entrada.is_dir() and entrada.stat().st_mtime < limite:
+                        shutil.rmtree(entrada.path, ignore_errors=True)
+                except OSError:
+                    continue
+        finally:
+            cls._lock_limpeza.release()
+
+    @staticmethod
+    def liberar_upload_streamlit(arquivo: Any):
+        """Descarta a cópia em memória mantida pelo Streamlit após o spool"""
+        file_id = getattr(arquivo, 'file_id', None)
+        if not file_id:
+            return
+        try:
+            from streamlit.runtime import Runtime
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+            ctx = get_script_run_ctx()
+            if ctx is not None and Runtime.exists():
+                Runtime.instance().uploaded_file_mgr.remove_file(ctx.session_id, file_id)
+        except Exception:
+            # API interna do Streamlit - se mudar, a memória é liberada ao fim da sessão
+            pass
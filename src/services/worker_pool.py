@@ -0,0 +1,86 @@
+import base64
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+from config import WORKER_CONFIG
+
+# ==================== FUNÇÕES EXECUTADAS NOS WORKERS ====================
+# Ficam no nível do módulo para serem serializáveis pelo pool de processos
+
+_templates_cache: Dict[str, Any] = {}
+
+def codificar_arquivo_base64(caminho: str) -> str:
+    """Lê um arquivo do spool e devolve o conteúdo em base64"""
+    with open(caminho, 'rb') as f:
+        return base64.b64encode(f.read()).decode()
+
+def renderizar_template(caminho: str, dados: Dict[str, Any]) -> str:
+    """Renderiza um template Jinja2, compilando-o uma vez por processo"""
+    template = _templates_cache.get(caminho)
+    if template is None:
+        from jinja2 import Template
+        with open(caminho, 'r', encoding='utf-8') as f:
+            template = Template(f.read())
+        _templates_cache[caminho] = template
+    return template.render(**dados)
+
+# ==================== POOL ====================
+
+class WorkerPool:
+    """Pool de processos limitado, compartilhado por todas as sessões do servidor"""
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _obter_executor(cls) -> Optional[ProcessPoolExecutor]:
+        """Cria o pool sob demanda ('spawn' evita fork de um servidor com threads)"""
+        if not WORKER_CONFIG["usar_processos"]:
+            return None
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ProcessPoolExecutor(
+                    max_workers=WORKER_CONFIG["max_workers"],
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return cls._executor
+
+    @classmethod
+    def _descartar_executor(cls):
+        """Descarta um pool quebrado para que o próximo envio crie outro"""
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    @staticmethod
+    def _executar_local(funcao: Callable, *args) -> Future:
+        """Executa na thread atual, devolvendo um Future já resolvido"""
+        futuro = Future()
+        try:
+            futuro.set_result(funcao(*args))
+        except Exception as e:
+            futuro.set_exception(e)
+        return futuro
+
+    @classmethod
+    def submeter(cls, funcao: Callable, *args) -> Future:
+        """Envia uma tarefa ao pool; sem pool disponível, executa localmente"""
+        try:
+            executor = cls._obter_executor()
+            if executor is not None:
+                return executor.submit(funcao, *args)
+        except (BrokenProcessPool, RuntimeError, OSError):
+            cls._descartar_executor()
+        return cls._executar_local(funcao, *args)
+
+    @classmethod
+    def resultado(cls, futuro: Future, funcao: Callable, *args) -> Any:
+        """Aguarda o resultado; se o pool quebrou no meio do caminho, refaz localmente"""
+        try:
+            return futuro.result()
+        except BrokenProcessPool:
+            cls._descartar_executor()
+            return funcao(*args)
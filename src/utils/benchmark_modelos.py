@@ -0,0 +1,72 @@
+import sys
+import time
+import argparse
+import tracemalloc
+from dataclasses import make_dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from src.models.formulario import Equipamento, FormularioSeguro, TabelaEquipamentos
+from src.utils.formatters import ValueFormatter
+
+# Mesmos campos do Equipamento, como dataclass comum (com __dict__ por instância) e to_dict sem cache
+EquipamentoAntigo = make_dataclass(
+    'EquipamentoAntigo',
+    [('tipo', str, field(default="")), ('descricao', str, field(default="")),
+     ('valor', str, field(default="")), ('valor_centavos', Optional[int], field(default=None))],
+    namespace={'to_dict': lambda self: {'tipo': self.tipo, 'descricao': self.descricao,
+                                        'valor': self.valor, 'valor_centavos': self.valor_centavos}}
+)
+
+def _linhas(quantidade: int) -> List[Dict[str, str]]:
+    return [{'tipo': f"Equipamento {i}", 'descricao': f"Marca {i % 50}", 'valor': f"{i % 9000 + 100},00"}
+            for i in range(quantidade)]
+
+def _memoria(construir: Callable[[], object]) -> Tuple[int, object]:
+    """Bytes retidos pelo objeto construído (medido com tracemalloc)"""
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    objeto = construir()
+    retido = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    return retido, objeto
+
+def _tempo(funcao: Callable[[], object], repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) * 1000
+
+def medir(quantidade: int, chamadas_por_rerun: int = 3) -> List[Tuple[str, float, float]]:
+    """Compara memória e tempo de serialização da representação atual com a antiga.
+    Retorna (descrição, antigo, atual)"""
+    linhas = _linhas(quantidade)
+    centavos = [ValueFormatter.converter_para_centavos(l['valor']) for l in linhas]
+
+    mem_antigo, antigos = _memoria(lambda: [EquipamentoAntigo(**l, valor_centavos=c) for l, c in zip(linhas, centavos)])
+    mem_atual, atuais = _memoria(lambda: [Equipamento(**l, valor_centavos=c) for l, c in zip(linhas, centavos)])
+    mem_lista, _ = _memoria(lambda: [dict(l) for l in linhas])
+    mem_tabela, _ = _memoria(lambda: TabelaEquipamentos.from_linhas(linhas))
+
+    formulario = FormularioSeguro(equipamentos=atuais)
+    serializar_antigo = lambda: [eq.to_dict() for eq in antigos]
+
+    return [
+        ("Memória dos modelos de equipamento (KiB)", mem_antigo / 1024, mem_atual / 1024),
+        ("Memória na sessão: lista de dicts x tabela por coluna (KiB)", mem_lista / 1024, mem_tabela / 1024),
+        (f"to_dict() x{chamadas_por_rerun} por execução (ms)",
+         _tempo(serializar_antigo, chamadas_por_rerun), _tempo(formulario.to_dict, chamadas_por_rerun))
+    ]
+
+def main(argv=None):
+    """Benchmark de memória dos modelos: python -m src.utils.benchmark_modelos --itens 5000"""
+    parser = argparse.ArgumentParser(description="Mede memória e serialização dos modelos do formulário")
+    parser.add_argument('--itens', type=int, default=5000, help="Quantidade de equipamentos")
+    args = parser.parse_args(argv)
+
+    print(f"{args.itens} equipamentos")
+    for descricao, antigo, atual in medir(args.itens):
+        economia = (1 - atual / antigo) * 100 if antigo else 0.0
+        print(f"{descricao:<62} antigo {antigo:>10.1f}   atual {atual:>10.1f}   ({economia:+.0f}% de economia)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import sys
+import time
+import random
+import argparse
+from typing import Callable, Dict, List, Tuple
+from src.validators.form_validators import ESQUEMA, FormValidator, MapaErros, _VERIFICADORES
+from src.validators.lote_validator import ValidadorLote
+
+def _com_dv(base: str, pesos: Tuple[Tuple[int, ...], ...], calcular_dv: Callable[[int], int]) -> str:
+    digitos = [int(c) for c in base]
+    for pesos_dv in pesos:
+        digitos.append(int(calcular_dv(sum(d * p for d, p in zip(digitos, pesos_dv)))))
+    return ''.join(map(str, digitos))
+
+def _registros(quantidade: int, semente: int = 42) -> List[Dict[str, str]]:
+    """Registros distintos (sem acertos de cache), cerca de 1 em 10 com algum erro"""
+    aleatorio = random.Random(semente)
+    registros = []
+    for i in range(quantidade):
+        cpf = _com_dv(f"{aleatorio.randrange(10 ** 9):09d}", *_VERIFICADORES['cpf'][1:])
+        cnpj = _com_dv(f"{aleatorio.randrange(10 ** 8):08d}0001", *_VERIFICADORES['cnpj'][1:])
+        registros.append({
+            'nome_completo': f"Pessoa {i} Silva" if i % 10 else f"Pessoa{i}",
+            'cpf': f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}",
+            'email': f"pessoa{i}@exemplo.com.br",
+            'telefone': f"(21) 9{aleatorio.randrange(10 ** 8):08d}",
+            'cnpj': f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}",
+            'cep': f"{aleatorio.randrange(20000, 23800):05d}-{aleatorio.randrange(1000):03d}",
+            'logradouro': "Av. Atlântica", 'numero': str(i), 'bairro': "Copacabana",
+            'cidade': "Rio de Janeiro", 'estado': "RJ", 'plano_selecionado': "Opção 1"
+        })
+    return registros
+
+def _por_segundo(funcao: Callable[[], object], quantidade: int) -> float:
+    inicio = time.perf_counter()
+    funcao()
+    return quantidade / (time.perf_counter() - inicio)
+
+def medir(quantidade: int) -> List[Tuple[str, float]]:
+    """Registros validados por segundo em cada caminho. Retorna (descrição, registros/s)"""
+    registros = _registros(quantidade)
+    FormValidator.validar_campo.cache_clear()
+
+    def por_campo():
+        for dados in registros:
+            MapaErros().atualizar(dados)
+
+    def passagem_unica():
+        for dados in registros:
+            ESQUEMA.validar(dados)
+
+    def em_lote():
+        colunas = {campo: [dados[campo] for dados in registros] for campo in ESQUEMA.por_campo}
+        ValidadorLote.validar_colunas(colunas, len(registros))
+
+    return [
+        ("Campo a campo (MapaErros, memoizado por valor)", _por_segundo(por_campo, quantidade)),
+        ("Passagem única (esquema compilado)", _por_segundo(passagem_unica, quantidade)),
+        ("Em lote, por coluna (ValidadorLote)", _por_segundo(em_lote, quantidade))
+    ]
+
+def main(argv=None):
+    """Vazão da validação: python -m src.utils.benchmark_validacao --registros 20000"""
+    parser = argparse.ArgumentParser(description="Mede validações por segundo do esquema de campos")
+    parser.add_argument('--registros', type=int, default=20000, help="Quantidade de registros distintos")
+    args = parser.parse_args(argv)
+
+    campos = len(ESQUEMA.campos)
+    print(f"{args.registros} registros, {campos} campos cada")
+    for descricao, por_segundo in medir(args.registros):
+        print(f"{descricao:<50} {por_segundo:>12,.0f} registros/s   {por_segundo * campos:>14,.0f} campos/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import os
+import sys
+import json
+import argparse
+import threading
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Union
+from config import CALENDARIO_CONFIG
+
+DataLike = Union[date, datetime]
+
+# Feriados nacionais fixos usados quando a biblioteca holidays falha
+FERIADOS_BASICOS = {
+    (1, 1): 'Confraternização Universal',
+    (4, 21): 'Tiradentes',
+    (5, 1): 'Dia do Trabalhador',
+    (9, 7): 'Independência do Brasil',
+    (10, 12): 'Nossa Senhora Aparecida',
+    (11, 2): 'Finados',
+    (11, 15): 'Proclamação da República',
+    (12, 25): 'Natal',
+}
+
+class CalendarioDiasUteis:
+    """
+    Calendário de dias úteis (Brasil/RJ + feriados municipais) pré-calculado por faixa de anos.
+
+    Cada dia da faixa ocupa uma posição nas tabelas abaixo, o que torna todas
+    as consultas O(1):
+    - uteis: bytearray com 1 para dia útil e 0 para fim de semana/feriado
+    - acumulado: quantidade de dias úteis antes de cada posição (soma prefixada)
+    - proximo: posição do primeiro dia útil a partir de cada posição
+    - ordinais: posição do k-ésimo dia útil da faixa
+    """
+
+    _instancia: Optional['CalendarioDiasUteis'] = None
+    _lock = threading.Lock()
+
+    def __init__(self, ano_inicial: int, ano_final: int, feriados: Dict[date, str]):
+        self.ano_inicial = ano_inicial
+        self.ano_final = ano_final
+        self.inicio = date(ano_inicial, 1, 1)
+        self.total_dias = (date(ano_final, 12, 31) - self.inicio).days + 1
+        self.feriados = feriados
+
+        self.uteis = bytearray(self.total_dias)
+        self.acumulado = array('l', [0]) * (self.total_dias + 1)
+        self.ordinais = array('l')
+
+        dia = self.inicio
+        for i in range(self.total_dias):
+            util = dia.weekday() < 5 and dia not in feriados
+            self.uteis[i] = util
+            self.acumulado[i + 1] = self.acumulado[i] + util
+            if util:
+                self.ordinais.append(i)
+            dia += timedelta(days=1)
+
+        # Preenchido de trás para frente: total_dias indica "nenhum dia útil adiante"
+        self.proximo = array('l', [self.total_dias]) * (self.total_dias + 1)
+        for i in range(self.total_dias - 1, -1, -1):
+            self.proximo[i] = i if self.uteis[i] else self.proximo[i + 1]
+
+    # ==================== CONSTRUÇÃO ====================
+
+    @staticmethod
+    def _ler_artefato(caminho: str) -> Dict[int, Dict[date, str]]:
+        """Lê o arquivo de feriados pré-gerado, agrupado por ano (vazio se ausente/inválido)"""
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        por_ano: Dict[int, Dict[date, str]] = {
+            ano: {} for ano in range(conteudo.get('ano_inicial', 0), conteudo.get('ano_final', -1) + 1)
+        }
+        for texto, nome in conteudo.get('feriados', {}).items():
+            data = date.fromisoformat(texto)
+            if data.year in por_ano:
+                por_ano[data.year][data] = nome
+        return por_ano
+
+    @staticmethod
+    def _feriados_biblioteca(anos: Iterable[int]) -> Dict[date, str]:
+        """Consulta a biblioteca holidays (importada só quando necessário)"""
+        anos = list(anos)
+        if not anos:
+            return {}
+        try:
+            import holidays
+            return dict(holidays.country_holidays('BR', subdiv='RJ', years=anos).items())
+        except Exception:
+            return {
+                date(ano, mes, dia): nome
+                for ano in anos for (mes, dia), nome in FERIADOS_BASICOS.items()
+            }
+
+    @classmethod
+    def carregar_feriados(cls, ano_inicial: int, ano_final: int,
+                          usar_artefato: bool = True) -> Dict[date, str]:
+        """Obtém os feriados do RJ para a faixa de anos, com os municipais do Rio.
+        Anos presentes no artefato não dependem da biblioteca holidays"""
+        anos = range(ano_inicial, ano_final + 1)
+        artefato = cls._ler_artefato(CALENDARIO_CONFIG["arquivo_feriados"]) if usar_artefato else {}
+
+        feriados: Dict[date, str] = {}
+        for ano in anos:
+            feriados.update(artefato.get(ano, {}))
+        feriados.update(cls._feriados_biblioteca(ano for ano in anos if ano not in artefato))
+
+        for ano in anos:
+            for (mes, dia), nome in CALENDARIO_CONFIG["feriados_municipais"].items():
+                feriados.setdefault(date(ano, mes, dia), nome)
+
+        return feriados
+
+    @classmethod
+    def exportar(cls, caminho: str, ano_inicial: int, ano_final: int) -> int:
+        """Gera o artefato de feriados para a faixa de anos. Retorna a quantidade exportada"""
+        feriados = cls.carregar_feriados(ano_inicial, ano_final, usar_artefato=False)
+        conteudo = {
+            'ano_inicial': ano_inicial,
+            'ano_final': ano_final,
+            'gerado_em': date.today().isoformat(),
+            'feriados': {d.isoformat(): nome for d, nome in sorted(feriados.items())}
+        }
+
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f, ensure_ascii=False, indent=1)
+            f.write('\n')
+        return len(feriados)
+
+    @classmethod
+    def construir(cls, ano_inicial: int, ano_final: int) -> 'CalendarioDiasUteis':
+        """Constrói o calendário para a faixa de anos informada"""
+        return cls(ano_inicial, ano_final, cls.carregar_feriados(ano_inicial, ano_final))
+
+    @classmethod
+    def obter(cls) -> 'CalendarioDiasUteis':
+        """Retorna o calendário do processo, construído uma única vez"""
+        if cls._instancia is None:
+            with cls._lock:
+                if cls._instancia is None:
+                    ano_atual = date.today().year
+                    cls._instancia = cls.construir(
+                        ano_atual - CALENDARIO_CONFIG["anos_anteriores"],
+                        ano_atual + CALENDARIO_CONFIG["anos_seguintes"]
+                    )
+        return cls._instancia
+
+    # ==================== CONSULTAS ====================
+
+    def _posicao(self, data: DataLike) -> int:
+        """Converte uma data na posição da tabela (ValueError se fora da faixa)"""
+        if isinstance(data, datetime):
+            data = data.date()
+        posicao = (data - self.inicio).days
+        if not 0 <= posicao < self.total_dias:
+            raise ValueError(f"Data {data} fora do calendário ({self.ano_inicial}-{self.ano_final})")
+        return posicao
+
+    def _data(self, posicao: int) -> date:
+        if not 0 <= posicao < self.total_dias:
+            raise ValueError(f"Resultado fora do calendário ({self.ano_inicial}-{self.ano_final})")
+        return self.inicio + timedelta(days=posicao)
+
+    def contem(self, data: DataLike) -> bool:
+        """Indica se a data está dentro da faixa pré-calculada"""
+        if isinstance(data, datetime):
+            data = data.date()
+        return 0 <= (data - self.inicio).days < self.total_dias
+
+    def eh_feriado(self, data: DataLike) -> bool:
+        """Verifica se a data é feriado"""
+        if isinstance(data, datetime):
+            data = data.date()
+        return data in self.feriados
+
+    def eh_dia_util(self, data: DataLike) -> bool:
+        """Verifica se a data é dia útil"""
+        return bool(self.uteis[self._posicao(data)])
+
+    def proximo_dia_util(self, data: DataLike) -> date:
+        """Primeiro dia útil estritamente posterior à data"""
+        return self._data(self.proximo[self._posicao(data) + 1])
+
+    def somar_dias_uteis(self, data: DataLike, dias: int) -> date:
+        """Data que fica `dias` dias úteis após (ou antes, se negativo) a data informada"""
+        posicao = self._posicao(data)
+        if dias == 0:
+            return self._data(posicao)
+        if dias > 0:
+            indice = self.acumulado[posicao + 1] + dias - 1
+        else:
+            indice = self.acumulado[posicao] + dias
+        if not 0 <= indice < len(self.ordinais):
+            raise ValueError(f"Resultado fora do calendário ({self.ano_inicial}-{self.ano_final})")
+        return self._data(self.ordinais[indice])
+
+    def dias_uteis_entre(self, inicio: DataLike, fim: DataLike) -> int:
+        """Quantidade de dias úteis no intervalo [inicio, fim) (negativa se fim < inicio)"""
+        a, b = self._posicao(inicio), self._posicao(fim)
+        if b >= a:
+            return self.acumulado[b] - self.acumulado[a]
+        return -(self.acumulado[a] - self.acumulado[b])
+
+    def feriados_ano(self, ano: int) -> Dict[date, str]:
+        """Feriados de um ano da faixa, ordenados por data"""
+        return {d: nome for d, nome in sorted(self.feriados.items()) if d.year == ano}
+
+
+def main(argv=None):
+    """Exporta o calendário de feriados: python -m src.utils.calendario [--anos N]"""
+    ano_atual = date.today().year
+    parser = argparse.ArgumentParser(description="Gera o arquivo de feriados Brasil/RJ usado pelo DateUtils")
+    parser.add_argument('--inicio', type=int, default=ano_atual - CALENDARIO_CONFIG["anos_anteriores"],
+                        help="Primeiro ano exportado")
+    parser.add_argument('--anos', type=int, default=10, help="Quantidade de anos exportados")
+    parser.add_argument('--saida', default=CALENDARIO_CONFIG["arquivo_feriados"], help="Arquivo de saída")
+    args = parser.parse_args(argv)
+
+    ano_final = args.inicio + args.anos - 1
+    total = CalendarioDiasUteis.exportar(args.saida, args.inicio, ano_final)
+    print(f"✓ {total} feriados de {args.inicio} a {ano_final} exportados para {args.saida}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,12 @@
 import re
-from datetime import datetime, timezone, timedelta
-import holidays
+from datetime import date, datetime, timezone, timedelta
+from functools import lru_cache
+from typing import Optional
+from src.utils.calendario import CalendarioDiasUteis
+
+# Valores em Real: "1.234,56", "1234,56", "1234" ou, vindo de planilhas, "1234.56"
+_RE_VALOR_BRL = re.compile(r'(\d{1,3}(?:\.\d{3})+|\d+)(?:,(\d{1,2}))?')
+_RE_VALOR_PONTO = re.compile(r'(\d+)\.(\d{1,2})')
 
 class DocumentFormatter:
     """Classe para formatação de documentos (CPF, CNPJ, CEP, etc.)"""
@@ -49,6 +55,24 @@ class ValueFormatter:
             return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
         except (ValueError, TypeError):
             return "R$ 0,00"
+    
+    @staticmethod
+    def converter_para_centavos(texto: str) -> Optional[int]:
+        """Converte um valor em Real digitado (ex.: "R$ 1.234,56") para centavos.
+        Retorna None se o texto não for um valor reconhecível"""
+        limpo = re.sub(r'\s', '', (texto or '').replace('R$', ''))
+        correspondencia = _RE_VALOR_BRL.fullmatch(limpo) or _RE_VALOR_PONTO.fullmatch(limpo)
+        if not correspondencia:
+            return None
+        inteiro, decimais = correspondencia.groups()
+        return int(inteiro.replace('.', '')) * 100 + int((decimais or '').ljust(2, '0'))
+    
+    @staticmethod
+    def formatar_centavos(centavos: int) -> str:
+        """Formata um valor em centavos como Real sem passar por float"""
+        reais, resto = divmod(abs(centavos), 100)
+        sinal = '-' if centavos < 0 else ''
+        return f"R$ {sinal}{reais:,}".replace(',', '.') + f",{resto:02d}"
 
 class StringUtils:
     """Utilitários para manipulação de strings"""
@@ -77,51 +101,42 @@ class DateUtils:
         tz_brasil = timezone(timedelta(hours=-3))
         return datetime.now(tz_brasil).strftime('%d/%m/%Y às %H:%M')
     
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _calendario_extra(ano_inicial: int, ano_final: int) -> CalendarioDiasUteis:
+        """Calendário para anos fora da faixa pré-calculada do processo"""
+        return CalendarioDiasUteis.construir(ano_inicial, ano_final)
+    
+    @staticmethod
+    def _calendario_para(*datas) -> CalendarioDiasUteis:
+        """Retorna um calendário que cubra todas as datas (com folga de um ano)"""
+        calendario = CalendarioDiasUteis.obter()
+        if all(calendario.contem(d) for d in datas):
+            return calendario
+        anos = [d.year for d in datas]
+        return DateUtils._calendario_extra(min(anos) - 1, max(anos) + 1)
+    
     @staticmethod
     def _eh_feriado(data: datetime) -> bool:
-        """Verifica se uma data é feriado usando a biblioteca holidays"""
-        try:
-            # Criar instância de feriados brasileiros do estado do RJ
-            feriados_br = holidays.country_holidays('BR', subdiv='RJ', years=data.year)
-            
-            # Adicionar feriados municipais específicos do Rio de Janeiro
-            # que podem não estar incluídos automaticamente
-            feriados_municipais_rj = [
-                (1, 20),   # São Sebastião (Padroeiro do Rio de Janeiro)
-                (3, 1),    # Aniversário da Cidade do Rio de Janeiro
-            ]
-            
-            # Verificar feriados da biblioteca
-            if data.date() in feriados_br:
-                return True
-                
-            # Verificar feriados municipais adicionais
-            for mes, dia in feriados_municipais_rj:
-                if data.month == mes and data.day == dia:
-                    return True
-                    
-            return False
-            
-        except Exception:
-            # Se houver erro, usar lógica de fallback apenas para feriados nacionais básicos
-            return DateUtils._eh_feriado_fallback(data)
-    
-    @staticmethod
-    def _eh_feriado_fallback(data: datetime) -> bool:
-        """Fallback para verificação de feriados em caso de erro"""
-        # Feriados fixos básicos (nacional)
-        feriados_basicos = [
-            (1, 1),    # Ano Novo
-            (4, 21),   # Tiradentes
-            (5, 1),    # Dia do Trabalhador
-            (9, 7),    # Independência
-            (10, 12),  # Nossa Senhora Aparecida
-            (11, 2),   # Finados
-            (11, 15),  # Proclamação da República
-            (12, 25),  # Natal
-        ]
-        
-        return (data.month, data.day) in feriados_basicos
+        """Verifica se uma data é feriado (nacional, estadual RJ ou municipal do Rio)"""
+        return DateUtils._calendario_para(data).eh_feriado(data)
+    
+    @staticmethod
+    def eh_dia_util(data) -> bool:
+        """Verifica se a data é dia útil (não é fim de semana nem feriado)"""
+        return DateUtils._calendario_para(data).eh_dia_util(data)
+    
+    @staticmethod
+    def somar_dias_uteis(data, dias: int) -> date:
+        """Retorna a data após somar (ou subtrair) dias úteis"""
+        # Folga de um ano a cada ~250 dias úteis
+        folga = timedelta(days=366 * (abs(dias) // 250 + 1))
+        return DateUtils._calendario_para(data, data - folga, data + folga).somar_dias_uteis(data, dias)
+    
+    @staticmethod
+    def dias_uteis_entre(inicio, fim) -> int:
+        """Quantidade de dias úteis no intervalo [inicio, fim)"""
+        return DateUtils._calendario_para(inicio, fim).dias_uteis_entre(inicio, fim)
     
     @staticmethod
     def obter_proximo_dia_util() -> datetime:
@@ -129,29 +144,9 @@ class DateUtils:
         tz_sao_paulo = timezone(timedelta(hours=-3))
         hoje = datetime.now(tz_sao_paulo).replace(hour=0, minute=0, second=0, microsecond=0)
         
-        data_candidata = hoje + timedelta(days=1)
-        
-        # Pular fins de semana e feriados
-        max_tentativas = 30  # Proteção contra loop infinito
-        tentativas = 0
-        
-        while tentativas < max_tentativas:
-            # Verificar se é fim de semana (5=sábado, 6=domingo)
-            if data_candidata.weekday() >= 5:
-                data_candidata += timedelta(days=1)
-                tentativas += 1
-                continue
-            
-            # Verificar se é feriado
-            if DateUtils._eh_feriado(data_candidata):
-                data_candidata += timedelta(days=1)
-                tentativas += 1
-                continue
-            
-            # É um dia útil válido
-            break
-        
-        return data_candidata
+        # Consulta O(1) no calendário pré-calculado
+        proximo = DateUtils._calendario_para(hoje, hoje + timedelta(days=60)).proximo_dia_util(hoje)
+        return hoje.replace(year=proximo.year, month=proximo.month, day=proximo.day)
     
     @staticmethod
     def obter_proximo_dia_util_simples() -> datetime:
@@ -162,28 +157,6 @@ class DateUtils:
     def listar_feriados_ano(ano: int) -> dict:
         """Lista todos os feriados de um ano específico"""
         try:
-            # Obter feriados brasileiros do RJ para o ano
-            feriados_br = holidays.country_holidays('BR', subdiv='RJ', years=ano)
-            
-            # Converter para dicionário com nomes
-            feriados_dict = {data: nome for data, nome in feriados_br.items()}
-            
-            # Adicionar feriados municipais específicos do Rio de Janeiro
-            feriados_municipais_rj = {
-                (1, 20): 'São Sebastião',
-                (3, 1): 'Aniversário da Cidade do Rio de Janeiro',
-            }
-            
-            # Adicionar feriados municipais se não estiverem já incluídos
-            for (mes, dia), nome in feriados_municipais_rj.items():
-                try:
-                    data_feriado = datetime(ano, mes, dia).date()
-                    if data_feriado not in feriados_dict:
-                        feriados_dict[data_feriado] = nome
-                except ValueError:
-                    continue  # Ignora datas inválidas
-            
-            return feriados_dict
-            
+            return DateUtils._calendario_para(date(ano, 1, 1)).feriados_ano(ano)
         except Exception:
-            return {} 
\ No newline at end of file
+            return {}
\ No newline at end of file
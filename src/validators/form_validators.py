@@ -1,94 +1,195 @@
 import re
-from typing import List, Dict
-from config import REGEX_PATTERNS, CAMPOS_OBRIGATORIOS
+import zipfile
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Mapping, NamedTuple, Pattern, Sequence, Tuple
+import numpy as np
+from config import REGEX_PATTERNS, ESQUEMA_CAMPOS, UPLOAD_CONFIG
+
+# Padrões compilados uma vez por processo
+_PADROES = {nome: re.compile(padrao) for nome, padrao in REGEX_PATTERNS.items()}
+# Só dígitos ASCII: dígitos Unicode (ex.: fullwidth "１２３") são descartados, não convertidos
+_RE_NAO_DIGITOS = re.compile(r'[^0-9]')
+
+def _digitos(valor: str) -> str:
+    return _RE_NAO_DIGITOS.sub('', valor)
+
+# Pesos dos dígitos verificadores (Receita Federal)
+_PESOS_CPF = (tuple(range(10, 1, -1)), tuple(range(11, 1, -1)))
+_PESOS_CNPJ = ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2))
+
+def _dv_cpf(soma):
+    return soma * 10 % 11 % 10
+
+def _dv_cnpj(soma):
+    resto = soma % 11
+    return np.where(resto < 2, 0, 11 - resto)
+
+def _digitos_verificadores_ok(numeros: str, pesos: Tuple[Tuple[int, ...], ...], calcular_dv) -> bool:
+    """Confere os dois dígitos finais e rejeita sequências repetidas (000..., 111...)"""
+    if numeros == numeros[0] * len(numeros):
+        return False
+    valores = [ord(c) - 48 for c in numeros]
+    for pesos_dv in pesos:
+        n = len(pesos_dv)
+        if calcular_dv(sum(v * p for v, p in zip(valores, pesos_dv))) != valores[n]:
+            return False
+    return True
+
+def _lote_digitos_verificadores(valores: Sequence[str], tamanho: int,
+                                pesos: Tuple[Tuple[int, ...], ...], calcular_dv) -> np.ndarray:
+    """Versão vetorizada: uma matriz de dígitos (N x tamanho) e um produto por dígito verificador"""
+    limpos = [_digitos(v or '') for v in valores]
+    resultado = np.zeros(len(limpos), dtype=bool)
+    indices = np.fromiter((i for i, d in enumerate(limpos) if len(d) == tamanho), dtype=np.intp)
+    if not len(indices):
+        return resultado
+    matriz = (np.frombuffer(''.join(limpos[i] for i in indices).encode('ascii'), dtype=np.uint8)
+              .reshape(-1, tamanho).astype(np.int64) - 48)
+    validos = ~(matriz == matriz[:, :1]).all(axis=1)
+    for pesos_dv in pesos:
+        n = len(pesos_dv)
+        validos &= calcular_dv(matriz[:, :n] @ np.array(pesos_dv)) == matriz[:, n]
+    resultado[indices] = validos
+    return resultado
+
+# Dígitos verificadores aceitos no esquema: tamanho, pesos e cálculo do dígito
+_VERIFICADORES = {'cpf': (11, _PESOS_CPF, _dv_cpf), 'cnpj': (14, _PESOS_CNPJ, _dv_cnpj)}
+
+class CampoCompilado(NamedTuple):
+    """Regras de um campo do esquema já resolvidas (padrão compilado, mensagens prontas)"""
+    campo: str
+    obrigatorio: Optional[str]
+    digitos: bool
+    padrao: Optional[Pattern]
+    min_palavras: int
+    mensagem: Optional[str]
+    digito_verificador: Optional[str]
+    mensagem_digito: Optional[str]
+
+class EsquemaCompilado:
+    """ESQUEMA_CAMPOS compilado uma vez: cada valor é normalizado uma única vez
+    e passa por padrão, quantidade de palavras e dígitos verificadores, nesta ordem"""
+    
+    def __init__(self, esquema: Mapping[str, Mapping[str, Any]]):
+        self.campos = tuple(
+            CampoCompilado(
+                campo=campo,
+                obrigatorio=f"{regra['rotulo']} é obrigatório" if regra.get('obrigatorio') else None,
+                digitos=regra.get('normalizar') == 'digitos',
+                padrao=_PADROES[regra['padrao']] if 'padrao' in regra else None,
+                min_palavras=regra.get('min_palavras', 0),
+                mensagem=regra.get('mensagem'),
+                digito_verificador=regra.get('digito_verificador'),
+                mensagem_digito=regra.get('mensagem_digito')
+            )
+            for campo, regra in esquema.items()
+        )
+        self.por_campo = {c.campo: c for c in self.campos}
+    
+    @staticmethod
+    def erro_formato(campo: CampoCompilado, valor: str) -> Optional[str]:
+        """Erro de formato de um valor já sem espaços nas pontas e não vazio"""
+        if campo.digitos:
+            valor = _digitos(valor)
+        if campo.padrao is not None and not campo.padrao.match(valor):
+            return campo.mensagem
+        if campo.min_palavras and len(valor.split()) < campo.min_palavras:
+            return campo.mensagem
+        if campo.digito_verificador:
+            _, pesos, calcular_dv = _VERIFICADORES[campo.digito_verificador]
+            if not _digitos_verificadores_ok(valor, pesos, calcular_dv):
+                return campo.mensagem_digito
+        return None
+    
+    def formato_ok(self, nome: str, valor: str) -> bool:
+        """Valor preenchido e no formato do campo"""
+        valor = valor.strip() if valor else ''
+        return bool(valor) and self.erro_formato(self.por_campo[nome], valor) is None
+    
+    def validar_campo(self, nome: str, valor: str) -> Optional[str]:
+        """Erro de um campo (obrigatório ou formato). None se válido"""
+        campo = self.por_campo[nome]
+        valor = valor.strip()
+        if not valor:
+            return campo.obrigatorio
+        return self.erro_formato(campo, valor)
+    
+    def validar(self, dados: Mapping[str, Any]) -> List[str]:
+        """Passagem única pelos campos: obrigatórios vazios primeiro, depois os erros de formato"""
+        faltando, formato = [], []
+        erro_formato = self.erro_formato
+        for campo in self.campos:
+            valor = (dados.get(campo.campo) or '').strip()
+            if not valor:
+                if campo.obrigatorio:
+                    faltando.append(campo.obrigatorio)
+                continue
+            erro = erro_formato(campo, valor)
+            if erro:
+                formato.append(erro)
+        return faltando + formato
+
+ESQUEMA = EsquemaCompilado(ESQUEMA_CAMPOS)
 
 class FormValidator:
-    """Classe responsável por todas as validações do formulário"""
+    """Classe responsável por todas as validações do formulário.
+    As validações por valor são memoizadas: o mesmo texto não é validado duas vezes"""
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def validar_cnpj(cnpj: str) -> bool:
-        """Valida formato do CNPJ"""
-        if not cnpj:
-            return False
-        cnpj_limpo = re.sub(r'\D', '', cnpj)
-        return bool(re.match(REGEX_PATTERNS["cnpj"], cnpj_limpo))
+        """Valida formato e dígitos verificadores do CNPJ"""
+        return ESQUEMA.formato_ok('cnpj', cnpj)
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def validar_cpf(cpf: str) -> bool:
-        """Valida formato do CPF"""
-        if not cpf:
-            return False
-        cpf_limpo = re.sub(r'\D', '', cpf)
-        return bool(re.match(REGEX_PATTERNS["cpf"], cpf_limpo))
+        """Valida formato e dígitos verificadores do CPF"""
+        return ESQUEMA.formato_ok('cpf', cpf)
+    
+    @staticmethod
+    def validar_lote_cpf(valores: Sequence[str]) -> np.ndarray:
+        """Validação vetorizada de muitos CPFs (arquivos em lote). Retorna um array booleano"""
+        return _lote_digitos_verificadores(valores, *_VERIFICADORES['cpf'])
+    
+    @staticmethod
+    def validar_lote_cnpj(valores: Sequence[str]) -> np.ndarray:
+        """Validação vetorizada de muitos CNPJs (arquivos em lote). Retorna um array booleano"""
+        return _lote_digitos_verificadores(valores, *_VERIFICADORES['cnpj'])
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def validar_cep(cep: str) -> bool:
         """Valida formato do CEP"""
-        if not cep:
-            return False
-        cep_limpo = re.sub(r'\D', '', cep)
-        return bool(re.match(REGEX_PATTERNS["cep"], cep_limpo))
+        return ESQUEMA.formato_ok('cep', cep)
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def validar_email(email: str) -> bool:
         """Valida formato do email"""
-        if not email:
-            return False
-        return bool(re.match(REGEX_PATTERNS["email"], email.strip()))
+        return ESQUEMA.formato_ok('email', email)
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def validar_telefone(telefone: str) -> bool:
         """Valida formato do telefone"""
-        if not telefone:
-            return False
-        telefone_limpo = re.sub(r'\D', '', telefone)
-        return bool(re.match(REGEX_PATTERNS["telefone"], telefone_limpo))
+        return ESQUEMA.formato_ok('telefone', telefone)
     
     @staticmethod
     def validar_nome_completo(nome: str) -> bool:
         """Valida se o nome tem pelo menos nome e sobrenome"""
-        if not nome:
-            return False
-        return len(nome.strip().split()) >= 2
+        return ESQUEMA.formato_ok('nome_completo', nome)
     
-    @classmethod
-    def validar_formulario_completo(cls, dados: Dict) -> List[str]:
-        """Valida o formulário completo e retorna lista de erros"""
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def validar_campo(campo: str, valor: str) -> Optional[str]:
+        """Erro de um campo para um valor (memoizado por campo e valor). None se válido"""
+        return ESQUEMA.validar_campo(campo, valor)
+    
+    @staticmethod
+    def validar_equipamentos(equipamentos: List[Dict]) -> List[str]:
+        """Erros da lista de equipamentos (o preenchimento é opcional)"""
         erros = []
-        
-        # Validar campos obrigatórios
-        for campo, nome in CAMPOS_OBRIGATORIOS.items():
-            valor = dados.get(campo, '').strip()
-            if not valor:
-                erros.append(f"{nome} é obrigatório")
-        
-        # Validações específicas
-        email = dados.get('email', '').strip()
-        if email and not cls.validar_email(email):
-            erros.append("E-mail inválido")
-        
-        telefone = dados.get('telefone', '').strip()
-        if telefone and not cls.validar_telefone(telefone):
-            erros.append("Telefone deve ter 10 ou 11 dígitos")
-        
-        cpf = dados.get('cpf', '').strip()
-        if cpf and not cls.validar_cpf(cpf):
-            erros.append("CPF deve conter exatamente 11 números")
-        
-        cnpj = dados.get('cnpj', '').strip()
-        if cnpj and not cls.validar_cnpj(cnpj):
-            erros.append("CNPJ deve conter exatamente 14 números")
-        
-        cep = dados.get('cep', '').strip()
-        if cep and not cls.validar_cep(cep):
-            erros.append("CEP deve conter exatamente 8 números")
-        
-        nome = dados.get('nome_completo', '').strip()
-        if nome and not cls.validar_nome_completo(nome):
-            erros.append("Nome completo deve ter pelo menos nome e sobrenome")
-        
-        # Validação de equipamentos - OPCIONAL: apenas validar se preenchidos incorretamente
-        equipamentos = dados.get('equipamentos', [])
         for i, eq in enumerate(equipamentos):
             # Se algum campo foi preenchido, verificar se pelo menos o tipo está preenchido
             tipo = eq.get('tipo', '').strip()
@@ -98,21 +199,162 @@ class FormValidator:
             # Se algum campo foi preenchido mas não o tipo, exigir o tipo
             if (descricao or valor) and not tipo:
                 erros.append(f"Equipamento {i+1}: se preenchido, o tipo é obrigatório")
-        
+            
+            # Valor convertido na entrada (TabelaEquipamentos): só confere o resultado
+            if valor and eq.get('valor_centavos') is None:
+                erros.append(f"Equipamento {i+1}: valor '{valor}' não reconhecido (use o formato 1.234,56)")
         return erros
+    
+    @classmethod
+    def validar_formulario_completo(cls, dados: Dict, mapa: Optional['MapaErros'] = None) -> List[str]:
+        """Valida o formulário completo e retorna lista de erros.
+        Com um MapaErros, só os campos alterados desde a última validação são revalidados"""
+        if mapa is None:
+            return ESQUEMA.validar(dados) + cls.validar_equipamentos(dados.get('equipamentos', []))
+        return mapa.atualizar(dados)
+
+class MapaErros:
+    """Erros atuais do formulário por campo, atualizados incrementalmente"""
+    
+    CAMPOS = tuple(ESQUEMA.por_campo)
+    
+    def __init__(self):
+        self.valores: Dict[str, str] = {}
+        self.erros: Dict[str, str] = {}
+        self._equipamentos: Any = None
+        self._erros_equipamentos: List[str] = []
+    
+    def atualizar(self, dados: Dict) -> List[str]:
+        """Revalida só os campos cujo valor mudou e devolve a lista completa de erros"""
+        for campo in self.CAMPOS:
+            valor = dados.get(campo) or ''
+            if campo in self.valores and self.valores[campo] == valor:
+                continue
+            self.valores[campo] = valor
+            erro = FormValidator.validar_campo(campo, valor)
+            if erro:
+                self.erros[campo] = erro
+            else:
+                self.erros.pop(campo, None)
+        
+        # A lista de equipamentos do snapshot só muda de identidade quando a tabela muda
+        equipamentos = dados.get('equipamentos', [])
+        if equipamentos is not self._equipamentos:
+            self._equipamentos = equipamentos
+            self._erros_equipamentos = FormValidator.validar_equipamentos(equipamentos)
+        
+        return self.lista()
+    
+    def lista(self) -> List[str]:
+        """Erros na ordem de exibição (a mesma de EsquemaCompilado.validar): obrigatórios, formatos e equipamentos"""
+        obrigatorios = [self.erros[c] for c in self.CAMPOS
+                        if c in self.erros and not self.valores.get(c, '').strip()]
+        formatos = [self.erros[c] for c in self.CAMPOS
+                    if c in self.erros and self.valores.get(c, '').strip()]
+        return obrigatorios + formatos + self._erros_equipamentos
 
 class FileValidator:
     """Classe para validação de arquivos"""
     
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB por arquivo
     MAX_TOTAL_SIZE = 25 * 1024 * 1024  # 25MB total
-    TIPOS_PERMITIDOS = [
-        'image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp',
-        'application/pdf', 
-        'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'application/vnd.ms-excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        'text/plain'
-    ]
+    
+    MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    
+    # Tipo MIME esperado para cada extensão aceita pelo uploader
+    TIPOS_POR_EXTENSAO = {
+        'jpg': 'image/jpeg',
+        'jpeg': 'image/jpeg',
+        'png': 'image/png',
+        'pdf': 'application/pdf',
+        'xlsx': MIME_XLSX
+    }
+    TIPOS_PERMITIDOS = sorted(set(TIPOS_POR_EXTENSAO.values()))
+    
+    @classmethod
+    def detectar_tipo(cls, cabecalho: bytes) -> Optional[str]:
+        """Detecta o tipo MIME real pelos primeiros bytes do arquivo (magic bytes)"""
+        if cabecalho.startswith(b'%PDF-'):
+            return 'application/pdf'
+        if cabecalho.startswith(b'\xff\xd8\xff'):
+            return 'image/jpeg'
+        if cabecalho.startswith(b'\x89PNG\r\n\x1a\n'):
+            return 'image/png'
+        if cabecalho.startswith((b'GIF87a', b'GIF89a')):
+            return 'image/gif'
+        if cabecalho[:4] == b'RIFF' and cabecalho[8:12] == b'WEBP':
+            return 'image/webp'
+        if cabecalho.startswith(b'PK\x03\x04'):
+            # Contêiner ZIP: o formato OOXML só é conhecido pelo diretório central (ver tipo_zip)
+            return 'application/zip'
+        return None
+    
+    @classmethod
+    def tipo_zip(cls, arquivo: Any) -> str:
+        """Tipo de um contêiner ZIP pelo diretório central (lê só o fim do arquivo), preservando a posição de leitura"""
+        try:
+            with zipfile.ZipFile(arquivo) as pacote:
+                nomes = set(pacote.namelist())
+        except (zipfile.BadZipFile, OSError, ValueError):
+            nomes = set()
+        finally:
+            if hasattr(arquivo, 'seek'):
+                arquivo.seek(0)
+        return cls.MIME_XLSX if 'xl/workbook.xml' in nomes else 'application/zip'
+    
+    @classmethod
+    def ler_cabecalho(cls, arquivo: Any) -> bytes:
+        """Lê apenas o início do arquivo, preservando a posição de leitura"""
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+        cabecalho = arquivo.read(UPLOAD_CONFIG["bytes_sniff"])
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+        return cabecalho
+    
+    @classmethod
+    def validar_upload(cls, arquivo: Any) -> tuple[Optional[str], Optional[str]]:
+        """Valida um arquivo pelo tamanho e conteúdo real. Retorna (tipo, erro)"""
+        nome = getattr(arquivo, 'name', 'anexo')
+        
+        if arquivo.size > cls.MAX_FILE_SIZE:
+            return None, f"Arquivo '{nome}' excede 10MB"
+        
+        extensao = nome.lower().rsplit('.', 1)[-1] if '.' in nome else ''
+        tipo_esperado = cls.TIPOS_POR_EXTENSAO.get(extensao)
+        if extensao not in UPLOAD_CONFIG["extensoes_permitidas"] or not tipo_esperado:
+            return None, f"Tipo de arquivo não permitido: '{nome}'"
+        
+        tipo_real = cls.detectar_tipo(cls.ler_cabecalho(arquivo))
+        if tipo_real == 'application/zip' and tipo_esperado == cls.MIME_XLSX:
+            tipo_real = cls.tipo_zip(arquivo)
+        if tipo_real != tipo_esperado:
+            return None, f"Conteúdo do arquivo '{nome}' não corresponde à extensão .{extensao}"
+        
+        return tipo_real, None
+    
+    @classmethod
+    def filtrar_uploads(cls, arquivos_uploaded, tamanho_existente: int = 0) -> tuple[List[Any], List[str], List[str]]:
+        """Separa uploads aceitos dos rejeitados sem ler o conteúdo completo.
+        Retorna (arquivos aceitos, tipos detectados, erros)"""
+        aceitos, tipos, erros = [], [], []
+        total_size = tamanho_existente
+        
+        for arquivo in arquivos_uploaded or []:
+            tipo, erro = cls.validar_upload(arquivo)
+            if erro:
+                erros.append(erro)
+                continue
+            
+            if total_size + arquivo.size > cls.MAX_TOTAL_SIZE:
+                erros.append(f"Arquivo '{arquivo.name}' ultrapassa o limite total de 25MB")
+                continue
+            
+            total_size += arquivo.size
+            aceitos.append(arquivo)
+            tipos.append(tipo)
+        
+        return aceitos, tipos, erros
     
     @classmethod
     def validar_arquivos(cls, arquivos_uploaded) -> tuple[bool, List[str], List[Dict]]:
@@ -125,14 +367,10 @@ class FileValidator:
         total_size = 0
         
         for arquivo in arquivos_uploaded:
-            # Verificar tamanho individual
-            if arquivo.size > cls.MAX_FILE_SIZE:
-                erros.append(f"Arquivo '{arquivo.name}' excede 10MB")
-                continue
-                
-            # Verificar tipo
-            if arquivo.type not in cls.TIPOS_PERMITIDOS:
-                erros.append(f"Tipo de arquivo não permitido: '{arquivo.name}' ({arquivo.type})")
+            # Verificar tamanho e tipo real antes de ler o arquivo inteiro
+            tipo, erro = cls.validar_upload(arquivo)
+            if erro:
+                erros.append(erro)
                 continue
                 
             total_size += arquivo.size
@@ -140,7 +378,7 @@ class FileValidator:
             # Processar arquivo válido
             arquivo_dict = {
                 'name': arquivo.name,
-                'type': arquivo.type,
+                'type': tipo,
                 'size': arquivo.size,
                 'content': arquivo.read()
             }
@@ -0,0 +1,230 @@
+import sys
+import csv
+import argparse
+import unicodedata
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.validators.form_validators import ESQUEMA, FormValidator
+from src.services.importacao_service import ImportacaoEquipamentosService
+from config import CAMPOS_OBRIGATORIOS, LOTE_CONFIG
+
+# Campos numéricos: células numéricas do Excel perdem os zeros à esquerda
+_TAMANHOS_NUMERICOS = {'cpf': 11, 'cnpj': 14, 'cep': 8}
+
+@dataclass
+class ErroLinha:
+    """Erros de uma linha do arquivo (linha contada a partir do cabeçalho = 1)"""
+    linha: int
+    erros: List[Tuple[str, str]]
+
+@dataclass
+class ResumoLote:
+    """Totais da validação em lote, atualizados enquanto o arquivo é lido"""
+    linhas: int = 0
+    linhas_com_erro: int = 0
+    erros_por_campo: Dict[str, int] = field(default_factory=dict)
+    colunas_ausentes: List[str] = field(default_factory=list)
+
+    @property
+    def linhas_validas(self) -> int:
+        return self.linhas - self.linhas_com_erro
+
+class ValidadorLote:
+    """Valida listas de cadastros (quiosques) em XLSX/CSV coluna a coluna, em blocos de linhas.
+    Usa o mesmo esquema compilado (e as mesmas mensagens) do formulário"""
+
+    # Nomes aceitos no cabeçalho além do rótulo e da chave de cada campo
+    APELIDOS = {
+        'nome_completo': ('nome',),
+        'email': ('email', 'e mail'),
+        'telefone': ('celular', 'fone'),
+        'logradouro': ('endereco', 'rua'),
+        'numero': ('n', 'no', 'numero do endereco'),
+        'estado': ('uf',),
+        'plano_selecionado': ('plano',)
+    }
+
+    def __init__(self, tamanho_bloco: Optional[int] = None):
+        self.tamanho_bloco = tamanho_bloco or LOTE_CONFIG["tamanho_bloco"]
+        self.resumo = ResumoLote()
+
+    @staticmethod
+    def _normalizar(texto: Any) -> str:
+        texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+        return ' '.join(texto.lower().replace('_', ' ').replace('-', ' ').split())
+
+    @classmethod
+    def mapear_cabecalho(cls, linha: Sequence[Any]) -> Dict[str, int]:
+        """Posição de cada campo conhecido no cabeçalho"""
+        nomes = {}
+        for campo in ESQUEMA.por_campo:
+            for nome in (campo, CAMPOS_OBRIGATORIOS.get(campo, ''), *cls.APELIDOS.get(campo, ())):
+                if nome:
+                    nomes.setdefault(cls._normalizar(nome), campo)
+        mapa = {}
+        for i, celula in enumerate(linha):
+            campo = nomes.get(cls._normalizar(celula))
+            if campo and campo not in mapa:
+                mapa[campo] = i
+        return mapa
+
+    @staticmethod
+    def _texto(campo: str, celula: Any) -> str:
+        if celula is None:
+            return ''
+        if isinstance(celula, (int, float, Decimal)) and not isinstance(celula, bool):
+            if celula == int(celula):
+                texto = str(int(celula))
+                return texto.zfill(_TAMANHOS_NUMERICOS[campo]) if campo in _TAMANHOS_NUMERICOS else texto
+        return str(celula).strip()
+
+    @classmethod
+    def validar_colunas(cls, colunas: Dict[str, List[str]], quantidade: int) -> List[List[Tuple[str, str]]]:
+        """Erros de cada linha de um bloco, calculados por coluna.
+        colunas: valores já como texto por campo; campos ausentes contam como vazios"""
+        erros: List[List[Tuple[str, str]]] = [[] for _ in range(quantidade)]
+        vazios: Dict[str, np.ndarray] = {}
+        series: Dict[str, pd.Series] = {}
+
+        for campo in ESQUEMA.campos:
+            if campo.campo in colunas:
+                # Uma normalização por coluna, como no validador de passagem única
+                serie = pd.Series(colunas[campo.campo], dtype=object).str.strip()
+                vazios[campo.campo] = (serie == '').to_numpy()
+                series[campo.campo] = serie.str.replace(r'[^0-9]', '', regex=True) if campo.digitos else serie
+            else:
+                vazios[campo.campo] = np.ones(quantidade, dtype=bool)
+
+        # Mesma ordem do formulário: primeiro os obrigatórios vazios, depois os formatos
+        for campo in ESQUEMA.campos:
+            if campo.obrigatorio:
+                for i in np.flatnonzero(vazios[campo.campo]):
+                    erros[i].append((campo.campo, campo.obrigatorio))
+
+        for campo in ESQUEMA.campos:
+            if campo.campo not in series:
+                continue
+            serie, pendentes = series[campo.campo], ~vazios[campo.campo]
+            invalidos = np.zeros(quantidade, dtype=bool)
+            if campo.padrao is not None:
+                invalidos |= ~serie.str.match(campo.padrao.pattern).to_numpy(dtype=bool)
+            if campo.min_palavras:
+                invalidos |= (serie.str.split().str.len() < campo.min_palavras).to_numpy(dtype=bool)
+            for i in np.flatnonzero(pendentes & invalidos):
+                erros[i].append((campo.campo, campo.mensagem))
+            if campo.digito_verificador:
+                pendentes &= ~invalidos
+                validos = getattr(FormValidator, f"validar_lote_{campo.digito_verificador}")(serie.tolist())
+                for i in np.flatnonzero(pendentes & ~validos):
+                    erros[i].append((campo.campo, campo.mensagem_digito))
+        return erros
+
+    def _validar_bloco(self, numeros: List[int], colunas: Dict[str, List[str]]) -> Iterator[ErroLinha]:
+        for numero, erros in zip(numeros, self.validar_colunas(colunas, len(numeros))):
+            self.resumo.linhas += 1
+            if not erros:
+                continue
+            self.resumo.linhas_com_erro += 1
+            for campo, _ in erros:
+                self.resumo.erros_por_campo[campo] = self.resumo.erros_por_campo.get(campo, 0) + 1
+            yield ErroLinha(numero, erros)
+
+    def validar_linhas(self, linhas: Iterator[Sequence[Any]]) -> Iterator[ErroLinha]:
+        """Valida as linhas (a primeira é o cabeçalho) e devolve só as linhas com erro.
+        Lê um bloco por vez: a memória não cresce com o tamanho do arquivo"""
+        self.resumo = ResumoLote()
+        mapa: Dict[str, int] = {}
+        numeros: List[int] = []
+        colunas: Dict[str, List[str]] = {}
+
+        for numero, linha in enumerate(linhas, 1):
+            linha = linha or ()
+            if numero == 1:
+                mapa = self.mapear_cabecalho(linha)
+                self.resumo.colunas_ausentes = [c for c in CAMPOS_OBRIGATORIOS if c not in mapa]
+                colunas = {campo: [] for campo in mapa}
+                continue
+
+            valores = {campo: self._texto(campo, linha[i] if i < len(linha) else None)
+                       for campo, i in mapa.items()}
+            if not any(valores.values()):
+                continue  # Linha em branco
+            numeros.append(numero)
+            for campo, valor in valores.items():
+                colunas[campo].append(valor)
+
+            if len(numeros) >= self.tamanho_bloco:
+                yield from self._validar_bloco(numeros, colunas)
+                numeros, colunas = [], {campo: [] for campo in mapa}
+
+        if numeros:
+            yield from self._validar_bloco(numeros, colunas)
+
+    def validar_arquivo(self, arquivo: Any) -> Iterator[ErroLinha]:
+        """Valida um arquivo enviado ou aberto em modo binário (.xlsx ou .csv).
+        Levanta ValueError na chamada (antes de qualquer leitura) se o formato não for suportado"""
+        nome = getattr(arquivo, 'name', '')
+        extensao = nome.lower().rsplit('.', 1)[-1] if '.' in nome else ''
+        if extensao == 'xlsx':
+            if not ImportacaoEquipamentosService.disponivel_xlsx():
+                raise ValueError("Leitura de XLSX indisponível (openpyxl não instalado)")
+            linhas = ImportacaoEquipamentosService.linhas_xlsx(arquivo)
+        elif extensao == 'csv':
+            linhas = ImportacaoEquipamentosService.linhas_csv(arquivo)
+        else:
+            raise ValueError(f"Formato não suportado para validação em lote: '{nome}'")
+        return self._validar_e_fechar(linhas)
+
+    def _validar_e_fechar(self, linhas: Iterator[Sequence[Any]]) -> Iterator[ErroLinha]:
+        try:
+            yield from self.validar_linhas(linhas)
+        finally:
+            linhas.close()
+
+    @staticmethod
+    def escrever_relatorio(erros: Iterator[ErroLinha], saida: Any) -> int:
+        """Grava o relatório (linha;campo;erro) em um arquivo texto. Retorna quantos erros foram gravados"""
+        escritor = csv.writer(saida, delimiter=';')
+        escritor.writerow(['linha', 'campo', 'erro'])
+        total = 0
+        for erro_linha in erros:
+            for campo, mensagem in erro_linha.erros:
+                escritor.writerow([erro_linha.linha, campo, mensagem])
+                total += 1
+        return total
+
+def main(argv=None):
+    """Valida uma lista de cadastros: python -m src.validators.lote_validator cadastros.xlsx --saida erros.csv"""
+    parser = argparse.ArgumentParser(description="Valida cadastros de quiosques em lote (XLSX ou CSV)")
+    parser.add_argument('arquivo', help="Planilha com uma linha por cadastro e cabeçalho na primeira linha")
+    parser.add_argument('--saida', default=None, help="Relatório CSV de erros (padrão: saída padrão)")
+    parser.add_argument('--bloco', type=int, default=None, help="Linhas validadas por bloco")
+    args = parser.parse_args(argv)
+
+    validador = ValidadorLote(args.bloco)
+    try:
+        with open(args.arquivo, 'rb') as arquivo:
+            erros = validador.validar_arquivo(arquivo)
+            if args.saida:
+                with open(args.saida, 'w', encoding='utf-8-sig', newline='') as saida:
+                    validador.escrever_relatorio(erros, saida)
+            else:
+                validador.escrever_relatorio(erros, sys.stdout)
+    except Exception as e:
+        # Formato não suportado, arquivo ausente ou planilha corrompida: mensagem em vez de traceback
+        print(f"Não foi possível validar '{args.arquivo}': {e}", file=sys.stderr)
+        return 2
+
+    resumo = validador.resumo
+    print(f"{resumo.linhas} linhas, {resumo.linhas_validas} válidas, {resumo.linhas_com_erro} com erro", file=sys.stderr)
+    for campo, quantidade in resumo.erros_por_campo.items():
+        print(f"  {CAMPOS_OBRIGATORIOS.get(campo, campo)}: {quantidade}", file=sys.stderr)
+    if resumo.colunas_ausentes:
+        print("Colunas ausentes: " + ", ".join(CAMPOS_OBRIGATORIOS[c] for c in resumo.colunas_ausentes), file=sys.stderr)
+    return 1 if resumo.linhas_com_erro else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Raiz do projeto no path: os módulos importam `config` e `src.*` a partir dela
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
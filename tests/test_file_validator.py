@@ -0,0 +1,53 @@
+import io
+import zipfile
+import pytest
+from src.validators.form_validators import FileValidator
+
+class Upload(io.BytesIO):
+    """Imita o UploadedFile do Streamlit (BytesIO com nome e tamanho)"""
+
+    def __init__(self, nome: str, conteudo: bytes):
+        super().__init__(conteudo)
+        self.name = nome
+        self.size = len(conteudo)
+
+def _zip(*entradas) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as pacote:
+        for nome, conteudo in entradas:
+            pacote.writestr(nome, conteudo)
+    return buffer.getvalue()
+
+TIPOS = ('[Content_Types].xml', b'<Types/>')
+
+def test_xlsx_valido_aceito():
+    arquivo = Upload('lista.xlsx', _zip(TIPOS, ('xl/workbook.xml', b'<workbook/>')))
+    assert FileValidator.validar_upload(arquivo) == (FileValidator.MIME_XLSX, None)
+    assert arquivo.tell() == 0
+
+def test_xlsx_com_entradas_xl_depois_do_cabecalho_aceito():
+    # Entradas grandes antes de xl/: nenhum nome "xl/" nos primeiros bytes lidos
+    arquivo = Upload('lista.xlsx', _zip(TIPOS, ('docProps/thumbnail.jpeg', b'\0' * 50000),
+                                        ('xl/workbook.xml', b'<workbook/>')))
+    assert b'xl/' not in FileValidator.ler_cabecalho(arquivo)
+    assert FileValidator.validar_upload(arquivo) == (FileValidator.MIME_XLSX, None)
+
+@pytest.mark.parametrize('entradas', [
+    (TIPOS, ('word/document.xml', b'<document/>')),
+    (TIPOS, ('ppt/presentation.xml', b'<presentation/>')),
+    (TIPOS,),
+    (('leiame.txt', b'xl/workbook.xml'),)
+], ids=['docx', 'pptx', 'so_content_types', 'zip_comum'])
+def test_outros_zips_renomeados_rejeitados(entradas):
+    tipo, erro = FileValidator.validar_upload(Upload('lista.xlsx', _zip(*entradas)))
+    assert tipo is None and 'não corresponde' in erro
+
+def test_zip_corrompido_rejeitado():
+    tipo, erro = FileValidator.validar_upload(Upload('lista.xlsx', b'PK\x03\x04' + b'\0' * 100))
+    assert tipo is None and 'não corresponde' in erro
+
+def test_magic_bytes():
+    assert FileValidator.detectar_tipo(b'%PDF-1.7') == 'application/pdf'
+    assert FileValidator.detectar_tipo(b'\x89PNG\r\n\x1a\n') == 'image/png'
+    assert FileValidator.detectar_tipo(b'PK\x03\x04xl/workbook.xml') == 'application/zip'
+    assert FileValidator.detectar_tipo(b'texto') is None
@@ -0,0 +1,65 @@
+import random
+import pytest
+from src.validators.form_validators import FormValidator, _VERIFICADORES
+
+CPFS_VALIDOS = ['529.982.247-25', '52998224725', '111.444.777-35', '012.345.678-90']
+CPFS_INVALIDOS = [
+    '529.982.247-24',           # dígito verificador errado
+    '111.111.111-11',           # dígitos repetidos
+    '000.000.000-00',
+    '５２９.９８２.２４７-２５',  # dígitos fullwidth
+    '٥٢٩٩٨٢٢٤٧٢٥',              # dígitos arábico-índicos
+    '529.982.247-2',            # tamanho errado
+    '',
+]
+CNPJS_VALIDOS = ['11.222.333/0001-81', '11222333000181', '11.444.777/0001-61']
+CNPJS_INVALIDOS = [
+    '11.222.333/0001-82',
+    '11.111.111/1111-11',
+    '00.000.000/0000-00',
+    '１１.２２２.３３３/０００１-８１',
+    '11.222.333/0001-8',
+    '',
+]
+
+@pytest.mark.parametrize('cpf', CPFS_VALIDOS)
+def test_cpf_valido(cpf):
+    assert FormValidator.validar_cpf(cpf)
+
+@pytest.mark.parametrize('cpf', CPFS_INVALIDOS)
+def test_cpf_invalido(cpf):
+    assert not FormValidator.validar_cpf(cpf)
+
+@pytest.mark.parametrize('cnpj', CNPJS_VALIDOS)
+def test_cnpj_valido(cnpj):
+    assert FormValidator.validar_cnpj(cnpj)
+
+@pytest.mark.parametrize('cnpj', CNPJS_INVALIDOS)
+def test_cnpj_invalido(cnpj):
+    assert not FormValidator.validar_cnpj(cnpj)
+
+def test_mensagens_por_campo():
+    assert FormValidator.validar_campo('cpf', '529.982.247-24') == "CPF inválido: confira os números digitados"
+    assert FormValidator.validar_campo('cpf', '５２９.９８２.２４７-２５') == "CPF deve conter exatamente 11 números"
+    assert FormValidator.validar_campo('cpf', '') == "CPF é obrigatório"
+    assert FormValidator.validar_campo('cnpj', '11.222.333/0001-81') is None
+
+@pytest.mark.parametrize('tipo, validar, validar_lote, valores', [
+    ('cpf', FormValidator.validar_cpf, FormValidator.validar_lote_cpf, CPFS_VALIDOS + CPFS_INVALIDOS),
+    ('cnpj', FormValidator.validar_cnpj, FormValidator.validar_lote_cnpj, CNPJS_VALIDOS + CNPJS_INVALIDOS),
+])
+def test_lote_igual_ao_valor_a_valor(tipo, validar, validar_lote, valores):
+    # Números aleatórios com o tamanho certo: metade com os dígitos verificadores corretos
+    aleatorio = random.Random(7)
+    tamanho, pesos, calcular_dv = _VERIFICADORES[tipo]
+    for _ in range(2000):
+        base = [aleatorio.randrange(10) for _ in range(tamanho - 2)]
+        for pesos_dv in pesos:
+            base.append(int(calcular_dv(sum(d * p for d, p in zip(base, pesos_dv)))))
+        if aleatorio.random() < 0.5:
+            base[-1] = (base[-1] + 1) % 10
+        valores.append(''.join(map(str, base)))
+
+    lote = validar_lote(valores)
+    assert lote.tolist() == [validar(v) for v in valores]
+    assert lote.any() and not lote.all()
@@ -0,0 +1,49 @@
+import io
+import random
+from src.validators.form_validators import FormValidator, MapaErros
+from src.validators.lote_validator import ValidadorLote
+
+CPFS = ['529.982.247-25', '111.444.777-35', '529.982.247-24', '111.111.111-11',
+        '５２９.９８２.２４７-２５', '529.982.247-2', '', '  ']
+CNPJS = ['11.222.333/0001-81', '11.222.333/0001-82', '11.111.111/1111-11',
+         '１１.２２２.３３３/０００１-８１', '11222333', '']
+
+def _erros_do_campo(campo, valores):
+    erros = ValidadorLote.validar_colunas({campo: valores}, len(valores))
+    return [[mensagem for nome, mensagem in linha if nome == campo] for linha in erros]
+
+def test_cpf_em_lote_igual_ao_formulario():
+    esperado = [[e] if (e := FormValidator.validar_campo('cpf', v)) else [] for v in CPFS]
+    assert _erros_do_campo('cpf', CPFS) == esperado
+    assert esperado[:2] == [[], []]  # os dois primeiros são CPFs válidos
+
+def test_cnpj_em_lote_igual_ao_formulario():
+    esperado = [[e] if (e := FormValidator.validar_campo('cnpj', v)) else [] for v in CNPJS]
+    assert _erros_do_campo('cnpj', CNPJS) == esperado
+    assert esperado[0] == []
+
+def test_registros_completos_iguais_ao_mapa_de_erros():
+    aleatorio = random.Random(3)
+    amostras = {
+        'nome_completo': ['', 'Ana', 'Ana Souza'], 'cpf': CPFS, 'email': ['', 'a@b.com', 'x'],
+        'telefone': ['', '(21) 99999-8888', '123'], 'cnpj': CNPJS, 'cep': ['', '22000-000', '2200'],
+        'logradouro': ['', 'R'], 'numero': ['', '1'], 'bairro': ['B'], 'cidade': ['C'],
+        'estado': ['RJ'], 'plano_selecionado': ['', 'Opção 1']
+    }
+    registros = [{campo: aleatorio.choice(v) for campo, v in amostras.items()} for _ in range(500)]
+    colunas = {campo: [r[campo] for r in registros] for campo in amostras}
+
+    em_lote = ValidadorLote.validar_colunas(colunas, len(registros))
+    for registro, erros in zip(registros, em_lote):
+        assert [mensagem for _, mensagem in erros] == MapaErros().atualizar(registro)
+
+def test_arquivo_com_digitos_unicode_nao_interrompe_o_lote():
+    conteudo = 'Nome completo;CPF\r\nAna Souza;５２９.９８２.２４７-２５\r\nBia Lima;529.982.247-25\r\n'
+    arquivo = io.BytesIO(conteudo.encode('utf-8'))
+    arquivo.name = 'cadastros.csv'
+
+    validador = ValidadorLote()
+    erros = {e.linha: dict(e.erros) for e in validador.validar_arquivo(arquivo)}
+    assert validador.resumo.linhas == 2
+    assert erros[2]['cpf'] == "CPF deve conter exatamente 11 números"
+    assert 'cpf' not in erros[3]
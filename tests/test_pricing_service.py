@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+from src.services.pricing_service import PricingService
+from src.utils.formatters import DateUtils
+from config import PLANOS_SEGURO, DATA_FINAL_VIGENCIA
+
+def _premio_antigo(plano: str, data_inclusao: date) -> Decimal:
+    """Cálculo de renderizar_calculo_vigencia antes do PricingService (float arredondado com round)"""
+    inclusao = datetime(data_inclusao.year, data_inclusao.month, data_inclusao.day)
+    dias_restantes = (DATA_FINAL_VIGENCIA - inclusao).days + 1
+    return Decimal(str(round((PLANOS_SEGURO[plano] / 365) * dias_restantes, 2)))
+
+# Valores fixados com a vigência até 08/12/2025
+@pytest.mark.parametrize('plano, data_inclusao, dias, premio', [
+    ('Opção 1', date(2025, 3, 10), 274, Decimal('1880.86')),
+    ('Opção 2', date(2024, 12, 31), 343, Decimal('3767.22')),
+    ('Opção 3', date(2024, 6, 3), 554, Decimal('10648.17')),
+    ('Opção 3', date(2025, 12, 8), 1, Decimal('19.22')),
+])
+def test_calcular_valores_fixados(plano, data_inclusao, dias, premio):
+    cotacao = PricingService.calcular(plano, data_inclusao)
+    assert cotacao.dias_restantes == dias
+    assert cotacao.premio == premio
+
+@pytest.mark.parametrize('plano', list(PLANOS_SEGURO))
+def test_calcular_igual_ao_calculo_antigo(plano):
+    data = date(2025, 1, 2)
+    while data <= DATA_FINAL_VIGENCIA.date():
+        assert PricingService.calcular(plano, data).premio == _premio_antigo(plano, data), data
+        data += timedelta(days=7)
+
+def test_calcular_plano_desconhecido():
+    assert PricingService.calcular('Opção 9', date(2025, 3, 10)) is None
+
+def test_cotacao_por_rotulo():
+    rotulo = PricingService.opcoes_planos()[1]
+    assert PricingService.cotacao(rotulo, date(2025, 3, 10)) == PricingService.calcular('Opção 2', date(2025, 3, 10))
+
+def test_grade_igual_a_calcular():
+    """O arredondamento inteiro (2n + 365) // 730 da grade deve bater com o Decimal half-up"""
+    grade = PricingService.grade_cotacoes(date(2025, 1, 1), date(2025, 12, 5))
+    for j, inclusao in enumerate(grade.datas_inclusao.astype(date)):
+        for i, plano in enumerate(grade.planos):
+            cotacao = PricingService.calcular(plano, inclusao)
+            assert int(grade.dias_restantes[j]) == cotacao.dias_restantes
+            assert int(grade.premios_centavos[i, j]) == int(cotacao.premio * 100), (plano, inclusao)
+
+def test_grade_inclui_proximo_dia_util():
+    # Sexta 07/03/2025: a inclusão vai para a segunda seguinte
+    grade = PricingService.grade_cotacoes(date(2025, 3, 7), date(2025, 3, 7))
+    assert grade.datas_inclusao[0].astype(date) == date(2025, 3, 10)
+
+def test_tabela_do_dia_usa_proximo_dia_util():
+    inclusao = DateUtils.obter_proximo_dia_util().date()
+    for plano, cotacao in PricingService.tabela_do_dia().items():
+        assert cotacao.data_inclusao == inclusao
+        assert cotacao.premio == PricingService.calcular(plano, inclusao).premio
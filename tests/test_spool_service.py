@@ -0,0 +1,35 @@
+import io
+import os
+import pytest
+from src.services.spool_service import SpoolService
+from src.services.image_service import ImageService
+from config import IMAGE_CONFIG, UPLOAD_CONFIG, WORKER_CONFIG
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    monkeypatch.setitem(UPLOAD_CONFIG, 'spool_dir', str(tmp_path))
+    monkeypatch.setitem(WORKER_CONFIG, 'usar_processos', False)
+    return {}
+
+def _imagem_grande() -> io.BytesIO:
+    from PIL import Image
+    arquivo = io.BytesIO()
+    Image.effect_noise((2400, 1600), 64).convert('RGB').save(arquivo, 'PNG')
+    arquivo.name = 'foto.png'
+    arquivo.seek(0)
+    return arquivo
+
+def test_descartar_remove_a_imagem_otimizada(spool, monkeypatch):
+    if not ImageService.disponivel():
+        pytest.skip("Pillow não instalado ou otimização desabilitada")
+    monkeypatch.setitem(IMAGE_CONFIG, 'tamanho_minimo', 0)
+    original, = SpoolService.adicionar_arquivos(spool, [_imagem_grande()], tipos=['image/png'])
+
+    anexos, economizados = ImageService.otimizar_anexos([original])
+    otimizado = anexos[0]
+    assert economizados > 0 and otimizado.path != original.path
+    assert original.derivados == [otimizado.path] and os.path.exists(otimizado.path)
+
+    SpoolService.descartar([original])
+    assert not os.path.exists(original.path)
+    assert not os.path.exists(otimizado.path)